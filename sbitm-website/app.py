@@ -1,237 +1,98 @@
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for, make_response
+from flask import Flask, render_template, jsonify, request, session, redirect, url_for, make_response, current_app
 from datetime import datetime
-import json
 import os
 import random
-import sqlite3
 from functools import wraps
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.security import check_password_hash
 import atexit
 
-app = Flask(__name__)
-app.secret_key = "sbitm-pro-secret-2024-advanced"
-app.config['TEMPLATES_AUTO_RELOAD'] = True
-app.config['DATABASE'] = 'sbitm_database.db'
-
-
-# Initialize database on startup
-def init_db():
-    try:
-        conn = sqlite3.connect(app.config['DATABASE'])
-        cursor = conn.cursor()
-
-        # Create tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS contacts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT NOT NULL,
-                phone TEXT,
-                subject TEXT,
-                message TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status TEXT DEFAULT 'new'
-            )
-        ''')
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS applications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT NOT NULL,
-                last_name TEXT NOT NULL,
-                email TEXT NOT NULL,
-                phone TEXT NOT NULL,
-                program TEXT NOT NULL,
-                qualification TEXT,
-                percentage REAL,
-                message TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status TEXT DEFAULT 'pending'
-            )
-        ''')
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS newsletter (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                subscribed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                active INTEGER DEFAULT 1
-            )
-        ''')
-
-        # Create admin users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admin_users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Insert default admin if not exists
-        cursor.execute('SELECT COUNT(*) FROM admin_users WHERE username = ?', ('admin',))
-        if cursor.fetchone()[0] == 0:
-            password_hash = generate_password_hash('sbitm@2024')
-            cursor.execute('INSERT INTO admin_users (username, password_hash) VALUES (?, ?)',
-                           ('admin', password_hash))
-
-        conn.commit()
-        print("✅ Database initialized successfully")
-
-    except Exception as e:
-        print(f"❌ Database initialization error: {e}")
-    finally:
-        conn.close()
-
-
-# Initialize database immediately
-init_db()
-
-
-# Database helper functions
-def get_db():
-    conn = sqlite3.connect(app.config['DATABASE'])
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
-# Load college data
-def load_college_data():
-    data = {
-        "college": {
-            "name": "Shri Balaji Institute of Technology & Management",
-            "short_name": "SBITM",
-            "address": "NH-69, Betul Bypass Road, Betul, Madhya Pradesh",
-            "phone": "+91 78981 23456",
-            "email": "info@sbitm.edu.in",
-            "established": "2009",
-            "affiliation": "Rajiv Gandhi Proudyogiki Vishwavidyalaya (RGPV), Bhopal",
-            "approval": "AICTE Approved",
-            "naac": "NAAC A+ Accredited",
-            "vision": "To be a premier institution of technical and management education producing globally competent professionals.",
-            "mission": "To provide quality education through innovative pedagogy and foster research, innovation, and entrepreneurship."
-        },
-        "hero_slides": [
-            {
-                "title": "Excellence in Engineering Education",
-                "subtitle": "Shaping Future Innovators Since 2009",
-                "image": "hero-engineering.jpg",
-                "cta": {"text": "Explore Programs", "link": "/academics"},
-                "color": "linear-gradient(135deg, #667eea 0%, #764ba2 100%)"
-            },
-            {
-                "title": "Placements with Top Companies",
-                "subtitle": "92% Placement Record | ₹22 LPA Highest Package",
-                "image": "hero-placements.jpg",
-                "cta": {"text": "View Placements", "link": "/placements"},
-                "color": "linear-gradient(135deg, #f093fb 0%, #f5576c 100%)"
-            },
-            {
-                "title": "Modern Infrastructure & Labs",
-                "subtitle": "State-of-the-art Facilities for Practical Learning",
-                "image": "hero-infrastructure.jpg",
-                "cta": {"text": "Campus Tour", "link": "/facilities"},
-                "color": "linear-gradient(135deg, #4facfe 0%, #00f2fe 100%)"
-            },
-            {
-                "title": "Industry Ready Graduates",
-                "subtitle": "Comprehensive Skill Development & Industry Training",
-                "image": "hero-industry.jpg",
-                "cta": {"text": "View Faculty", "link": "/faculty"},
-                "color": "linear-gradient(135deg, #43e97b 0%, #38f9d7 100%)"
-            }
-        ],
-        "quick_stats": [
-            {"number": "15+", "label": "Years of Excellence", "icon": "fas fa-award", "color": "#667eea"},
-            {"number": "2500+", "label": "Students", "icon": "fas fa-users", "color": "#f093fb"},
-            {"number": "85+", "label": "Faculty", "icon": "fas fa-chalkboard-teacher", "color": "#4facfe"},
-            {"number": "92%", "label": "Placement", "icon": "fas fa-briefcase", "color": "#43e97b"},
-            {"number": "75+", "label": "Companies", "icon": "fas fa-building", "color": "#f093fb"},
-            {"number": "50+", "label": "Labs", "icon": "fas fa-flask", "color": "#667eea"}
-        ],
-        "programs": {
-            "btech": [
-                {"code": "CSE", "name": "Computer Science & Engineering", "duration": "4 Years", "seats": 120,
-                 "description": "Comprehensive program covering AI, ML, Data Science, and Software Engineering",
-                 "icon": "fas fa-laptop-code", "color": "#667eea"},
-                {"code": "AI&DS", "name": "Artificial Intelligence and Data Science", "duration": "4 Years", "seats": 60,
-                 "description": "Comprehensive program covering AI, ML, Data Science, and Software Engineering",
-                 "icon": "fas fa-laptop-code", "color": "#667eea"},
-                {"code": "ME", "name": "Mechanical Engineering", "duration": "4 Years", "seats": 60,
-                 "description": "Focus on design, manufacturing, thermal systems, and automation",
-                 "icon": "fas fa-cogs", "color": "#f093fb"},
-                {"code": "CE", "name": "Civil Engineering", "duration": "4 Years", "seats": 60,
-                 "description": "Infrastructure development, structural design, and construction management",
-                 "icon": "fas fa-hard-hat", "color": "#4facfe"},
-                {"code": "EE", "name": "Electrical Engineering", "duration": "4 Years", "seats": 60,
-                 "description": "Power systems, renewable energy, and electrical machine design",
-                 "icon": "fas fa-bolt", "color": "#43e97b"},
-
-            ],
-
-        },
-        "placements": {
-            "current_year": {
-                "highest": "₹22 LPA",
-                "average": "₹6.2 LPA",
-                "percentage": "92%",
-                "offers": "180+",
-                "companies": ["TCS", "Infosys", "Wipro", "Capgemini", "Accenture", "IBM", "Cognizant",
-                              "Tech Mahindra", "Amazon", "Microsoft", "Deloitte", "EY", "KPMG", "PwC",
-                              "HCL", "L&T", "Tata Motors", "Mahindra", "Bajaj", "Reliance"]
-            },
-            "previous_years": [
-                {"year": "2023", "highest": "₹18 LPA", "average": "₹5.8 LPA", "percentage": "90%"},
-                {"year": "2022", "highest": "₹16 LPA", "average": "₹5.5 LPA", "percentage": "88%"},
-                {"year": "2021", "highest": "₹14 LPA", "average": "₹5.2 LPA", "percentage": "85%"}
-            ]
-        },
-        "facilities": [
-            {"name": "Smart Classrooms", "icon": "fas fa-chalkboard-teacher",
-             "description": "Digitally equipped with interactive boards and audio-visual systems", "color": "#667eea"},
-            {"name": "Advanced Laboratories", "icon": "fas fa-flask",
-             "description": "25+ labs with latest equipment and technology", "color": "#f093fb"},
-            {"name": "Central Library", "icon": "fas fa-book",
-             "description": "50,000+ books, journals, and digital resources", "color": "#4facfe"},
-            {"name": "Computer Center", "icon": "fas fa-desktop",
-             "description": "500+ systems with high-speed internet and software", "color": "#43e97b"},
-            {"name": "Sports Complex", "icon": "fas fa-futbol", "description": "Indoor and outdoor sports facilities",
-             "color": "#667eea"},
-            {"name": "Cafeteria", "icon": "fas fa-utensils", "description": "Hygienic and nutritious food services",
-             "color": "#4facfe"},
-            {"name": "Medical Center", "icon": "fas fa-hospital",
-             "description": "24x7 medical facility with qualified staff", "color": "#43e97b"}
-        ],
-        "departments": [
-            {"name": "Computer Science", "head": "Dr. Pankaj singh Sisodiya", "faculty": 18, "color": "#667eea"},
-            {"name": "Mechanical Engineering", "head": "Dr. Rajesh Barange", "faculty": 15, "color": "#f093fb"},
-            {"name": "Civil Engineering", "head": "Dr. Hemant Badode", "faculty": 12, "color": "#4facfe"},
-            {"name": "Electrical Engineering", "head": "Dr. Kapil Padlak", "faculty": 10, "color": "#43e97b"},
-
-
-        ],
-        "gallery": {
-            "categories": ["Campus", "Labs", "Events", "Sports", "Cultural"],
-            "images": [
-                {"category": "Campus", "title": "Main Building", "image": "campus-1.jpg"},
-                {"category": "Labs", "title": "Computer Lab", "image": "lab-1.jpg"},
-                {"category": "Events", "title": "Tech Fest", "image": "event-1.jpg"},
-                {"category": "Sports", "title": "Annual Sports", "image": "sports-1.jpg"},
-                {"category": "Cultural", "title": "Cultural Fest", "image": "cultural-1.jpg"}
-            ]
-        }
-    }
-    return data
+import db
+from db import get_db
+from write_buffer import WriteBuffer, BufferFull
+import page_cache
+from page_cache import PageCache
+import compression
+import assets
+import images
+import vendor
+import freeze
+import sitemaps
+import newsletter
+import maintenance
+import migrations
+import metrics
+import ratelimit
+from ratelimit import protect_submission
+import references
+import forms
+from counters import load_counts, TTLCache
+import listing
+from search import SearchIndex, college_documents
+from content import ContentStore
+from fragment_cache import FragmentCacheExtension
+from config import get_config
+from templating import configure_templates
+
+
+# Views, error handlers and context processors are declared here at import
+# time and attached to each app that create_app() builds. Unlike a Blueprint,
+# endpoints keep their plain names, so url_for('home') works unchanged.
+class ViewRegistry:
+    def __init__(self):
+        self._deferred = []
+
+    def route(self, rule, **options):
+        def decorator(view):
+            self._deferred.append(lambda app: app.add_url_rule(rule, view_func=view, **options))
+            return view
+
+        return decorator
+
+    def errorhandler(self, code):
+        def decorator(handler):
+            self._deferred.append(lambda app: app.register_error_handler(code, handler))
+            return handler
+
+        return decorator
+
+    def context_processor(self, processor):
+        self._deferred.append(lambda app: app.context_processor(processor))
+        return processor
+
+    def register(self, app):
+        for deferred in self._deferred:
+            deferred(app)
+
+
+site = ViewRegistry()
+
+
+# Current content snapshot (see content.py)
+def content():
+    return current_app.extensions['content_store'].current()
+
+
+# Writes one submission row, through the write buffer when it is enabled.
+# Raises BufferFull when the queue is saturated.
+def save_submission(sql, params):
+    write_buffer = current_app.extensions.get('write_buffer')
+    if write_buffer is not None:
+        write_buffer.submit(sql, params, wait=current_app.config['WRITE_BUFFER_WAIT'])
+        return
+    conn = get_db()
+    conn.execute(sql, params)
+    conn.commit()
 
 
-COLLEGE_DATA = load_college_data()
+SERVER_BUSY = {"success": False, "message": "Server busy. Please try again in a moment."}
 
 
-@app.context_processor
+@site.context_processor
 def inject_data():
     return {
-        "data": COLLEGE_DATA,
+        "data": content().college,
+        "content_version": content().version,
         "current_year": datetime.now().year,
         "current_month": datetime.now().strftime("%B"),
         "site_name": "SBITM Betul",
@@ -243,150 +104,110 @@ def inject_data():
 # ====================
 # MAIN ROUTES - FIXED
 # ====================
-from flask import send_from_directory
-
-@app.route('/service-worker.js')
+@site.route('/service-worker.js')
 def service_worker():
-    return send_from_directory('static', 'service-worker.js')
+    response = make_response(assets.service_worker_script(current_app))
+    response.mimetype = 'application/javascript'
+    # Browsers must see a new precache version as soon as a deploy lands
+    response.cache_control.no_cache = True
+    return response
 
-@app.route('/')
+@site.route('/')
+@page_cache.cached('index.html')
 def home():
     return render_template('index.html')
 
 
-@app.route('/about')
+@site.route('/about')
+@page_cache.cached('about.html')
 def about():
     return render_template('about.html')
 
 
-@app.route('/academics')
+@site.route('/academics')
+@page_cache.cached('academics.html')
 def academics():
     return render_template('academics.html')
 
 
-@app.route('/admissions')
+@site.route('/admissions')
+@page_cache.cached('admissions.html')
 def admissions():
     return render_template('admissions.html')
 
 
-@app.route('/placements')
+@site.route('/placements')
+@page_cache.cached('placements.html')
 def placements():
     return render_template('placements.html')
 
 
-@app.route('/faculty')
+@site.route('/faculty')
 def faculty():
-    # Complete faculty data for all departments
-    faculty_data = {
-        "cse": [
-            {"name": "Dr. Pankaj Singh Sisodiya", "designation": "HOD - CSE",
-             "qualification": "Ph.D. (Computer Science)",
-             "experience": "15+ years", "specialization": "Artificial Intelligence", "image": "faculty-1.jpg"},
-            {"name": "Prof. Rahul Sharma", "designation": "Professor", "qualification": "Ph.D. (Computer Engineering)",
-             "experience": "12+ years", "specialization": "Machine Learning", "image": "faculty-2.jpg"},
-            {"name": "Prof. Anjali Verma", "designation": "Associate Professor",
-             "qualification": "Ph.D. (Data Science)",
-             "experience": "10+ years", "specialization": "Data Mining", "image": "faculty-3.jpg"},
-            {"name": "Prof. Rajesh Kumar", "designation": "Assistant Professor", "qualification": "M.Tech (CSE)",
-             "experience": "8+ years", "specialization": "Cyber Security", "image": "faculty-4.jpg"},
-            {"name": "Prof. Priya Patel", "designation": "Assistant Professor", "qualification": "Ph.D. (AI)",
-             "experience": "6+ years", "specialization": "Deep Learning", "image": "faculty-5.jpg"}
-        ],
-        "mechanical": [
-            {"name": "Dr. Rajesh Barange", "designation": "HOD - Mechanical",
-             "qualification": "Ph.D. (Mechanical Engineering)",
-             "experience": "18+ years", "specialization": "Thermal Engineering", "image": "mech-1.jpg"},
-            {"name": "Prof. Sanjay Mehta", "designation": "Professor", "qualification": "Ph.D. (Manufacturing)",
-             "experience": "15+ years", "specialization": "Automation", "image": "mech-2.jpg"},
-            {"name": "Prof. Ajay Singh", "designation": "Associate Professor", "qualification": "Ph.D. (Design)",
-             "experience": "12+ years", "specialization": "CAD/CAM", "image": "mech-3.jpg"}
-        ],
-        "civil": [
-            {"name": "Dr. Hemant Badode", "designation": "HOD - Civil", "qualification": "Ph.D. (Civil Engineering)",
-             "experience": "16+ years", "specialization": "Structural Engineering", "image": "civil-1.jpg"},
-            {"name": "Prof. Rahul Gupta", "designation": "Professor", "qualification": "Ph.D. (Construction)",
-             "experience": "14+ years", "specialization": "Concrete Technology", "image": "civil-2.jpg"}
-        ],
-        "electrical": [
-            {"name": "Dr. Kapil Padlak", "designation": "HOD - Electrical",
-             "qualification": "Ph.D. (Electrical Engineering)",
-             "experience": "17+ years", "specialization": "Power Systems", "image": "electrical-1.jpg"},
-            {"name": "Prof. Mohan Sharma", "designation": "Professor", "qualification": "Ph.D. (Electronics)",
-             "experience": "13+ years", "specialization": "Renewable Energy", "image": "electrical-2.jpg"}
-        ],
-        "ece": [
-            {"name": "Dr. Sunil Verma", "designation": "HOD - ECE", "qualification": "Ph.D. (Electronics)",
-             "experience": "15+ years", "specialization": "Communication Systems", "image": "ece-1.jpg"},
-            {"name": "Prof. Anil Kumar", "designation": "Professor", "qualification": "Ph.D. (VLSI)",
-             "experience": "11+ years", "specialization": "VLSI Design", "image": "ece-2.jpg"}
-        ],
-        "management": [
-            {"name": "Dr. Meera Patel", "designation": "HOD - Management",
-             "qualification": "Ph.D. (Business Administration)",
-             "experience": "14+ years", "specialization": "Marketing", "image": "mba-1.jpg"},
-            {"name": "Prof. Ravi Shankar", "designation": "Professor", "qualification": "Ph.D. (Finance)",
-             "experience": "12+ years", "specialization": "Financial Management", "image": "mba-2.jpg"}
-        ]
-    }
+    return render_template('faculty.html', faculty_data=content().faculty)
+
 
-    return render_template('faculty.html', faculty_data=faculty_data)
-@app.route('/facilities')
+@site.route('/facilities')
+@page_cache.cached('facilities.html')
 def facilities():
     return render_template('facilities.html')
 
 
-@app.route('/gallery')
+@site.route('/gallery')
+@page_cache.cached('gallery.html')
 def gallery():
     return render_template('gallery.html')
 
 
-@app.route('/contact')
+@site.route('/contact')
 def contact():
     return render_template('contact.html')
 
 
-@app.route('/apply')
+@site.route('/apply')
 def apply():
     return render_template('apply.html')
 
 
-@app.route('/programs')
+@site.route('/programs')
+@page_cache.cached('programs.html')
 def programs():
     return render_template('programs.html')
 
 
 # FIXED: Changed from departments_route to departments
-@app.route('/departments')
+@site.route('/departments')
+@page_cache.cached('departments.html')
 def departments():  # Changed name from departments_route
     return render_template('departments.html')
 
 
-@app.route('/campus_tour')
+@site.route('/campus_tour')
 def campus_tour():
     return render_template('campus_tour.html')
 
 
-@app.route('/sitemap')
+@site.route('/sitemap')
 def sitemap():
     return render_template('sitemap.html')
 
 
-@app.route('/privacy')
+@site.route('/privacy')
 def privacy():
     return render_template('privacy.html')
 
 
-@app.route('/terms')
+@site.route('/terms')
 def terms():
     return render_template('terms.html')
 
 
-@app.route('/results')
+@site.route('/results')
 def results():
     return render_template('results.html')
 
 
-@app.route('/examination')
+@site.route('/examination')
 def examination():
     return render_template('examination.html')
 
@@ -395,183 +216,169 @@ def examination():
 # API ENDPOINTS
 # ====================
 
-@app.route('/api/contact', methods=['POST'])
+@site.route('/api/contact', methods=['POST'])
+@protect_submission('email')
 def contact_api():
     try:
-        data = request.json
-        name = data.get('name')
-        email = data.get('email')
-        phone = data.get('phone')
-        subject = data.get('subject')
-        message = data.get('message')
-
-        if not name or not email:
-            return jsonify({"success": False, "message": "Name and email are required"}), 400
+        sql, params, payload = forms.contact(request.json)
 
         # Save to database
-        conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO contacts (name, email, phone, subject, message)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (name, email, phone, subject, message))
-        conn.commit()
-        conn.close()
-
-        # Generate reference number
-        reference = f"ENQ{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        save_submission(sql, params)
 
-        return jsonify({
-            "success": True,
-            "message": "Thank you! We'll contact you soon.",
-            "reference": reference
-        })
+        return jsonify(payload)
+    except forms.InvalidSubmission as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except BufferFull:
+        return jsonify(SERVER_BUSY), 503
     except Exception as e:
         print(f"Contact form error: {e}")
         return jsonify({"success": False, "message": "Server error. Please try again."}), 500
 
 
-@app.route('/api/apply', methods=['POST'])
+@site.route('/api/apply', methods=['POST'])
+@protect_submission('email')
 def apply_api():
     try:
-        data = request.json
-        first_name = data.get('first_name')
-        last_name = data.get('last_name')
-        email = data.get('email')
-        phone = data.get('phone')
-        program = data.get('program')
-        qualification = data.get('qualification')
-        percentage = data.get('percentage')
-        message = data.get('message')
-
-        # Validation
-        required_fields = ['first_name', 'last_name', 'email', 'phone', 'program']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({"success": False, "message": f"{field.replace('_', ' ').title()} is required"}), 400
+        sql, params, payload = forms.application(request.json)
 
         # Save to database
-        conn = get_db()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO applications (first_name, last_name, email, phone, program, qualification, percentage, message)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (first_name, last_name, email, phone, program, qualification, percentage, message))
-        conn.commit()
-        conn.close()
+        save_submission(sql, params)
 
-        # Generate application ID
-        app_id = f"APP{datetime.now().strftime('%Y%m%d%H%M%S')}"
-
-        return jsonify({
-            "success": True,
-            "message": "Application submitted successfully!",
-            "application_id": app_id,
-            "next_steps": "Our admissions team will contact you within 48 hours."
-        })
+        return jsonify(payload)
+    except forms.InvalidSubmission as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except BufferFull:
+        return jsonify(SERVER_BUSY), 503
     except Exception as e:
         print(f"Application error: {e}")
         return jsonify({"success": False, "message": "Server error. Please try again."}), 500
 
 
-@app.route('/api/newsletter', methods=['POST'])
+@site.route('/api/newsletter', methods=['POST'])
+@protect_submission('email')
 def newsletter_api():
     try:
-        data = request.json
-        email = data.get('email')
-
-        if not email:
-            return jsonify({"success": False, "message": "Email is required"}), 400
+        sql, params, payload = forms.newsletter(request.json)
 
-        # Save to database
-        conn = get_db()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO newsletter (email) VALUES (?)
-            ''', (email,))
-            conn.commit()
-        except sqlite3.IntegrityError:
-            # Email already exists
-            cursor.execute('''
-                UPDATE newsletter SET active = 1 WHERE email = ?
-            ''', (email,))
-            conn.commit()
-        finally:
-            conn.close()
+        # Save to database; an upsert, so returning subscribers cost no extra
+        # round trip
+        save_submission(sql, params)
 
-        return jsonify({
-            "success": True,
-            "message": "Successfully subscribed to newsletter!"
-        })
+        return jsonify(payload)
+    except forms.InvalidSubmission as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except BufferFull:
+        return jsonify(SERVER_BUSY), 503
     except Exception as e:
         print(f"Newsletter error: {e}")
         return jsonify({"success": False, "message": "Subscription failed. Please try again."}), 500
 
 
-@app.route('/api/stats')
-def stats_api():
-    # Get counts from database
-    try:
-        conn = get_db()
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT COUNT(*) FROM contacts')
-        contacts_count = cursor.fetchone()[0]
+# Status of an enquiry or application. The email it was submitted with is
+# required, so a reference alone doesn't reveal anything.
+@site.route('/api/status/<reference>')
+def status_api(reference):
+    reference = reference.strip().upper()
+    email = request.args.get('email', '').strip().lower()
+    table = references.table_for(reference)
+    if table is None or not email:
+        return jsonify({"success": False, "message": "Reference and email are required"}), 400
 
-        cursor.execute('SELECT COUNT(*) FROM applications')
-        applications_count = cursor.fetchone()[0]
+    row = get_db().execute(
+        f'SELECT email, status, created_at FROM {table} WHERE reference = ?', (reference,)
+    ).fetchone()
+    if row is None or row['email'].strip().lower() != email:
+        return jsonify({"success": False, "message": "No submission found for that reference"}), 404
 
-        cursor.execute('SELECT COUNT(*) FROM newsletter')
-        newsletter_count = cursor.fetchone()[0]
+    return jsonify({
+        "success": True,
+        "reference": reference,
+        "type": "application" if table == 'applications' else "enquiry",
+        "status": row['status'],
+        "submitted_at": row['created_at']
+    })
 
-        conn.close()
 
-        return jsonify({
-            "success": True,
-            "stats": {
-                "contacts_today": random.randint(5, 20),
-                "applications_month": random.randint(50, 150),
-                "total_contacts": contacts_count,
-                "total_applications": applications_count,
-                "newsletter_subscribers": newsletter_count,
-                "visitors_today": random.randint(100, 500),
-                "timestamp": datetime.now().isoformat()
-            }
-        })
-    except Exception as e:
-        print(f"Stats error: {e}")
-        return jsonify({
+# /api/stats body for the given counts, or the placeholder figures when the
+# counters could not be read (counts is None); shared with asgi.py
+def stats_payload(counts):
+    if counts is None:
+        return {
             "success": True,
             "stats": {
                 "visitors": random.randint(1000, 5000),
                 "applications": random.randint(50, 200),
                 "timestamp": datetime.now().isoformat()
             }
-        })
+        }
+    return {
+        "success": True,
+        "stats": {
+            "contacts_today": counts["contacts_today"],
+            "applications_month": counts["applications_month"],
+            "total_contacts": counts["total_contacts"],
+            "total_applications": counts["total_applications"],
+            "newsletter_subscribers": counts["newsletter_subscribers"],
+            "visitors_today": random.randint(100, 500),
+            "timestamp": datetime.now().isoformat()
+        }
+    }
+
 
+@site.route('/api/stats')
+def stats_api():
+    # Get counts from the maintained counters (cached for STATS_CACHE_TTL)
+    try:
+        counts = current_app.extensions['stats_cache'].get('counts', lambda: load_counts(get_db()))
+        return jsonify(stats_payload(counts))
+    except Exception as e:
+        print(f"Stats error: {e}")
+        return jsonify(stats_payload(None))
 
-@app.route('/api/programs')
+
+@site.route('/api/programs')
 def api_programs():
-    return jsonify({
-        "success": True,
-        "programs": COLLEGE_DATA["programs"]
-    })
+    return current_app.response_class(content().api_json["programs"], mimetype='application/json')
 
 
-@app.route('/api/placements')
+@site.route('/api/placements')
 def api_placements():
-    return jsonify({
-        "success": True,
-        "placements": COLLEGE_DATA["placements"]
-    })
+    return current_app.response_class(content().api_json["placements"], mimetype='application/json')
 
 
-@app.route('/api/facilities')
+@site.route('/api/facilities')
 def api_facilities():
+    return current_app.response_class(content().api_json["facilities"], mimetype='application/json')
+
+
+@site.route('/api/faculty')
+def api_faculty():
+    return current_app.response_class(content().api_json["faculty"], mimetype='application/json')
+
+
+@site.route('/api/faculty/<department>')
+def api_faculty_department(department):
+    body = content().faculty_json.get(department)
+    if body is None:
+        return jsonify({"success": False, "message": "Unknown department"}), 404
+    return current_app.response_class(body, mimetype='application/json')
+
+@site.route('/api/search')
+def search_api():
+    query = request.args.get('q', '').strip()
+    kind = request.args.get('kind') or None
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), 50))
+    except ValueError:
+        limit = 10
+
+    if len(query) < 2:
+        return jsonify({"success": True, "query": query, "results": []})
+
     return jsonify({
         "success": True,
-        "facilities": COLLEGE_DATA["facilities"]
+        "query": query,
+        "results": current_app.extensions['search_index'].search(query, limit=limit, kind=kind)
     })
 
 
@@ -579,7 +386,7 @@ def api_facilities():
 # ADMIN ROUTES
 # ====================
 
-@app.route('/admin/login', methods=['GET', 'POST'])
+@site.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
     if request.method == 'POST':
         username = request.form.get('username')
@@ -590,7 +397,6 @@ def admin_login():
         cursor = conn.cursor()
         cursor.execute('SELECT password_hash FROM admin_users WHERE username = ?', (username,))
         result = cursor.fetchone()
-        conn.close()
 
         if result and check_password_hash(result['password_hash'], password):
             session['admin_logged_in'] = True
@@ -602,7 +408,7 @@ def admin_login():
     return render_template('admin/login.html')
 
 
-@app.route('/admin/logout')
+@site.route('/admin/logout')
 def admin_logout():
     session.pop('admin_logged_in', None)
     session.pop('admin_username', None)
@@ -619,20 +425,16 @@ def admin_required(f):
     return decorated_function
 
 
-@app.route('/admin/dashboard')
+@site.route('/admin/dashboard')
 @admin_required
 def admin_dashboard():
     conn = get_db()
     cursor = conn.cursor()
 
-    cursor.execute('SELECT COUNT(*) FROM contacts')
-    contacts_count = cursor.fetchone()[0]
-
-    cursor.execute('SELECT COUNT(*) FROM applications')
-    applications_count = cursor.fetchone()[0]
-
-    cursor.execute('SELECT COUNT(*) FROM newsletter')
-    newsletter_count = cursor.fetchone()[0]
+    counts = load_counts(conn)
+    contacts_count = counts["total_contacts"]
+    applications_count = counts["total_applications"]
+    newsletter_count = counts["newsletter_subscribers"]
 
     cursor.execute('SELECT * FROM contacts ORDER BY created_at DESC LIMIT 5')
     recent_contacts = cursor.fetchall()
@@ -640,8 +442,6 @@ def admin_dashboard():
     cursor.execute('SELECT * FROM applications ORDER BY created_at DESC LIMIT 5')
     recent_applications = cursor.fetchall()
 
-    conn.close()
-
     return render_template('admin/dashboard.html',
                            contacts_count=contacts_count,
                            applications_count=applications_count,
@@ -651,38 +451,90 @@ def admin_dashboard():
                            admin_username=session.get('admin_username'))
 
 
-@app.route('/admin/contacts')
+@site.route('/admin/cache/clear', methods=['POST'])
+@admin_required
+def admin_clear_cache():
+    pages = current_app.extensions['page_cache']
+    cleared = pages.clear()
+    current_app.jinja_env.fragment_cache.clear()
+    current_app.extensions['sitemaps'].clear()
+    return jsonify({"success": True, "cleared": cleared, "page_cache": pages.stats()})
+
+
+# Keyset-paginated listing shared by the admin pages. Query string:
+# status, program, from, to (YYYY-MM-DD), limit, cursor, format=json
+def admin_listing(table, template):
+    try:
+        filters = listing.parse_filters(table, request.args)
+        rows, next_cursor = listing.fetch_page(get_db(), table, filters,
+                                               cursor=request.args.get('cursor'),
+                                               limit=listing.page_size(request.args))
+    except listing.InvalidListingQuery as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            "success": True,
+            table: [dict(row) for row in rows],
+            "next_cursor": next_cursor,
+            "filters": filters
+        })
+
+    return render_template(template, **{table: rows}, next_cursor=next_cursor, filters=filters)
+
+
+# Streams CSV/NDJSON exports with the same filters as the listing pages.
+# Uses its own connection so the export can outlive the request context.
+@site.route('/admin/export/<table>.<fmt>')
+@admin_required
+def admin_export(table, fmt):
+    if table not in listing.LISTINGS or fmt not in listing.EXPORT_FORMATS:
+        return jsonify({"success": False, "message": "Unknown export"}), 404
+    try:
+        filters = listing.parse_filters(table, request.args)
+    except listing.InvalidListingQuery as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    mimetype, encode = listing.EXPORT_FORMATS[fmt]
+    pool = db.get_pool(current_app)
+
+    # The connection is opened on the first chunk, so a client that goes
+    # away before then never leaves one behind
+    def generate():
+        conn = pool.connect()
+        try:
+            yield from encode(listing.iter_rows(conn, table, filters))
+        finally:
+            conn.close()
+
+    filename = f"{table}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    response = current_app.response_class(generate(), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@site.route('/admin/contacts')
 @admin_required
 def admin_contacts():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM contacts ORDER BY created_at DESC')
-    contacts = cursor.fetchall()
-    conn.close()
-    return render_template('admin/contacts.html', contacts=contacts)
+    return admin_listing('contacts', 'admin/contacts.html')
 
 
-@app.route('/admin/applications')
+@site.route('/admin/applications')
 @admin_required
 def admin_applications():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM applications ORDER BY created_at DESC')
-    applications = cursor.fetchall()
-    conn.close()
-    return render_template('admin/applications.html', applications=applications)
+    return admin_listing('applications', 'admin/applications.html')
 
 
 # ====================
 # ERROR HANDLERS
 # ====================
 
-@app.errorhandler(404)
+@site.errorhandler(404)
 def page_not_found(e):
     return render_template('errors/404.html'), 404
 
 
-@app.errorhandler(500)
+@site.errorhandler(500)
 def internal_server_error(e):
     return render_template('errors/500.html'), 500
 
@@ -691,45 +543,149 @@ def internal_server_error(e):
 # UTILITY ROUTES
 # ====================
 
-@app.route('/sitemap.xml')
-def sitemap_xml():
-    pages = []
-    base_url = request.host_url.rstrip('/')
-
-    # Add all static routes
-    for rule in app.url_map.iter_rules():
-        if "GET" in rule.methods and len(rule.arguments) == 0:
-            url = base_url + str(rule)
-            if not url.endswith('/admin') and not url.endswith('/api'):
-                pages.append(url)
-
-    sitemap_xml = render_template('sitemap.xml', pages=pages, base_url=base_url)
-    response = make_response(sitemap_xml)
-    response.headers['Content-Type'] = 'application/xml'
-    return response
+# Built once per content version for SITE_URL, with gzip variants; large sets
+# are split behind a sitemap index (see sitemaps.py)
+@site.route('/sitemap.xml')
+@site.route('/sitemap.xml.gz', endpoint='sitemap_xml_gz')
+@site.route('/sitemap-<int:part>.xml', endpoint='sitemap_part')
+@site.route('/sitemap-<int:part>.xml.gz', endpoint='sitemap_part_gz')
+def sitemap_xml(part=None):
+    return current_app.extensions['sitemaps'].serve(request.path.lstrip('/'))
 
 
-@app.route('/feed.rss')
+@site.route('/feed.rss')
 def rss_feed():
-    feed_xml = render_template('feed.rss')
-    response = make_response(feed_xml)
-    response.headers['Content-Type'] = 'application/rss+xml'
-    return response
+    return current_app.extensions['sitemaps'].serve('feed.rss')
 
 
-@app.route('/health')
+@site.route('/health')
 def health_check():
+    write_buffer = current_app.extensions.get('write_buffer')
     return jsonify({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "service": "SBITM Website",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "db_pool": db.get_pool(current_app).stats(),
+        "write_buffer": write_buffer.stats() if write_buffer is not None else None,
+        "page_cache": current_app.extensions['page_cache'].stats(),
+        "submissions": current_app.extensions['submission_guard'].stats(),
+        "fragment_cache": current_app.jinja_env.fragment_cache.stats(),
+        "search": current_app.extensions['search_index'].stats(),
+        "sitemaps": current_app.extensions['sitemaps'].stats()
     })
 
-@app.route('/courses')
+@site.route('/courses')
 def courses():
     return render_template('courses.html')
 
+# ====================
+# APPLICATION FACTORY
+# ====================
+
+# config: a class from config.py, a profile name, or None for SBITM_CONFIG.
+# Keyword overrides are applied last, e.g. create_app(DATABASE=path) in tests.
+# Nothing here touches the database unless AUTO_MIGRATE is set; site content
+# and the search index load on first use.
+def create_app(config=None, **overrides):
+    app = Flask(__name__)
+    app.config.from_object(config if config is not None and not isinstance(config, str) else get_config(config))
+    app.config.update(overrides)
+    # Client addresses (rate limits, /metrics) and the scheme as the trusted
+    # reverse proxies saw them
+    if app.config['PROXY_HOPS']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_HOPS'], x_proto=app.config['PROXY_HOPS'])
+    # {% cache %} blocks for shared layout fragments (nav, footer, ...)
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+    # Schema versioning and 'flask migrate' (see migrations.py)
+    migrations.init_app(app)
+
+    # Node ID for ENQ/APP references (see references.py)
+    references.init_app(app)
+
+    # Database connections are pooled per app context (see db.py)
+    db.init_app(app)
+    atexit.register(db.get_pool(app).close_all)
+
+    # 'flask db backup|archive|vacuum|schedule' (see maintenance.py)
+    maintenance.init_app(app)
+
+    # Latency/SQL/render histograms at /metrics, optional slow-request
+    # profiles; must come before compression so sizes are as sent
+    metrics.init_app(app)
+
+    # gzip/brotli for static sidecars and large dynamic responses
+    compression.init_app(app)
+
+    # Content-hashed static URLs served with far-future caching
+    asset_manifest = assets.init_app(app)
+
+    # WebP/AVIF width variants of static/images, built lazily or via
+    # 'flask optimize-images'
+    images.init_app(app)
+
+    # 'flask vendor': Bootstrap, Font Awesome, AOS and the web fonts served from
+    # static/vendor, cut down to what the templates use; vendor_url() in the
+    # templates falls back to the CDNs until it has run
+    vendor.init_app(app)
+
+    # 'flask freeze': the public pages as static files for nginx, re-rendered
+    # only when something they read changes
+    freeze.init_app(app)
+
+    if app.config['WRITE_BUFFER_ENABLED']:
+        write_buffer = WriteBuffer(db.get_pool(app).connect,
+                                   max_queue=app.config['WRITE_BUFFER_MAX_QUEUE'],
+                                   batch_size=app.config['WRITE_BUFFER_BATCH_SIZE'],
+                                   flush_interval_ms=app.config['WRITE_BUFFER_FLUSH_MS'])
+        app.extensions['write_buffer'] = write_buffer
+        atexit.register(write_buffer.stop)
+
+    # 'flask newsletter import' and 'flask newsletter send'
+    newsletter.init_app(app)
+
+    # Per-IP/per-email token buckets and repeat-submission replay for the
+    # public POST APIs
+    ratelimit.init_app(app)
+
+    app.extensions['stats_cache'] = TTLCache(ttl=app.config['STATS_CACHE_TTL'])
+
+    # Site content lives in data.json and faculty.json; edits are picked up
+    # without a restart (see content.py)
+    content_store = ContentStore(os.path.join(app.root_path, 'data.json'),
+                                 os.path.join(app.root_path, 'faculty.json'),
+                                 check_interval=app.config['CONTENT_CHECK_INTERVAL'])
+    app.extensions['content_store'] = content_store
+
+    # Full-text index over programs, facilities, departments and faculty,
+    # rebuilt from every content snapshot including the first; a search loads
+    # the content itself if no page has yet
+    search_index = SearchIndex(refresh=content_store.current)
+    app.extensions['search_index'] = search_index
+    content_store.on_reload(
+        lambda snapshot: search_index.rebuild(college_documents(snapshot.college, snapshot.faculty))
+    )
+
+    # sitemap.xml and feed.rss, rebuilt when the content changes
+    sitemaps.init_app(app, content_store)
+
+    # Rendered pages only depend on templates, the content snapshot, the current
+    # month/year from inject_data() and the fingerprinted asset URLs
+    app.extensions['page_cache'] = PageCache(
+        max_bytes=app.config['PAGE_CACHE_MAX_BYTES'],
+        vary=lambda: (datetime.now().strftime('%Y-%m'), asset_manifest.version, content_store.current().version),
+        check_templates=app.config['TEMPLATES_AUTO_RELOAD']
+    )
+
+    site.register(app)
+
+    # Bytecode cache and boot-time template compilation (production profile)
+    configure_templates(app)
+
+    return app
+
+
 # ====================
 # MAIN ENTRY POINT
 # ====================
@@ -759,4 +715,5 @@ if __name__ == '__main__':
         os.makedirs(os.path.join(static_dir, 'images'))
         print("📁 Created static directories")
 
+    app = create_app()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
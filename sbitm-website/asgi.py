@@ -0,0 +1,15 @@
+# ASGI entry point, e.g.
+#
+#   flask --app wsgi migrate
+#   uvicorn asgi:app --workers 4
+#
+# Selects the production profile unless SBITM_CONFIG says otherwise. Needs
+# no dependencies beyond the ASGI server itself.
+import os
+
+os.environ.setdefault('SBITM_CONFIG', 'production')
+
+from app import create_app  # noqa: E402
+from async_api import AsyncSite  # noqa: E402
+
+app = AsyncSite(create_app())
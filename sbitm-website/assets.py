@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import threading
+
+from flask import request, url_for
+
+# Precompressed sidecars are served through their original file
+SKIP_SUFFIXES = ('.gz', '.br', '.tmp')
+IMMUTABLE_MAX_AGE = 31536000
+# App shell precached by the service worker; other images are cached on use
+PRECACHE_PREFIXES = ('css/', 'js/')
+PRECACHE_FILES = ('images/logo.png', 'images/favicon.ico')
+PRECACHE_PAGES = ('/',)
+SERVICE_WORKER = 'service-worker.js'
+
+
+def file_hash(path, length=10):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+def fingerprint(filename, digest):
+    base, ext = os.path.splitext(filename)
+    return f"{base}.{digest}{ext}"
+
+
+# Maps every file under static/ to a content-hashed name, e.g.
+# css/style.css -> css/style.3f2a9c1b0e.css
+class AssetManifest:
+    def __init__(self, static_folder, reload=False):
+        self.static_folder = static_folder
+        # Development: re-hash a file when its mtime changes
+        self.reload = reload
+        self._lock = threading.Lock()
+        self._by_name = {}
+        self._by_hashed = {}
+        self._lookup_hooks = []
+        # Changes whenever any fingerprint changes; cached HTML embeds
+        # fingerprinted URLs and keys on this
+        self.version = None
+        self.build()
+
+    def build(self):
+        by_name = {}
+        for root, _, files in os.walk(self.static_folder):
+            for name in files:
+                if name.endswith(SKIP_SUFFIXES):
+                    continue
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, self.static_folder).replace(os.sep, '/')
+                by_name[filename] = (fingerprint(filename, file_hash(path)), os.stat(path).st_mtime_ns)
+        with self._lock:
+            self._by_name = by_name
+            self._by_hashed = {hashed: name for name, (hashed, _) in by_name.items()}
+            self._update_version()
+
+    def _update_version(self):
+        digest = hashlib.sha256()
+        for name in sorted(self._by_name):
+            digest.update(self._by_name[name][0].encode('utf-8'))
+        self.version = digest.hexdigest()[:10]
+
+    def _refresh(self, filename):
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        entry = self._by_name.get(filename)
+        if entry is not None and entry[1] == mtime:
+            return
+        hashed = fingerprint(filename, file_hash(path))
+        with self._lock:
+            self._by_name[filename] = (hashed, mtime)
+            self._by_hashed[hashed] = filename
+            self._update_version()
+
+    # callback(filename) runs on every hashed() lookup; 'flask freeze' uses it
+    # to record which assets a page links
+    def add_lookup_hook(self, callback):
+        self._lookup_hooks.append(callback)
+
+    def remove_lookup_hook(self, callback):
+        self._lookup_hooks.remove(callback)
+
+    def hashed(self, filename):
+        for hook in self._lookup_hooks:
+            hook(filename)
+        if self.reload:
+            self._refresh(filename)
+        entry = self._by_name.get(filename)
+        return entry[0] if entry is not None else filename
+
+    def original(self, filename):
+        return self._by_hashed.get(filename)
+
+    def as_dict(self):
+        return {name: hashed for name, (hashed, _) in self._by_name.items()}
+
+    def precache_files(self):
+        return sorted(
+            name for name in self._by_name
+            if name != SERVICE_WORKER and (name.startswith(PRECACHE_PREFIXES) or name in PRECACHE_FILES)
+        )
+
+
+_service_worker_cache = {}
+
+
+# static/service-worker.js prefixed with a versioned precache list built from
+# the manifest; must be called inside a request so url_for() can build URLs
+def service_worker_script(app):
+    manifest = app.extensions['asset_manifest']
+    path = os.path.join(app.static_folder, SERVICE_WORKER)
+    key = (manifest.version, os.stat(path).st_mtime_ns)
+    script = _service_worker_cache.get(key)
+    if script is not None:
+        return script
+
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    urls = list(PRECACHE_PAGES) + [url_for('static', filename=name) for name in manifest.precache_files()]
+    version = hashlib.sha256((manifest.version + source).encode('utf-8')).hexdigest()[:10]
+    script = (f"const PRECACHE_VERSION = {json.dumps(version)};\n"
+              f"const PRECACHE_URLS = {json.dumps(urls, indent=4)};\n\n" + source)
+    _service_worker_cache.clear()
+    _service_worker_cache[key] = script
+    return script
+
+
+def init_app(app):
+    app.config.setdefault('ASSETS_RELOAD', False)
+    manifest = AssetManifest(app.static_folder, reload=app.config['ASSETS_RELOAD'])
+    app.extensions['asset_manifest'] = manifest
+
+    # url_for('static', filename=...) emits the fingerprinted name
+    @app.url_defaults
+    def hashed_static_url(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = manifest.hashed(values['filename'])
+
+    serve_static = app.view_functions['static']
+
+    # Fingerprinted URLs never change content, so they can be cached forever;
+    # plain URLs keep the default revalidation behaviour
+    def static(filename):
+        original = manifest.original(filename)
+        if original is None:
+            return serve_static(filename=filename)
+        response = serve_static(filename=original)
+        if response.status_code == 200 and request.method in ('GET', 'HEAD'):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        return response
+
+    app.view_functions['static'] = static
+
+    # {% cache %} blocks that embed fingerprinted URLs key on this, so a
+    # deploy that changes a fingerprint renders them again
+    @app.context_processor
+    def inject_asset_version():
+        return {"asset_version": manifest.version}
+
+    return manifest
@@ -0,0 +1,288 @@
+# The public form and stats APIs as native ASGI coroutines, with every
+# other route bridged to the Flask app (see asgi.py).
+#
+# Submissions are queued on the write buffer's writer thread and stats reads
+# go to a single DB thread, so thousands of open connections on these
+# endpoints cost no threads. Bridged routes run the Flask app on a small
+# thread pool, as under a threaded WSGI server.
+import asyncio
+import atexit
+import io
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+import forms
+from app import stats_payload, SERVER_BUSY
+from counters import load_counts
+from ratelimit import CONFLICT, IN_FLIGHT, KEY_REUSED, TOO_MANY
+from write_buffer import WriteBuffer, BufferFull
+
+JSON_HEADERS = [(b'content-type', b'application/json')]
+
+
+def _json_response(payload, status=200, headers=()):
+    return status, json.dumps(payload).encode('utf-8'), list(JSON_HEADERS) + list(headers)
+
+
+class AsyncSite:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        config = flask_app.config
+        self.max_body = config['ASGI_MAX_BODY']
+        self.proxy_hops = config['PROXY_HOPS']
+        self.wait_timeout = 10.0
+
+        # Async submissions always go through a write buffer: the sync
+        # app's if it has one, otherwise one of our own
+        self.write_buffer = flask_app.extensions.get('write_buffer')
+        self._own_buffer = self.write_buffer is None
+        if self._own_buffer:
+            self.write_buffer = WriteBuffer(db.get_pool(flask_app).connect,
+                                            max_queue=config['WRITE_BUFFER_MAX_QUEUE'],
+                                            batch_size=config['WRITE_BUFFER_BATCH_SIZE'],
+                                            flush_interval_ms=config['WRITE_BUFFER_FLUSH_MS'])
+            atexit.register(self.write_buffer.stop)
+
+        self.db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sbitm-db')
+        self.wsgi_executor = ThreadPoolExecutor(max_workers=config['ASGI_WSGI_THREADS'],
+                                                thread_name_prefix='sbitm-wsgi')
+
+        # (method, path) -> (endpoint name shared with the Flask view, handler)
+        self.routes = {
+            ('POST', '/api/contact'): ('contact_api', self.submission(forms.contact, "Contact form")),
+            ('POST', '/api/apply'): ('apply_api', self.submission(forms.application, "Application")),
+            ('POST', '/api/newsletter'): ('newsletter_api', self.submission(
+                forms.newsletter, "Newsletter", "Subscription failed. Please try again.")),
+            ('GET', '/api/stats'): ('stats_api', self.stats),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        route = self.routes.get((scope['method'], scope['path']))
+        if route is None:
+            await self.wsgi(scope, receive, send)
+            return
+
+        endpoint, handler = route
+        started = time.perf_counter()
+        status, body, headers = await handler(endpoint, scope, receive)
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': headers + [(b'content-length', str(len(body)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
+
+        metrics = self.flask_app.extensions.get('metrics')
+        if metrics is not None:
+            metrics.requests.inc(endpoint, scope['method'], status)
+            metrics.latency.observe(time.perf_counter() - started, endpoint, scope['method'])
+            metrics.response_size.observe(len(body), endpoint)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._own_buffer:
+                    await asyncio.get_running_loop().run_in_executor(None, self.write_buffer.stop)
+                self.db_executor.shutdown(wait=False)
+                self.wsgi_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    # Handler for one of the form APIs: same validation, limits, dedup and
+    # responses as the Flask view, with the write awaited on the buffer
+    def submission(self, build, label, failure="Server error. Please try again."):
+        async def handler(endpoint, scope, receive):
+            body = await self.read_body(receive)
+            if body is None:
+                return _json_response({"success": False, "message": "Request body too large"}, 413)
+            try:
+                data = json.loads(body or b'null')
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                return _json_response({"success": False, "message": "Invalid request body"}, 400)
+
+            guard = self.flask_app.extensions.get('submission_guard')
+            if guard is None or not guard.enabled:
+                return await self.persist(build, data, label, failure)
+
+            headers = dict(scope['headers'])
+            client = self.client_addr(scope, headers)
+            retry_after = guard.limit_ip(endpoint, client)
+            if retry_after:
+                return _json_response(TOO_MANY, 429, [(b'retry-after', guard.retry_after_header(retry_after).encode())])
+
+            idempotency_key = headers.get(b'idempotency-key', b'').decode('latin-1')
+            key, fingerprint = guard.dedup_key(endpoint, data, idempotency_key, client, data.get('email'))
+            fresh, replay = guard.dedup.claim(key, wait=False, fingerprint=fingerprint)
+            if replay is IN_FLIGHT:
+                # Rare (a double submit): wait for the first one off the loop
+                fresh, replay = await asyncio.get_running_loop().run_in_executor(
+                    None, guard.dedup.claim, key, True, fingerprint
+                )
+            if replay is CONFLICT:
+                return _json_response(KEY_REUSED, 422)
+            if not fresh:
+                guard.count_replay()
+                stored_body, status, mimetype = replay
+                return status, stored_body, [(b'content-type', mimetype.encode()),
+                                             (b'idempotent-replayed', b'true')]
+
+            response = None
+            try:
+                retry_after = guard.limit_email(endpoint, data.get('email'))
+                if retry_after:
+                    return _json_response(TOO_MANY, 429,
+                                          [(b'retry-after', guard.retry_after_header(retry_after).encode())])
+                response = await self.persist(build, data, label, failure)
+                return response
+            finally:
+                if response is not None and response[0] == 200:
+                    guard.dedup.finish(key, (response[1], 200, 'application/json'))
+                else:
+                    guard.dedup.abandon(key)
+
+        return handler
+
+    # The same address ProxyFix gives the Flask routes: the entry the
+    # outermost trusted proxy appended to X-Forwarded-For, else the peer
+    def client_addr(self, scope, headers):
+        client = (scope.get('client') or ('unknown',))[0]
+        forwarded = headers.get(b'x-forwarded-for')
+        if self.proxy_hops and forwarded:
+            addresses = [address.strip() for address in forwarded.decode('latin-1').split(',')]
+            if len(addresses) >= self.proxy_hops:
+                client = addresses[-self.proxy_hops]
+        return client
+
+    async def persist(self, build, data, label, failure):
+        try:
+            sql, params, payload = build(data)
+            await self.write_buffer.submit_async(sql, params, timeout=self.wait_timeout)
+            return _json_response(payload)
+        except forms.InvalidSubmission as e:
+            return _json_response({"success": False, "message": str(e)}, 400)
+        except BufferFull:
+            return _json_response(SERVER_BUSY, 503)
+        except Exception as e:
+            print(f"{label} error: {e}")
+            return _json_response({"success": False, "message": failure}, 500)
+
+    async def stats(self, endpoint, scope, receive):
+        cache = self.flask_app.extensions['stats_cache']
+        counts = cache.peek('counts')
+        if counts is None:
+            try:
+                counts = await asyncio.get_running_loop().run_in_executor(
+                    self.db_executor, cache.get, 'counts', self._load_counts
+                )
+            except Exception as e:
+                print(f"Stats error: {e}")
+        return _json_response(stats_payload(counts))
+
+    def _load_counts(self):
+        pool = db.get_pool(self.flask_app)
+        conn = pool.acquire()
+        try:
+            return load_counts(conn)
+        finally:
+            pool.release(conn)
+
+    # Minimal WSGI bridge: the Flask app runs on wsgi_executor and the body
+    # is relayed chunk by chunk, so streamed exports stay streamed
+    async def wsgi(self, scope, receive, send):
+        body = await self.read_body(receive) if scope['method'] not in ('GET', 'HEAD') else b''
+        if body is None:
+            await send({'type': 'http.response.start', 'status': 413, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        loop = asyncio.get_running_loop()
+        environ = self.environ(scope, body)
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                  for name, value in headers]
+            return write
+
+        def write(data):
+            raise RuntimeError("The legacy WSGI write() callable is not supported")
+
+        def first_chunk():
+            iterable = self.flask_app(environ, start_response)
+            iterator = iter(iterable)
+            return iterable, iterator, next(iterator, None)
+
+        iterable, iterator, chunk = await loop.run_in_executor(self.wsgi_executor, first_chunk)
+        try:
+            await send({'type': 'http.response.start', 'status': started['status'],
+                        'headers': started['headers']})
+            while chunk is not None:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await loop.run_in_executor(self.wsgi_executor, next, iterator, None)
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iterable, 'close'):
+                await loop.run_in_executor(self.wsgi_executor, iterable.close)
+
+    def environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+            'CONTENT_LENGTH': str(len(body)) if body else '',
+        }
+        for name, value in scope['headers']:
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_LENGTH':
+                continue
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+                continue
+            key = 'HTTP_' + name
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
@@ -0,0 +1,154 @@
+# Concurrency limits of the sync (threaded WSGI) and async (asgi.py) form
+# APIs when clients are slow.
+#
+#   python benchmarks/bench_async.py [--concurrency 10,100,1000] [--requests 3000]
+#                                    [--client-delay-ms 50] [--sync-threads 32]
+#
+# Each of N concurrent clients keeps posting /api/contact. A client takes
+# --client-delay-ms to deliver its body, as on a slow mobile link. The sync
+# path holds one of --sync-threads server threads for the whole request,
+# like a gthread worker, so throughput tops out at threads / delay. The async
+# path only awaits the body, so the thread count stays flat as N grows.
+#
+# Both paths run in-process through the write buffer against a throwaway
+# database; no ASGI server is needed.
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def payload(i):
+    return {"name": f"Async Bench {i}", "email": f"async{i}@example.com", "phone": "9876543210",
+            "subject": "Admissions", "message": "Benchmark enquiry."}
+
+
+class PeakThreads:
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+
+    def _watch(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def drive(concurrency, total, send_one):
+    counter = iter(range(total))
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            status = await send_one(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return time.perf_counter() - started, sorted(latencies), errors
+
+
+def sync_sender(app, delay, threads):
+    pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='sync-server')
+    local = threading.local()
+
+    def handle(i):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        time.sleep(delay)  # slow upload, holding the server thread
+        return client.post('/api/contact', json=payload(i)).status_code
+
+    async def send_one(i):
+        return await asyncio.get_running_loop().run_in_executor(pool, handle, i)
+
+    return send_one, pool
+
+
+def async_sender(site, delay):
+    async def send_one(i):
+        body = json.dumps(payload(i)).encode('utf-8')
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(delay)  # slow upload, costing no thread
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'POST', 'path': '/api/contact', 'query_string': b'',
+                 'headers': [(b'content-type', b'application/json')], 'client': ('127.0.0.1', 0),
+                 'server': ('localhost', 80), 'scheme': 'http', 'http_version': '1.1', 'root_path': ''}
+        await site(scope, receive, send)
+        return sent[0]['status']
+
+    return send_one
+
+
+def report(label, concurrency, elapsed, latencies, errors, threads):
+    p = lambda fraction: latencies[min(len(latencies) - 1, int(fraction * (len(latencies) - 1)))]  # noqa: E731
+    print(f"{label:<8}{concurrency:>8}{len(latencies) / elapsed:>10.0f}{statistics.median(latencies):>10.1f}"
+          f"{p(0.95):>10.1f}{p(0.99):>10.1f}{errors:>8}{threads:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--concurrency', default='10,100,1000')
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--client-delay-ms', type=float, default=50)
+    parser.add_argument('--sync-threads', type=int, default=32)
+    args = parser.parse_args()
+    delay = args.client_delay_ms / 1000
+
+    os.chdir(tempfile.mkdtemp(prefix='sbitm-bench-'))
+    os.environ['SBITM_RATE_LIMIT'] = '0'
+    os.environ['SBITM_WRITE_BUFFER'] = '1'
+    os.environ['SBITM_WRITE_BUFFER_MAX_QUEUE'] = '10000'
+    from app import create_app
+    from async_api import AsyncSite
+
+    app = create_app()
+    site = AsyncSite(app)
+
+    print(f"client delay {args.client_delay_ms:.0f} ms, {args.sync_threads} sync server threads")
+    print(f"{'path':<8}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+          f"{'threads':>9}")
+    for concurrency in [int(value) for value in args.concurrency.split(',')]:
+        send_one, pool = sync_sender(app, delay, args.sync_threads)
+        with PeakThreads() as threads:
+            elapsed, latencies, errors = asyncio.run(drive(concurrency, args.requests, send_one))
+        pool.shutdown()
+        report('sync', concurrency, elapsed, latencies, errors, threads.peak)
+
+        with PeakThreads() as threads:
+            elapsed, latencies, errors = asyncio.run(drive(concurrency, args.requests, async_sender(site, delay)))
+        report('async', concurrency, elapsed, latencies, errors, threads.peak)
+
+    print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Bytes-on-wire and CPU cost of compressing each page and static asset.
+#
+#   python benchmarks/bench_compression.py [--levels 1,6,9] [--repeat 20]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from compression import available_encodings, compress  # noqa: E402
+
+PAGES = ['/', '/about', '/academics', '/admissions', '/placements', '/faculty',
+         '/facilities', '/gallery', '/programs', '/departments', '/contact']
+ASSETS = ['css/style.css', 'css/home.css', 'css/main.css', 'js/script.js', 'js/turtle.js', 'js/main.js']
+
+
+def measure(data, encoding, level, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        compressed = compress(data, encoding, level)
+    cpu_ms = (time.process_time() - started) / repeat * 1000
+    return len(compressed), cpu_ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--levels', default='1,6,9')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(',')]
+
+    # A scratch database: the benchmark never touches sbitm_database.db
+    app = create_app(DATABASE=os.path.join(tempfile.mkdtemp(prefix='sbitm-bench-'), 'sbitm.db'))
+    client = app.test_client()
+    bodies = []
+    for path in PAGES:
+        response = client.get(path, headers={'Accept-Encoding': 'identity'})
+        bodies.append((path, response.get_data()))
+    for asset in ASSETS:
+        with open(os.path.join(app.static_folder, asset), 'rb') as f:
+            bodies.append(('/static/' + asset, f.read()))
+
+    header = f"{'resource':<28}{'identity':>10}"
+    for encoding in available_encodings():
+        for level in levels:
+            header += f"{f'{encoding}-{level} B':>14}{'ms':>8}"
+    print(header)
+
+    totals = {}
+    for path, data in bodies:
+        line = f"{path:<28}{len(data):>10}"
+        totals.setdefault('identity', 0)
+        totals['identity'] += len(data)
+        for encoding in available_encodings():
+            for level in levels:
+                size, cpu_ms = measure(data, encoding, level, args.repeat)
+                line += f"{size:>14}{cpu_ms:>8.2f}"
+                key = f'{encoding}-{level}'
+                saved, spent = totals.get(key, (0, 0.0))
+                totals[key] = (saved + size, spent + cpu_ms)
+        print(line)
+
+    print()
+    print(f"total identity bytes: {totals.pop('identity')}")
+    for key, (size, cpu_ms) in totals.items():
+        print(f"total {key}: {size} bytes, {cpu_ms:.2f} ms CPU")
+
+
+if __name__ == '__main__':
+    main()
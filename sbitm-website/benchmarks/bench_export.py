@@ -0,0 +1,77 @@
+# Throughput and memory of the streaming admin export.
+#
+#   python benchmarks/bench_export.py [--rows 500000] [--format csv|ndjson]
+#
+# Runs against a throwaway database in a temporary directory. RSS includes
+# database pages SQLite maps in (DB_MMAP_SIZE), which are file-backed.
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--format', choices=('csv', 'ndjson'), default='csv')
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='sbitm-bench-'))
+    from app import create_app, get_db
+    app = create_app()
+
+    with app.app_context():
+        conn = get_db()
+        batch = []
+        for i in range(args.rows):
+            batch.append((f'First{i}', f'Last{i}', f'user{i}@example.com', '9876543210',
+                          ('CSE', 'ME', 'CE', 'EE')[i % 4], '12th', 75.5, 'Benchmark row'))
+            if len(batch) == 10000:
+                conn.executemany('''
+                    INSERT INTO applications (first_name, last_name, email, phone, program, qualification,
+                                              percentage, message)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', batch)
+                batch = []
+        if batch:
+            conn.executemany('''
+                INSERT INTO applications (first_name, last_name, email, phone, program, qualification,
+                                          percentage, message)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', batch)
+        conn.commit()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+
+    rss_before = max_rss_mb()
+    started = time.perf_counter()
+    response = client.get(f'/admin/export/applications.{args.format}', buffered=False)
+    total_bytes = 0
+    lines = 0
+    for chunk in response.response:
+        total_bytes += len(chunk)
+        lines += chunk.count(b'\n')
+    response.close()
+    elapsed = time.perf_counter() - started
+
+    rows = lines - (1 if args.format == 'csv' else 0)
+    print(f"rows exported:   {rows}")
+    print(f"bytes:           {total_bytes / 1024 / 1024:.1f} MB")
+    print(f"elapsed:         {elapsed:.2f} s")
+    print(f"throughput:      {rows / elapsed:,.0f} rows/s, {total_bytes / 1024 / 1024 / elapsed:.1f} MB/s")
+    print(f"peak RSS growth: {max_rss_mb() - rss_before:.1f} MB (peak {max_rss_mb():.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
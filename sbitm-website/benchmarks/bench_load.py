@@ -0,0 +1,334 @@
+# Replays a realistic traffic mix and reports throughput, latency
+# percentiles and memory, against the test client or a real WSGI server.
+#
+#   python benchmarks/bench_load.py [--target client|server] [--requests 5000]
+#                                   [--concurrency 8] [--config development]
+#                                   [--compare results/<old>.json]
+#
+# The mix is page views across every page route, /api/stats polling and
+# bursts of /api/contact and /api/apply submissions, generated from --seed so
+# two runs replay the same sequence. Each run uses a throwaway database and
+# writes results/<commit>-<target>-<config>.json for comparing commits.
+import argparse
+import http.client
+import json
+import os
+import queue
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+sys.path.insert(0, APP_DIR)
+
+# Not page views: APIs, admin, assets and machine-readable endpoints
+NON_PAGE_PREFIXES = ('/api/', '/admin', '/static/', '/media/', '/metrics', '/health',
+                     '/service-worker.js', '/sitemap.xml', '/feed.rss')
+
+# Share of non-burst traffic; bursts are added on top
+MIX = (('page', 0.8), ('stats', 0.2))
+BURST_EVERY = 200
+BURST_SIZE = 25
+
+SERVER = '''
+import logging, sys
+from werkzeug.serving import make_server
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+from app import create_app
+server = make_server('127.0.0.1', int(sys.argv[1]), create_app(), threaded=True)
+print('ready', flush=True)
+server.serve_forever()
+'''
+
+
+def page_routes(app):
+    routes = []
+    for rule in app.url_map.iter_rules():
+        path = str(rule)
+        if 'GET' in rule.methods and not rule.arguments and not path.startswith(NON_PAGE_PREFIXES):
+            routes.append(path)
+    return sorted(routes)
+
+
+def contact_payload(i):
+    return {"name": f"Load Test {i}", "email": f"load{i}@example.com", "phone": "9876543210",
+            "subject": "Admissions", "message": "Benchmark enquiry about the B.Tech programmes."}
+
+
+def apply_payload(i):
+    return {"first_name": "Load", "last_name": f"Test{i}", "email": f"apply{i}@example.com",
+            "phone": "9876543210", "program": "CSE", "qualification": "12th", "percentage": 82.5,
+            "message": "Benchmark application."}
+
+
+# Deterministic request sequence: (group, method, path, json body)
+def build_schedule(pages, total, seed):
+    rng = random.Random(seed)
+    groups, weights = zip(*MIX)
+    schedule = []
+    while len(schedule) < total:
+        if schedule and len(schedule) % BURST_EVERY == 0:
+            for _ in range(BURST_SIZE):
+                i = len(schedule)
+                if rng.random() < 0.5:
+                    schedule.append(('contact', 'POST', '/api/contact', contact_payload(i)))
+                else:
+                    schedule.append(('apply', 'POST', '/api/apply', apply_payload(i)))
+            continue
+        group = rng.choices(groups, weights)[0]
+        if group == 'page':
+            schedule.append(('page', 'GET', rng.choice(pages), None))
+        else:
+            schedule.append(('stats', 'GET', '/api/stats', None))
+    return schedule[:total]
+
+
+class ClientTarget:
+    def __init__(self, app):
+        self.app = app
+
+    def session(self):
+        client = self.app.test_client()
+
+        def send(method, path, body):
+            response = client.open(path, method=method, json=body)
+            response.get_data()
+            return response.status_code
+
+        return send
+
+    def memory_mb(self):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def close(self):
+        pass
+
+
+class ServerTarget:
+    def __init__(self, workdir, env):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        self.process = subprocess.Popen([sys.executable, '-c', SERVER, str(self.port)], cwd=workdir, env=env,
+                                        stdout=subprocess.PIPE, text=True)
+        while self.process.stdout.readline().strip() != 'ready':
+            if self.process.poll() is not None:
+                raise RuntimeError("WSGI server failed to start")
+
+    def session(self):
+        def send(method, path, body):
+            conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+            try:
+                headers = {'Accept-Encoding': 'gzip'}
+                data = None
+                if body is not None:
+                    data = json.dumps(body)
+                    headers['Content-Type'] = 'application/json'
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                return response.status
+            finally:
+                conn.close()
+
+        return send
+
+    # Peak resident set of the server process (Linux)
+    def memory_mb(self):
+        with open(f'/proc/{self.process.pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+        return None
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+def run(target, schedule, concurrency):
+    pending = queue.Queue()
+    for item in schedule:
+        pending.put(item)
+    samples = []
+    lock = threading.Lock()
+
+    def worker():
+        send = target.session()
+        local = []
+        while True:
+            try:
+                group, method, path, body = pending.get_nowait()
+            except queue.Empty:
+                break
+            started = time.perf_counter()
+            try:
+                status = send(method, path, body)
+            except Exception:
+                status = 0
+            local.append((group, path, status, time.perf_counter() - started))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(sample[3] * 1000 for sample in samples)
+    errors = sum(1 for sample in samples if not 200 <= sample[2] < 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(latencies[-1], 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_report(result):
+    print(f"{'group':<12}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in [('overall', result['overall'])] + sorted(result['groups'].items()):
+        print(f"{name:<12}{stats['requests']:>10}{stats['errors']:>8}{stats['throughput_rps']:>10.1f}"
+              f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    if result['memory_mb'] is not None:
+        print(f"peak RSS: {result['memory_mb']:.1f} MB")
+
+
+def print_comparison(old, new):
+    print(f"\ncompared with {old['meta']['commit']} ({old['meta']['timestamp']})")
+    print(f"{'group':<12}{'rps':>16}{'p95 ms':>18}{'p99 ms':>18}")
+    for name in ['overall'] + sorted(new['groups']):
+        before = old['overall'] if name == 'overall' else old['groups'].get(name)
+        after = new['overall'] if name == 'overall' else new['groups'][name]
+        if before is None:
+            continue
+        cells = []
+        for key in ('throughput_rps', 'p95_ms', 'p99_ms'):
+            change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            cells.append(f"{after[key]:.1f} ({change:+.0f}%)")
+        print(f"{name:<12}{cells[0]:>16}{cells[1]:>18}{cells[2]:>18}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--target', choices=('client', 'server'), default='client')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--config', choices=('development', 'production'), default='development')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    compare = os.path.abspath(args.compare) if args.compare else None
+
+    workdir = tempfile.mkdtemp(prefix='sbitm-bench-')
+    os.chdir(workdir)
+    os.environ['SBITM_CONFIG'] = args.config
+    # Every simulated client shares one address; measure the app, not the limiter
+    os.environ['SBITM_RATE_LIMIT'] = '0'
+
+    import migrations
+    from app import create_app
+
+    migrations.migrate('sbitm_database.db')
+    app = create_app()
+    pages = []
+    probe = app.test_client()
+    app.logger.disabled = True  # routes with missing templates are reported below
+    for path in page_routes(app):
+        try:
+            status = probe.get(path).status_code
+        except Exception as e:
+            status = type(e).__name__
+        if status == 200:
+            pages.append(path)
+        else:
+            print(f"skipping {path} ({status})")
+    app.logger.disabled = False
+
+    if args.target == 'client':
+        target = ClientTarget(app)
+    else:
+        target = ServerTarget(workdir, dict(os.environ, PYTHONPATH=APP_DIR))
+
+    try:
+        schedule = build_schedule(pages, args.requests, args.seed)
+        run(target, schedule[:min(len(schedule), 200)], args.concurrency)  # warm-up
+        samples, elapsed = run(target, schedule, args.concurrency)
+        memory = target.memory_mb()
+    finally:
+        target.close()
+
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample[0], []).append(sample)
+    routes = {}
+    for sample in samples:
+        routes.setdefault(sample[1], []).append(sample)
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "target": args.target,
+            "config": args.config,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "python": sys.version.split()[0],
+        },
+        "elapsed_s": round(elapsed, 3),
+        "memory_mb": round(memory, 1) if memory is not None else None,
+        "overall": summarize(samples, elapsed),
+        "groups": {name: summarize(items, elapsed) for name, items in groups.items()},
+        "routes": {path: summarize(items, elapsed) for path, items in sorted(routes.items())},
+    }
+
+    print_report(result)
+
+    output = output or os.path.join(
+        RESULTS_DIR, f"{result['meta']['commit']}-{args.target}-{args.config}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"results: {output}")
+
+    if compare:
+        with open(compare) as f:
+            print_comparison(json.load(f), result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# Worker cold start and first-request latency per config profile.
+#
+#   python benchmarks/bench_startup.py [--runs 3] [--path /about]
+#
+# Each run is a fresh interpreter, like a newly forked worker. "cold" starts
+# with an empty template bytecode cache, "warm" reuses the previous run's.
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = '''
+import json, sys, time
+started = time.perf_counter()
+from wsgi import app
+booted = time.perf_counter()
+response = app.test_client().get(sys.argv[1])
+finished = time.perf_counter()
+print(json.dumps({"status": response.status_code,
+                  "boot_ms": (booted - started) * 1000,
+                  "first_request_ms": (finished - booted) * 1000}))
+'''
+
+
+def run_worker(path, env, cwd):
+    output = subprocess.run([sys.executable, '-c', WORKER, path], env=env, cwd=cwd,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--path', default='/about')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='sbitm-bench-')
+    cache_dir = os.path.join(workdir, 'template_cache')
+    base_env = dict(os.environ, PYTHONPATH=APP_DIR, SBITM_TEMPLATE_CACHE_DIR=cache_dir)
+
+    print(f"{'profile':<24}{'boot ms':>10}{'first request ms':>20}")
+    for profile, cold in (('development', True), ('production', True), ('production', False)):
+        env = dict(base_env, SBITM_CONFIG=profile)
+        boots, firsts = [], []
+        for _ in range(args.runs):
+            if cold:
+                shutil.rmtree(cache_dir, ignore_errors=True)
+            result = run_worker(args.path, env, workdir)
+            boots.append(result['boot_ms'])
+            firsts.append(result['first_request_ms'])
+        label = profile if profile == 'development' else f"{profile} ({'cold' if cold else 'warm'})"
+        print(f"{label:<24}{statistics.median(boots):>10.1f}{statistics.median(firsts):>20.1f}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
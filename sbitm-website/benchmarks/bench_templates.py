@@ -0,0 +1,51 @@
+# Per-route render time with and without the {% cache %} fragment cache.
+# The page cache is switched off so every request renders its template.
+#
+#   python benchmarks/bench_templates.py [--repeat 50]
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+
+ROUTES = ['/', '/about', '/academics', '/admissions', '/placements', '/faculty',
+          '/facilities', '/gallery', '/programs', '/departments', '/contact']
+
+
+def time_route(client, path, repeat):
+    client.get(path)  # compile the template and warm the caches
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.get(path)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    # A scratch database: the benchmark never touches sbitm_database.db
+    app = create_app(DATABASE=os.path.join(tempfile.mkdtemp(prefix='sbitm-bench-'), 'sbitm.db'))
+    app.extensions['page_cache'].enabled = False
+    fragments = app.jinja_env.fragment_cache
+    client = app.test_client()
+
+    print(f"{'route':<16}{'uncached ms':>14}{'fragments ms':>14}{'speedup':>10}")
+    for path in ROUTES:
+        fragments.enabled = False
+        before = time_route(client, path, args.repeat)
+        fragments.enabled = True
+        after = time_route(client, path, args.repeat)
+        print(f"{path:<16}{before:>14.3f}{after:>14.3f}{before / after:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
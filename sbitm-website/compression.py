@@ -0,0 +1,174 @@
+import gzip
+import mimetypes
+import os
+import tempfile
+import zlib
+
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.html', '.svg', '.json', '.xml', '.txt', '.ico')
+COMPRESSIBLE_MIMETYPES = frozenset([
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+    'application/javascript', 'application/json', 'application/xml',
+    'application/rss+xml', 'image/svg+xml', 'text/csv', 'application/x-ndjson'
+])
+SIDECARS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        # brotli quality runs 0-11; scale the shared 1-9 level onto it
+        return brotli.compress(data, quality=min(11, round(level * 11 / 9)))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+# Every worker runs this at boot, possibly at the same moment: each writes
+# its own temp file and the renames just replace one identical copy with
+# another. '.tmp' keeps half-written files out of the asset manifest.
+def _write_sidecar(target, data, mode):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), prefix=os.path.basename(target) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates 0600; the web server must be able to read it
+        os.chmod(tmp, mode & 0o777)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# Writes .gz/.br sidecars next to every compressible static asset.
+# Unchanged files are skipped, so this is cheap to run on every boot.
+def precompress_static(static_folder, level=9, min_size=512):
+    written = 0
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            if stat.st_size < min_size:
+                continue
+            data = None
+            for encoding, suffix in SIDECARS:
+                if encoding not in available_encodings():
+                    continue
+                target = path + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime_ns >= stat.st_mtime_ns:
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                compressed = compress(data, encoding, level)
+                if len(compressed) >= len(data):
+                    continue
+                _write_sidecar(target, compressed, stat.st_mode)
+                written += 1
+    return written
+
+
+def negotiate(candidates):
+    accepted = request.accept_encodings
+    best = None
+    best_quality = 0
+    for encoding in candidates:
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _gzip_stream(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def init_app(app):
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_STATIC_LEVEL', 9)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_STATIC_AT_STARTUP', True)
+
+    if app.config['COMPRESS_STATIC_AT_STARTUP']:
+        precompress_static(app.static_folder, level=app.config['COMPRESS_STATIC_LEVEL'])
+
+    serve_original = app.view_functions['static']
+
+    # Static files: pick a precompressed sidecar when the client accepts it
+    def static(filename):
+        path = safe_join(app.static_folder, filename)
+        candidates = [] if path is None else [
+            encoding for encoding, suffix in SIDECARS if os.path.isfile(path + suffix)
+        ]
+        encoding = negotiate(candidates) if candidates else None
+        if encoding is None:
+            response = serve_original(filename=filename)
+        else:
+            suffix = dict(SIDECARS)[encoding]
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype,
+                                           max_age=app.get_send_file_max_age(filename))
+            response.headers['Content-Encoding'] = encoding
+        if candidates:
+            response.vary.add('Accept-Encoding')
+        return response
+
+    app.view_functions['static'] = static
+
+    @app.cli.command('precompress')
+    def precompress_command():
+        count = precompress_static(app.static_folder, level=app.config['COMPRESS_STATIC_LEVEL'])
+        print(f"✅ Wrote {count} compressed static files")
+
+    # Dynamic responses: compress on the way out above the size threshold
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        if response.is_streamed:
+            if negotiate(('gzip',)) is None:
+                return response
+            response.response = _gzip_stream(response.response, app.config['COMPRESS_LEVEL'])
+            response.headers['Content-Encoding'] = 'gzip'
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < app.config['COMPRESS_MIN_SIZE']:
+                return response
+            encoding = negotiate(available_encodings())
+            if encoding is None:
+                return response
+            response.set_data(compress(data, encoding, app.config['COMPRESS_LEVEL']))
+            response.headers['Content-Encoding'] = encoding
+
+        # The encoded body is a different representation; a weak validator
+        # keeps If-None-Match working against the uncompressed ETag
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
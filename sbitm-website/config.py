@@ -0,0 +1,117 @@
+import os
+
+
+def _env(name, default, cast=str):
+    value = os.environ.get(name)
+    return cast(value) if value is not None else default
+
+
+def _flag(name, default):
+    return _env(name, default, lambda value: value == '1')
+
+
+class Config:
+    SECRET_KEY = "sbitm-pro-secret-2024-advanced"
+    DEBUG = False
+    TEMPLATES_AUTO_RELOAD = True
+    # Compiled Jinja templates shared by every worker; None disables it
+    TEMPLATE_CACHE_DIR = None
+    # Compile every template at boot so a broken one fails the deploy
+    PRECOMPILE_TEMPLATES = False
+    # Re-fingerprint a static file when it changes on disk
+    ASSETS_RELOAD = _flag('SBITM_ASSETS_RELOAD', False)
+
+    # Canonical scheme and host for absolute URLs ('flask freeze', sitemaps)
+    SITE_URL = _env('SBITM_SITE_URL', None)
+
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto are
+    # trusted; 0 takes the client address from the socket
+    PROXY_HOPS = _env('SBITM_PROXY_HOPS', 0, int)
+
+    # Node part of ENQ/APP references (0 to 4194303); defaults to the process
+    # ID, so set a distinct one per worker when workers in several
+    # containers or hosts write to the same database
+    NODE_ID = _env('SBITM_NODE_ID', None, int)
+
+    DATABASE = 'sbitm_database.db'
+    # Apply pending migrations in create_app(); production runs
+    # 'flask migrate' once per deploy instead
+    AUTO_MIGRATE = True
+    DB_POOL_SIZE = _env('SBITM_DB_POOL_SIZE', 8, int)
+    # Opt-in group-commit queue for form submissions
+    WRITE_BUFFER_ENABLED = _flag('SBITM_WRITE_BUFFER', False)
+    WRITE_BUFFER_WAIT = _flag('SBITM_WRITE_BUFFER_WAIT', True)
+    WRITE_BUFFER_MAX_QUEUE = _env('SBITM_WRITE_BUFFER_MAX_QUEUE', 1000, int)
+    WRITE_BUFFER_BATCH_SIZE = _env('SBITM_WRITE_BUFFER_BATCH_SIZE', 100, int)
+    WRITE_BUFFER_FLUSH_MS = _env('SBITM_WRITE_BUFFER_FLUSH_MS', 50, int)
+    PAGE_CACHE_MAX_BYTES = _env('SBITM_PAGE_CACHE_MAX_BYTES', 16 * 1024 * 1024, int)
+    COMPRESS_LEVEL = _env('SBITM_COMPRESS_LEVEL', 6, int)
+    COMPRESS_MIN_SIZE = _env('SBITM_COMPRESS_MIN_SIZE', 1024, int)
+    STATS_CACHE_TTL = _env('SBITM_STATS_CACHE_TTL', 5.0, float)
+    CONTENT_CHECK_INTERVAL = _env('SBITM_CONTENT_CHECK_INTERVAL', 2.0, float)
+    # Token buckets for the public POST APIs, e.g. '30/minute'
+    RATE_LIMIT_ENABLED = _flag('SBITM_RATE_LIMIT', True)
+    RATE_LIMIT_PER_IP = _env('SBITM_RATE_LIMIT_PER_IP', '30/minute')
+    RATE_LIMIT_PER_EMAIL = _env('SBITM_RATE_LIMIT_PER_EMAIL', '5/hour')
+    # Seconds a repeated submission gets the original response back
+    DEDUP_WINDOW = _env('SBITM_DEDUP_WINDOW', 120.0, float)
+    # asgi.py: threads running bridged Flask routes, largest accepted body
+    ASGI_WSGI_THREADS = _env('SBITM_ASGI_WSGI_THREADS', 16, int)
+    ASGI_MAX_BODY = _env('SBITM_ASGI_MAX_BODY', 64 * 1024, int)
+    # Fraction of requests run under cProfile; those slower than
+    # PROFILE_SLOW_MS are dumped to PROFILE_DIR. 0 disables profiling.
+    PROFILE_SAMPLE_RATE = _env('SBITM_PROFILE_SAMPLE_RATE', 0.0, float)
+    PROFILE_SLOW_MS = _env('SBITM_PROFILE_SLOW_MS', 500, int)
+    # Who may read /metrics besides a logged-in admin: comma-separated
+    # addresses or networks, e.g. '127.0.0.1,10.0.0.0/8'
+    METRICS_ALLOW_IPS = _env('SBITM_METRICS_ALLOW_IPS', '127.0.0.1,::1')
+    # SMTP server and pacing for 'flask newsletter send'
+    MAIL_SERVER = _env('SBITM_MAIL_SERVER', 'localhost')
+    MAIL_PORT = _env('SBITM_MAIL_PORT', 25, int)
+    MAIL_USE_TLS = _flag('SBITM_MAIL_TLS', False)
+    MAIL_USERNAME = _env('SBITM_MAIL_USERNAME', None)
+    MAIL_PASSWORD = _env('SBITM_MAIL_PASSWORD', None)
+    MAIL_SENDER = _env('SBITM_MAIL_SENDER', 'SBITM Betul <info@sbitm.edu.in>')
+    NEWSLETTER_WORKERS = _env('SBITM_NEWSLETTER_WORKERS', 4, int)
+    NEWSLETTER_RATE = _env('SBITM_NEWSLETTER_RATE', 10.0, float)
+    # 'flask db schedule': rotated online backups, yearly archives of old
+    # submissions and bounded incremental vacuum steps
+    BACKUP_KEEP = _env('SBITM_BACKUP_KEEP', 7, int)
+    BACKUP_INTERVAL_HOURS = _env('SBITM_BACKUP_INTERVAL_HOURS', 24.0, float)
+    ARCHIVE_AFTER_YEARS = _env('SBITM_ARCHIVE_AFTER_YEARS', 3, int)
+    VACUUM_STEP_PAGES = _env('SBITM_VACUUM_STEP_PAGES', 1000, int)
+    VACUUM_INTERVAL_MINUTES = _env('SBITM_VACUUM_INTERVAL_MINUTES', 60.0, float)
+
+
+class DevelopmentConfig(Config):
+    # create_app() runs before 'flask run --debug' sets DEBUG, so this can't
+    # follow app.debug
+    ASSETS_RELOAD = _flag('SBITM_ASSETS_RELOAD', True)
+
+
+# Templates never change under a running deploy: no per-render stat(),
+# bytecode shared across workers and restarts
+class ProductionConfig(Config):
+    SECRET_KEY = os.environ.get('SBITM_SECRET_KEY', Config.SECRET_KEY)
+    TEMPLATES_AUTO_RELOAD = False
+    SITE_URL = _env('SBITM_SITE_URL', 'https://www.sbitm.edu.in')
+    TEMPLATE_CACHE_DIR = _env('SBITM_TEMPLATE_CACHE_DIR',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'template_cache'))
+    PRECOMPILE_TEMPLATES = True
+    AUTO_MIGRATE = False
+    # nginx proxy_pass in front: without this every request would come from
+    # 127.0.0.1 and share one rate-limit bucket
+    PROXY_HOPS = _env('SBITM_PROXY_HOPS', 1, int)
+    # Scrapers must be listed explicitly
+    METRICS_ALLOW_IPS = _env('SBITM_METRICS_ALLOW_IPS', '')
+    CONTENT_CHECK_INTERVAL = _env('SBITM_CONTENT_CHECK_INTERVAL', 30.0, float)
+
+
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+}
+
+
+def get_config(name=None):
+    return CONFIGS[name or os.environ.get('SBITM_CONFIG', 'development')]
@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+
+def freeze(value):
+    # Read-only views so a request handler can't mutate shared content
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def _json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# One immutable, fully precomputed version of the site content. Requests only
+# look things up in it; a reload builds a new snapshot and swaps it in whole.
+class ContentSnapshot:
+    def __init__(self, college, faculty, version):
+        self.version = version
+        self.college = freeze(college)
+        self.faculty = freeze(faculty)
+
+        self.programs_by_code = MappingProxyType({
+            program["code"]: program
+            for programs in self.college.get("programs", {}).values()
+            for program in programs
+        })
+        self.departments_by_name = MappingProxyType({
+            department["name"]: department for department in self.college.get("departments", ())
+        })
+        self.faculty_heads = MappingProxyType({
+            department: members[0]
+            for department, members in self.faculty.items()
+            if members and members[0]["designation"].startswith("HOD")
+        })
+
+        # Serialised once so the JSON endpoints just write bytes
+        self.api_json = MappingProxyType({
+            "programs": _json({"success": True, "programs": college.get("programs", {})}),
+            "placements": _json({"success": True, "placements": college.get("placements", {})}),
+            "facilities": _json({"success": True, "facilities": college.get("facilities", [])}),
+            "faculty": _json({"success": True, "faculty": faculty}),
+        })
+        self.faculty_json = MappingProxyType({
+            department: _json({"success": True, "department": department, "faculty": members})
+            for department, members in faculty.items()
+        })
+
+
+class ContentStore:
+    def __init__(self, college_path, faculty_path, check_interval=2.0):
+        self.paths = (college_path, faculty_path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._views = []
+        self._next_check = 0.0
+        # Loaded on first use, not when the app is created
+        self._snapshot = None
+
+    def _mtimes(self):
+        return tuple(os.stat(path).st_mtime_ns for path in self.paths)
+
+    def _load(self):
+        version = self._mtimes()
+        college_path, faculty_path = self.paths
+        with open(college_path, encoding='utf-8') as f:
+            college = json.load(f)
+        with open(faculty_path, encoding='utf-8') as f:
+            faculty = json.load(f)
+        return ContentSnapshot(college, faculty, version)
+
+    # Called with the new snapshot after every successful reload
+    def on_reload(self, callback):
+        self._listeners.append(callback)
+
+    # callback(snapshot) returns what current() hands out instead, e.g. a
+    # wrapper noting which entries a render reads (see 'flask freeze')
+    def add_view(self, callback):
+        self._views.append(callback)
+
+    def remove_view(self, callback):
+        self._views.remove(callback)
+
+    def current(self):
+        if self._snapshot is None:
+            snapshot = self._first_load()
+        else:
+            now = time.monotonic()
+            if now >= self._next_check and self.check_interval is not None:
+                self._maybe_reload(now)
+            snapshot = self._snapshot
+        for view in self._views:
+            snapshot = view(snapshot)
+        return snapshot
+
+    def _first_load(self):
+        with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            snapshot = self._load()
+            # Listeners (e.g. the search index) are ready before anyone
+            # else sees the snapshot
+            for callback in self._listeners:
+                callback(snapshot)
+            self._next_check = time.monotonic() + (self.check_interval or 0)
+            self._snapshot = snapshot
+            return snapshot
+
+    def _maybe_reload(self, now):
+        if not self._lock.acquire(blocking=False):
+            return  # another thread is already checking
+        try:
+            self._next_check = now + self.check_interval
+            try:
+                if self._mtimes() == self._snapshot.version:
+                    return
+                snapshot = self._load()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # Keep serving the last good snapshot while the file is fixed
+                print(f"Content reload error: {e}")
+                return
+            self._snapshot = snapshot
+            print("🔄 Content reloaded")
+        finally:
+            self._lock.release()
+
+        for callback in self._listeners:
+            callback(snapshot)
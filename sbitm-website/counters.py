@@ -0,0 +1,124 @@
+import threading
+import time
+
+# Tables whose row counts are maintained by triggers: name -> timestamp column
+COUNTED_TABLES = {
+    'contacts': 'created_at',
+    'applications': 'created_at',
+    'newsletter': 'subscribed_at',
+}
+
+
+# Counter tables plus triggers that keep them current on every insert/delete,
+# whichever code path (request, write buffer, bulk import) does the write
+def create_counter_schema(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_counts (
+            day TEXT NOT NULL,
+            name TEXT NOT NULL,
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, name)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS monthly_counts (
+            month TEXT NOT NULL,
+            name TEXT NOT NULL,
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, name)
+        ) WITHOUT ROWID
+    ''')
+
+    for table, column in COUNTED_TABLES.items():
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_count_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO counters (name, value) VALUES ('{table}', 1)
+                    ON CONFLICT(name) DO UPDATE SET value = value + 1;
+                INSERT INTO daily_counts (day, name, value) VALUES (date(NEW.{column}), '{table}', 1)
+                    ON CONFLICT(day, name) DO UPDATE SET value = value + 1;
+                INSERT INTO monthly_counts (month, name, value) VALUES (strftime('%Y-%m', NEW.{column}), '{table}', 1)
+                    ON CONFLICT(month, name) DO UPDATE SET value = value + 1;
+            END
+        ''')
+        # Rollups record arrivals, so deletes only adjust the running total
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_count_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE counters SET value = value - 1 WHERE name = '{table}';
+            END
+        ''')
+
+    # Seed from existing rows the first time the counters are installed
+    cursor.execute('SELECT COUNT(*) FROM counters')
+    if cursor.fetchone()[0] == 0:
+        for table, column in COUNTED_TABLES.items():
+            cursor.execute(f"INSERT INTO counters (name, value) SELECT '{table}', COUNT(*) FROM {table}")
+            cursor.execute(f'''
+                INSERT INTO daily_counts (day, name, value)
+                SELECT date({column}), '{table}', COUNT(*) FROM {table} GROUP BY date({column})
+            ''')
+            cursor.execute(f'''
+                INSERT INTO monthly_counts (month, name, value)
+                SELECT strftime('%Y-%m', {column}), '{table}', COUNT(*) FROM {table}
+                GROUP BY strftime('%Y-%m', {column})
+            ''')
+
+
+# O(1) snapshot of the submission counts. Days and months are UTC, matching
+# SQLite's CURRENT_TIMESTAMP defaults.
+def load_counts(conn):
+    totals = dict(conn.execute('SELECT name, value FROM counters').fetchall())
+    today = dict(conn.execute(
+        "SELECT name, value FROM daily_counts WHERE day = date('now')"
+    ).fetchall())
+    month = dict(conn.execute(
+        "SELECT name, value FROM monthly_counts WHERE month = strftime('%Y-%m', 'now')"
+    ).fetchall())
+    return {
+        "total_contacts": totals.get('contacts', 0),
+        "total_applications": totals.get('applications', 0),
+        "newsletter_subscribers": totals.get('newsletter', 0),
+        "contacts_today": today.get('contacts', 0),
+        "applications_today": today.get('applications', 0),
+        "contacts_month": month.get('contacts', 0),
+        "applications_month": month.get('applications', 0),
+    }
+
+
+# Small in-process cache so a polling frontend doesn't touch SQLite per call
+class TTLCache:
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def get(self, key, loader):
+        now = time.monotonic()
+        cached = self._values.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+            value = loader()
+            self._values[key] = (time.monotonic() + self.ttl, value)
+            return value
+
+    # Cached value without loading on a miss (None if missing or expired)
+    def peek(self, key):
+        cached = self._values.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
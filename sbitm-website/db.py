@@ -0,0 +1,147 @@
+import queue
+import sqlite3
+import threading
+
+from flask import current_app, g
+
+
+# Pooled SQLite connections, checked out once per app context
+class ConnectionPool:
+    def __init__(self, database, max_size=8, timeout=5.0, busy_timeout=5000, mmap_size=64 * 1024 * 1024,
+                 factory=sqlite3.Connection):
+        self.database = database
+        # sqlite3.Connection subclass for new connections (see metrics.py)
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.busy_timeout = busy_timeout
+        self.mmap_size = mmap_size
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._timeouts = 0
+
+    # Opens a configured connection; also used directly by long-lived
+    # background threads that keep their own connection
+    def connect(self):
+        # Connections are handed between worker threads, so the pool (not
+        # sqlite3) guarantees only one thread uses a connection at a time
+        conn = sqlite3.connect(self.database, timeout=self.busy_timeout / 1000, check_same_thread=False,
+                               factory=self.factory)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout)}')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        return conn
+
+    def acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._hits += 1
+                self._in_use += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.max_size
+            if can_create:
+                self._created += 1
+                self._misses += 1
+            else:
+                self._waits += 1
+
+        if can_create:
+            try:
+                conn = self.connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        else:
+            try:
+                conn = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._timeouts += 1
+                raise TimeoutError(f"No database connection available after {self.timeout}s")
+
+        with self._lock:
+            self._in_use += 1
+        return conn
+
+    def release(self, conn):
+        with self._lock:
+            self._in_use -= 1
+        try:
+            # Never hand a half-finished transaction to the next request
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            with self._lock:
+                self._created -= 1
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self._created,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "hits": self._hits,
+                "misses": self._misses,
+                "waits": self._waits,
+                "timeouts": self._timeouts
+            }
+
+
+def get_pool(app):
+    return app.extensions['db_pool']
+
+
+def init_app(app):
+    app.config.setdefault('DB_POOL_SIZE', 8)
+    app.config.setdefault('DB_POOL_TIMEOUT', 5.0)
+    app.config.setdefault('DB_BUSY_TIMEOUT_MS', 5000)
+    app.config.setdefault('DB_MMAP_SIZE', 64 * 1024 * 1024)
+
+    app.extensions['db_pool'] = ConnectionPool(
+        app.config['DATABASE'],
+        max_size=app.config['DB_POOL_SIZE'],
+        timeout=app.config['DB_POOL_TIMEOUT'],
+        busy_timeout=app.config['DB_BUSY_TIMEOUT_MS'],
+        mmap_size=app.config['DB_MMAP_SIZE']
+    )
+
+    @app.teardown_appcontext
+    def release_db(exception):
+        conn = g.pop('_db', None)
+        if conn is not None:
+            get_pool(app).release(conn)
+
+
+# Connection for the current app context; returned to the pool on teardown
+def get_db():
+    if '_db' not in g:
+        g._db = get_pool(current_app).acquire()
+    return g._db
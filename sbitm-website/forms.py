@@ -0,0 +1,84 @@
+from references import new_reference
+
+
+# Validation and INSERT statements for the public form APIs, shared by the
+# Flask views in app.py and the async handlers in asgi.py. Each builder takes
+# the decoded JSON body and returns (sql, params, response payload).
+class InvalidSubmission(ValueError):
+    pass
+
+
+def _require_object(data):
+    if not isinstance(data, dict):
+        raise InvalidSubmission("Invalid request body")
+
+
+def contact(data):
+    _require_object(data)
+    name = data.get('name')
+    email = data.get('email')
+    if not name or not email:
+        raise InvalidSubmission("Name and email are required")
+
+    reference = new_reference('ENQ')
+    sql = '''
+        INSERT INTO contacts (name, email, phone, subject, message, reference)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''
+    params = (name, email, data.get('phone'), data.get('subject'), data.get('message'), reference)
+    return sql, params, {
+        "success": True,
+        "message": "Thank you! We'll contact you soon.",
+        "reference": reference
+    }
+
+
+def application(data):
+    _require_object(data)
+    required_fields = ['first_name', 'last_name', 'email', 'phone', 'program']
+    for field in required_fields:
+        if not data.get(field):
+            raise InvalidSubmission(f"{field.replace('_', ' ').title()} is required")
+
+    app_id = new_reference('APP')
+    sql = '''
+        INSERT INTO applications (first_name, last_name, email, phone, program, qualification, percentage, message,
+                                  reference)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    params = (data['first_name'], data['last_name'], data['email'], data['phone'], data['program'],
+              data.get('qualification'), data.get('percentage'), data.get('message'), app_id)
+    return sql, params, {
+        "success": True,
+        "message": "Application submitted successfully!",
+        "application_id": app_id,
+        "next_steps": "Our admissions team will contact you within 48 hours."
+    }
+
+
+# Deliberately loose: an '@' and no whitespace, which also keeps line breaks
+# out of the To: header of every campaign message
+def valid_email(email):
+    return isinstance(email, str) and '@' in email and not any(c.isspace() for c in email)
+
+
+# One statement whether or not the address is already subscribed; also used
+# by the bulk import in newsletter.py
+NEWSLETTER_UPSERT = '''
+    INSERT INTO newsletter (email) VALUES (?)
+    ON CONFLICT(email) DO UPDATE SET active = 1
+'''
+
+
+def newsletter(data):
+    _require_object(data)
+    email = data.get('email')
+    if not email:
+        raise InvalidSubmission("Email is required")
+    if not valid_email(email):
+        raise InvalidSubmission("Please enter a valid email address")
+
+    return NEWSLETTER_UPSERT, (email,), {
+        "success": True,
+        "message": "Successfully subscribed to newsletter!"
+    }
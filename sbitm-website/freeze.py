@@ -0,0 +1,368 @@
+import contextvars
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from collections.abc import Mapping
+
+import click
+from flask import template_rendered
+
+from compression import SIDECARS, available_encodings, compress
+from page_cache import template_chain
+from routes import public_paths, site_url
+
+# 'flask freeze' renders every argument-free GET page into a directory nginx
+# can serve on its own, e.g.
+#
+#   root /srv/sbitm/frozen;
+#   gzip_static on;                  # brotli_static on; with ngx_brotli
+#   location / { try_files $uri $uri/index.html @flask; }
+#   location ~ ^/(api|admin)/ { proxy_pass http://127.0.0.1:8000; }
+#   location @flask { proxy_pass http://127.0.0.1:8000; }
+#
+# Each page records what it read while rendering: templates, top-level
+# data.json/faculty.json entries, fingerprinted assets, images and the
+# month/year. The next run re-renders only pages where one of those changed.
+
+# Values from inject_data() that change over time
+TIME_VARIABLES = ('current_year', 'current_month')
+MANIFEST = '.freeze-manifest.json'
+MIN_SIDECAR_SIZE = 512
+MEDIA_URL = re.compile(r'/media/([0-9a-f]+)/(\d+)\.(\w+)')
+
+# Dependencies of the page being rendered in this context; None elsewhere,
+# so the lookup hooks cost other requests nothing
+_recording = contextvars.ContextVar('freeze_recording', default=None)
+
+
+def _digest(data):
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def _json_digest(value):
+    # MappingProxyType isn't JSON serialisable; tuples already are
+    return _digest(json.dumps(value, sort_keys=True, default=dict).encode('utf-8'))
+
+
+# Read-only view of a content mapping that notes which entries were read.
+# Iterating or sizing it depends on the whole mapping.
+class _TrackedMapping(Mapping):
+    def __init__(self, name, mapping, used):
+        self._name = name
+        self._mapping = mapping
+        self._used = used
+
+    def __getitem__(self, key):
+        self._used.add(f"{self._name}:{key}")
+        return self._mapping[key]
+
+    def __iter__(self):
+        self._used.add(self._name)
+        return iter(self._mapping)
+
+    def __len__(self):
+        self._used.add(self._name)
+        return len(self._mapping)
+
+
+class _TrackedSnapshot:
+    def __init__(self, snapshot, used):
+        self._snapshot = snapshot
+        self._used = used
+        self.version = snapshot.version
+        self.college = _TrackedMapping('data', snapshot.college, used)
+        self.faculty = _TrackedMapping('faculty', snapshot.faculty, used)
+
+    def __getattr__(self, name):
+        # Derived lookups (programs_by_code, api_json, ...) span all content
+        self._used.update(('data', 'faculty'))
+        return getattr(self._snapshot, name)
+
+
+def _record_asset(filename):
+    used = _recording.get()
+    if used is not None:
+        used.add(f"asset:{filename}")
+
+
+def _record_image(filename):
+    used = _recording.get()
+    if used is not None:
+        used.add(f"image:{filename}")
+
+
+def _tracked_view(snapshot):
+    used = _recording.get()
+    return snapshot if used is None else _TrackedSnapshot(snapshot, used)
+
+
+def output_name(path):
+    # '/' -> index.html, '/about' -> about/index.html, '/feed.rss' as is
+    name = path.strip('/')
+    if not name:
+        return 'index.html'
+    if os.path.splitext(name)[1]:
+        return name
+    return f"{name}/index.html"
+
+
+# Current value of every dependency a page can record; computed lazily and
+# once per run
+class _Dependencies:
+    def __init__(self, app, content, time_values):
+        self.app = app
+        self.content = content
+        self.time_values = time_values
+        self._values = {}
+
+    def value(self, dependency):
+        if dependency not in self._values:
+            self._values[dependency] = self._compute(dependency)
+        return self._values[dependency]
+
+    def _compute(self, dependency):
+        kind, _, name = dependency.partition(':')
+        if kind == 'template':
+            try:
+                with open(os.path.join(self.app.root_path, name), 'rb') as f:
+                    return _digest(f.read())
+            except OSError:
+                return None
+        if kind in ('data', 'faculty'):
+            mapping = self.content.college if kind == 'data' else self.content.faculty
+            return _json_digest(mapping.get(name) if name else mapping)
+        if kind == 'asset':
+            return self.app.extensions['asset_manifest'].hashed(name)
+        if kind == 'image':
+            source = self.app.extensions['image_pipeline'].source(name)
+            return source[1] if source is not None else None
+        if kind == 'time':
+            return self.time_values.get(name)
+        return None
+
+    def unchanged(self, recorded):
+        return all(self.value(dependency) == value for dependency, value in recorded.items())
+
+
+class Freezer:
+    def __init__(self, app, output_dir, base_url):
+        self.app = app
+        self.output_dir = output_dir
+        self.base_url = base_url
+        self.manifest_path = os.path.join(output_dir, MANIFEST)
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _code_version(self):
+        # Views live in the .py files; any change to them rebuilds everything
+        digest = hashlib.sha1()
+        for name in sorted(os.listdir(self.app.root_path)):
+            if name.endswith('.py'):
+                with open(os.path.join(self.app.root_path, name), 'rb') as f:
+                    digest.update(f.read())
+        return digest.hexdigest()[:16]
+
+    def _time_values(self):
+        with self.app.test_request_context(base_url=self.base_url):
+            context = {}
+            self.app.update_template_context(context)
+        return {name: str(context.get(name)) for name in TIME_VARIABLES}
+
+    def _write(self, name, body):
+        # Returns True if the file changed; unchanged files keep their mtime
+        # so rsync and nginx's ETags stay stable
+        path = os.path.join(self.output_dir, name)
+        try:
+            with open(path, 'rb') as f:
+                if f.read() == body:
+                    return False
+        except OSError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(body)
+        os.replace(tmp, path)
+        return True
+
+    def _write_page(self, name, body):
+        files = [name]
+        if not self._write(name, body):
+            return files
+        for encoding, suffix in SIDECARS:
+            sidecar = os.path.join(self.output_dir, name + suffix)
+            if encoding in available_encodings() and len(body) >= MIN_SIDECAR_SIZE:
+                compressed = compress(body, encoding, 9)
+                if len(compressed) < len(body):
+                    self._write(name + suffix, compressed)
+                    continue
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+        return files
+
+    def _remove(self, name):
+        for suffix in ('',) + tuple(suffix for _, suffix in SIDECARS):
+            path = os.path.join(self.output_dir, name + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def _copy(source, target):
+        # Copies only when size or mtime differ, like rsync
+        try:
+            src, dst = os.stat(source), os.stat(target)
+            if src.st_size == dst.st_size and src.st_mtime_ns == dst.st_mtime_ns:
+                return False
+        except OSError:
+            pass
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(source, target)
+        return True
+
+    # static/ under both plain and fingerprinted names, with their sidecars
+    def copy_static(self):
+        copied = 0
+        static_folder = self.app.static_folder
+        for name, hashed in self.app.extensions['asset_manifest'].as_dict().items():
+            for suffix in ('',) + tuple(suffix for _, suffix in SIDECARS):
+                source = os.path.join(static_folder, name + suffix)
+                if not os.path.exists(source):
+                    continue
+                for target_name in {name, hashed}:
+                    copied += self._copy(source, os.path.join(self.output_dir, 'static', target_name + suffix))
+        return copied
+
+    # Image variants referenced by a page; content-addressed, so existing
+    # files are never rewritten
+    def copy_media(self, body):
+        pipeline = self.app.extensions['image_pipeline']
+        for digest, width, fmt in set(MEDIA_URL.findall(body.decode('utf-8', 'replace'))):
+            target = os.path.join(self.output_dir, 'media', digest, f"{width}.{fmt}")
+            if os.path.exists(target):
+                continue
+            source = pipeline.ensure_variant(digest, int(width), fmt)
+            if source is not None:
+                self._copy(source, target)
+
+    def _render(self, client, path):
+        used = set()
+        templates = []
+
+        def record_template(sender, template, context, **extra):
+            templates.append(template.name)
+
+        token = _recording.set(used)
+        try:
+            with template_rendered.connected_to(record_template, self.app):
+                response = client.get(path, base_url=self.base_url, headers={'Accept-Encoding': 'identity'})
+        finally:
+            _recording.reset(token)
+
+        for name in templates:
+            paths, variables = template_chain(self.app.jinja_env, name)
+            used.update(f"template:{os.path.relpath(p, self.app.root_path)}" for p in paths)
+            used.update(f"time:{variable}" for variable in variables if variable in TIME_VARIABLES)
+        return response, used, bool(templates)
+
+    def freeze(self, force=False):
+        app = self.app
+        os.makedirs(self.output_dir, exist_ok=True)
+        previous = self._load_manifest()
+        code = self._code_version()
+        if previous.get('code') != code or previous.get('base_url') != self.base_url:
+            force = True
+        old_pages = previous.get('pages', {})
+        pages = {}
+        report = {"rendered": 0, "unchanged": 0, "failed": 0, "removed": 0}
+
+        store = app.extensions['content_store']
+        manifest = app.extensions['asset_manifest']
+        pipeline = app.extensions['image_pipeline']
+        dependencies = _Dependencies(app, store.current(), self._time_values())
+        page_cache = app.extensions['page_cache']
+        fragment_cache = app.jinja_env.fragment_cache
+        # Caches would skip the lookups being tracked
+        cache_state = page_cache.enabled, fragment_cache.enabled
+        page_cache.enabled = fragment_cache.enabled = False
+        store.add_view(_tracked_view)
+        manifest.add_lookup_hook(_record_asset)
+        pipeline.add_lookup_hook(_record_image)
+        try:
+            client = app.test_client()
+            for path in public_paths(app):
+                old = old_pages.get(path)
+                if (not force and old is not None and old['deps'] is not None
+                        and dependencies.unchanged(old['deps'])
+                        and all(os.path.exists(os.path.join(self.output_dir, f)) for f in old['files'])):
+                    pages[path] = old
+                    report["unchanged"] += 1
+                    continue
+
+                try:
+                    response, used, tracked = self._render(client, path)
+                    status = response.status_code
+                except Exception as e:
+                    status = f"{type(e).__name__}: {e}"
+                if status != 200:
+                    print(f"❌ {path}: {status}, left to Flask")
+                    report["failed"] += 1
+                    continue
+                body = response.get_data()
+                files = self._write_page(output_name(path), body)
+                self.copy_media(body)
+                # Responses not built from a template (e.g. the service
+                # worker) can't be tracked and are rendered every run
+                pages[path] = {
+                    "files": files,
+                    "deps": {dependency: dependencies.value(dependency) for dependency in sorted(used)}
+                    if tracked else None
+                }
+                report["rendered"] += 1
+        finally:
+            store.remove_view(_tracked_view)
+            manifest.remove_lookup_hook(_record_asset)
+            pipeline.remove_lookup_hook(_record_image)
+            page_cache.enabled, fragment_cache.enabled = cache_state
+
+        for path, old in old_pages.items():
+            stale = set(old['files']) - set(pages.get(path, {}).get('files', ()))
+            for name in stale:
+                self._remove(name)
+                report["removed"] += 1
+
+        report["static"] = self.copy_static()
+        self._write(MANIFEST, json.dumps({"code": code, "base_url": self.base_url, "pages": pages},
+                                         indent=2, sort_keys=True).encode('utf-8'))
+        return report
+
+
+def init_app(app):
+    app.config.setdefault('FREEZE_DIR', os.path.join(app.root_path, 'frozen'))
+    # Absolute URLs in the frozen sitemap.xml and feed.rss; defaults to
+    # SITE_URL, then SERVER_NAME
+    app.config.setdefault('FREEZE_BASE_URL', None)
+
+    @app.cli.command('freeze')
+    @click.option('--output', default=None, help='Output directory (default: FREEZE_DIR).')
+    @click.option('--base-url', default=None, help='Scheme and host absolute URLs are built with.')
+    @click.option('--force', is_flag=True, help='Re-render every page.')
+    def freeze_command(output, base_url, force):
+        base_url = base_url or app.config['FREEZE_BASE_URL'] or site_url(app)
+        if not base_url:
+            # Otherwise the sitemap and feed nginx serves would point at localhost
+            raise click.UsageError('No base URL: pass --base-url or set SBITM_SITE_URL or SERVER_NAME.')
+        started = time.perf_counter()
+        freezer = Freezer(app, os.path.abspath(output or app.config['FREEZE_DIR']), base_url.rstrip('/'))
+        report = freezer.freeze(force=force)
+        print(f"✅ Froze {report['rendered']} pages, {report['unchanged']} unchanged, "
+              f"{report['failed']} left to Flask, {report['removed']} stale files removed, "
+              f"{report['static']} static files copied in {(time.perf_counter() - started) * 1000:.0f} ms "
+              f"-> {freezer.output_dir}")
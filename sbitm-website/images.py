@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from flask import abort, send_from_directory, url_for
+from markupsafe import Markup, escape
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is optional; without it pages use the original images
+    Image = None
+    features = None
+
+
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+DEFAULT_WIDTHS = (480, 960, 1600)
+# Preferred first; browsers take the first <source> they support
+FORMATS = (('avif', 'image/avif', 50), ('webp', 'image/webp', 80))
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def available_formats():
+    if Image is None:
+        return ()
+    return tuple(fmt for fmt, _, _ in FORMATS if features.check(fmt))
+
+
+# Content-addressed variants of the images under static/. Byte-identical
+# sources share one digest, so duplicates are only processed once.
+class ImagePipeline:
+    def __init__(self, static_folder, cache_dir, widths=DEFAULT_WIDTHS):
+        self.static_folder = static_folder
+        self.cache_dir = cache_dir
+        self.widths = tuple(sorted(widths))
+        self._lock = threading.Lock()
+        self._sources = {}   # filename -> (mtime, digest, width, height)
+        self._by_digest = {}  # digest -> filename
+        self._lookup_hooks = []
+
+    # callback(filename) runs on every source() lookup (see 'flask freeze')
+    def add_lookup_hook(self, callback):
+        self._lookup_hooks.append(callback)
+
+    def remove_lookup_hook(self, callback):
+        self._lookup_hooks.remove(callback)
+
+    def source(self, filename):
+        for hook in self._lookup_hooks:
+            hook(filename)
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._sources.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached
+
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        with Image.open(path) as image:
+            width, height = image.size
+        entry = (mtime, digest, width, height)
+        with self._lock:
+            self._sources[filename] = entry
+            self._by_digest.setdefault(digest, filename)
+        return entry
+
+    def widths_for(self, width):
+        # Never upscale; the original width is always the largest candidate
+        return tuple(w for w in self.widths if w < width) + (width,)
+
+    def variant_path(self, digest, width, fmt):
+        return os.path.join(self.cache_dir, f"{digest}-{width}.{fmt}")
+
+    # Builds one variant on disk if it isn't there yet; returns its path
+    def ensure_variant(self, digest, width, fmt):
+        target = self.variant_path(digest, width, fmt)
+        if os.path.exists(target):
+            return target
+        if fmt not in available_formats():
+            return None
+        filename = self._by_digest.get(digest)
+        if filename is None:
+            # Fresh process: index the sources once to resolve the digest
+            for name in self.scan():
+                self.source(name)
+            filename = self._by_digest.get(digest)
+        if filename is None:
+            return None
+        source = self.source(filename)
+        if source is None or width not in self.widths_for(source[2]):
+            return None
+
+        quality = dict((f, q) for f, _, q in FORMATS)[fmt]
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with Image.open(os.path.join(self.static_folder, filename)) as image:
+            if image.width != width:
+                height = round(image.height * width / image.width)
+                image = image.resize((width, height), Image.LANCZOS)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            # Concurrent requests for the same variant, from any thread or
+            # worker, each write their own file; the rename is atomic
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=os.path.basename(target) + '.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    image.save(f, format=fmt.upper(), quality=quality)
+                os.chmod(tmp, 0o644)
+                os.replace(tmp, target)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        return target
+
+    def scan(self):
+        for root, _, files in os.walk(self.static_folder):
+            for name in sorted(files):
+                if name.lower().endswith(SOURCE_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, self.static_folder).replace(os.sep, '/')
+
+    # Generates every variant and returns per-image byte savings
+    def optimize_all(self):
+        report = []
+        seen = {}
+        for filename in self.scan():
+            source = self.source(filename)
+            _, digest, width, _ = source
+            original_bytes = os.path.getsize(os.path.join(self.static_folder, filename))
+            entry = {"image": filename, "digest": digest, "bytes": original_bytes, "variants": {}}
+            if digest in seen:
+                entry["duplicate_of"] = seen[digest]
+                report.append(entry)
+                continue
+            seen[digest] = filename
+            for fmt in available_formats():
+                for w in self.widths_for(width):
+                    path = self.ensure_variant(digest, w, fmt)
+                    entry["variants"][f"{fmt}-{w}"] = os.path.getsize(path)
+                full = entry["variants"].get(f"{fmt}-{width}")
+                if full is not None:
+                    entry[f"{fmt}_saved"] = original_bytes - full
+            report.append(entry)
+        return report
+
+
+def init_app(app):
+    app.config.setdefault('IMAGE_CACHE_DIR', os.path.join(app.root_path, 'image_cache'))
+    app.config.setdefault('IMAGE_WIDTHS', DEFAULT_WIDTHS)
+
+    pipeline = ImagePipeline(app.static_folder, app.config['IMAGE_CACHE_DIR'], app.config['IMAGE_WIDTHS'])
+    app.extensions['image_pipeline'] = pipeline
+
+    # Variants are generated on first request, then served from disk
+    @app.route('/media/<digest>/<int:width>.<fmt>')
+    def image_variant(digest, width, fmt):
+        path = pipeline.ensure_variant(digest, width, fmt)
+        if path is None:
+            abort(404)
+        response = send_from_directory(pipeline.cache_dir, os.path.basename(path),
+                                       mimetype=dict((f, m) for f, m, _ in FORMATS)[fmt])
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        return response
+
+    # {{ picture('images/campus.png', alt='Campus', class='img-fluid') }}
+    @app.template_global()
+    def picture(filename, alt='', sizes='100vw', **attrs):
+        fallback = url_for('static', filename=filename)
+        attributes = ''.join(
+            f' {escape(name.rstrip("_").replace("_", "-"))}="{escape(value)}"' for name, value in attrs.items()
+        )
+        img = Markup(f'<img src="{escape(fallback)}" alt="{escape(alt)}" loading="lazy" decoding="async"{attributes}>')
+        if not available_formats():
+            return img
+        source = pipeline.source(filename)
+        if source is None:
+            return img
+
+        _, digest, width, height = source
+        img = Markup(f'<img src="{escape(fallback)}" alt="{escape(alt)}" width="{width}" height="{height}" '
+                     f'loading="lazy" decoding="async"{attributes}>')
+        sources = []
+        for fmt, mimetype, _ in FORMATS:
+            if fmt not in available_formats():
+                continue
+            srcset = ', '.join(
+                f"{url_for('image_variant', digest=digest, width=w, fmt=fmt)} {w}w"
+                for w in pipeline.widths_for(width)
+            )
+            sources.append(f'<source type="{mimetype}" srcset="{escape(srcset)}" sizes="{escape(sizes)}">')
+        return Markup('<picture>' + ''.join(sources)) + img + Markup('</picture>')
+
+    @app.cli.command('optimize-images')
+    def optimize_images_command():
+        if Image is None:
+            print("❌ Pillow is not installed; run: pip install Pillow")
+            return
+        report = pipeline.optimize_all()
+        total_saved = 0
+        for entry in report:
+            if "duplicate_of" in entry:
+                print(f"🔁 {entry['image']}: identical to {entry['duplicate_of']}")
+                continue
+            savings = ', '.join(
+                f"{fmt} -{entry[f'{fmt}_saved'] // 1024} KB" for fmt in available_formats() if f'{fmt}_saved' in entry
+            )
+            print(f"🖼️  {entry['image']}: {entry['bytes'] // 1024} KB -> {savings}")
+            total_saved += max((entry.get(f'{fmt}_saved', 0) for fmt in available_formats()), default=0)
+        with open(os.path.join(pipeline.cache_dir, 'report.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Saved {total_saved // 1024} KB on full-size images; report in {pipeline.cache_dir}/report.json")
+
+    return pipeline
@@ -0,0 +1,147 @@
+import base64
+import csv
+import io
+import json
+import re
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Filterable columns per admin listing
+LISTINGS = {
+    'contacts': ('status',),
+    'applications': ('status', 'program'),
+}
+
+
+# Every listing is ordered by (created_at, id) descending; each equality
+# filter gets its own index ending in those columns so filtered pages are
+# also a straight index walk
+def create_listing_indexes(cursor):
+    for table, columns in LISTINGS.items():
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_created ON {table} (created_at, id)')
+        for column in columns:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column}, created_at, id)'
+            )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_email ON {table} (email)')
+
+
+class InvalidListingQuery(ValueError):
+    pass
+
+
+def encode_cursor(row):
+    raw = f"{row['created_at']}|{row['id']}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(value):
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode('utf-8')
+        created_at, row_id = raw.rsplit('|', 1)
+        return created_at, int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidListingQuery("Invalid cursor")
+
+
+# Filters from the query string: status, program, from/to (YYYY-MM-DD)
+def parse_filters(table, args):
+    filters = {}
+    for column in LISTINGS[table]:
+        value = args.get(column)
+        if value:
+            filters[column] = value
+    for key in ('from', 'to'):
+        value = args.get(key)
+        if value:
+            # strptime() rejects 2024-13-45, which date() would turn into NULL
+            # and so an empty listing; the pattern rejects 2024-1-5
+            try:
+                if not DATE_RE.match(value):
+                    raise ValueError(value)
+                datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                raise InvalidListingQuery(f"'{key}' must be a date as YYYY-MM-DD")
+            filters[key] = value
+    return filters
+
+
+def where_clause(filters, cursor=None):
+    clauses = []
+    params = []
+    for column, value in filters.items():
+        if column == 'from':
+            clauses.append('created_at >= ?')
+            params.append(value)
+        elif column == 'to':
+            clauses.append("created_at < date(?, '+1 day')")
+            params.append(value)
+        else:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    if cursor is not None:
+        clauses.append('(created_at, id) < (?, ?)')
+        params.extend(cursor)
+    sql = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+    return sql, params
+
+
+def page_size(args):
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise InvalidListingQuery("'limit' must be a number")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+# One page of rows plus the cursor for the next page (None on the last page).
+# Cost depends on the page size only, never on the table size.
+def fetch_page(conn, table, filters, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    where, params = where_clause(filters, decode_cursor(cursor) if cursor else None)
+    rows = conn.execute(
+        f'SELECT * FROM {table}{where} ORDER BY created_at DESC, id DESC LIMIT ?',
+        params + [limit + 1]
+    ).fetchall()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+# Streams every matching row in listing order, holding one fetchmany()
+# batch in memory at a time
+def iter_rows(conn, table, filters, batch_size=EXPORT_BATCH_SIZE):
+    where, params = where_clause(filters)
+    cursor = conn.execute(f'SELECT * FROM {table}{where} ORDER BY created_at DESC, id DESC', params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield rows
+
+
+def stream_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    for rows in batches:
+        if not header_written:
+            writer.writerow(rows[0].keys())
+            header_written = True
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def stream_ndjson(batches):
+    for rows in batches:
+        yield ''.join(json.dumps(dict(row), ensure_ascii=False) + '\n' for row in rows)
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', stream_csv),
+    'ndjson': ('application/x-ndjson', stream_ndjson),
+}
@@ -0,0 +1,286 @@
+import glob
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+import click
+
+# Tables whose old rows move to the yearly archives; the newsletter list and
+# counters stay live
+ARCHIVED_TABLES = ('contacts', 'applications')
+ARCHIVE_BATCH = 500
+BACKUP_PATTERN = 'sbitm-*.db'
+
+
+# ====================
+# ONLINE BACKUP
+# ====================
+
+class _Restarted(Exception):
+    pass
+
+
+# Copies a live database with sqlite3's backup API, `pages` pages per step.
+# Each step only holds a read lock and writers carry on in between; a write
+# from another connection makes SQLite start the copy over. After
+# max_restarts of those the rest is copied in one step, which in WAL mode
+# still only holds a read snapshot and never blocks writers.
+#
+# The copy is checked with quick_check and then renamed into place, so
+# `target` is always a complete, consistent database.
+def backup(database, target, pages=256, sleep=0.005, max_restarts=3):
+    started = time.perf_counter()
+    tmp = f"{target}.{os.getpid()}.tmp"
+    source = sqlite3.connect(database, timeout=30)
+    restarts = 0
+    try:
+        while True:
+            copied = [0]
+
+            def progress(status, remaining, total):
+                # Growth adds to both; only a restart makes the copied count drop
+                if total - remaining < copied[0]:
+                    raise _Restarted()
+                copied[0] = total - remaining
+
+            destination = sqlite3.connect(tmp)
+            try:
+                source.backup(destination, pages=pages if restarts < max_restarts else -1,
+                              progress=progress, sleep=sleep)
+                # A single self-contained file, whatever mode the live one uses
+                destination.execute('PRAGMA journal_mode = DELETE')
+                check = destination.execute('PRAGMA quick_check').fetchone()[0]
+                if check != 'ok':
+                    raise sqlite3.DatabaseError(f"backup failed quick_check: {check}")
+                break
+            except _Restarted:
+                restarts += 1
+            finally:
+                destination.close()
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    finally:
+        source.close()
+    return {
+        "path": target,
+        "bytes": os.path.getsize(target),
+        "restarts": restarts,
+        "ms": round((time.perf_counter() - started) * 1000)
+    }
+
+
+# Timestamped backup in backup_dir, keeping the newest `keep`
+def rotate_backup(database, backup_dir, keep=7, pages=256):
+    os.makedirs(backup_dir, exist_ok=True)
+    target = os.path.join(backup_dir, f"sbitm-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db")
+    report = backup(database, target, pages=pages)
+    backups = sorted(glob.glob(os.path.join(backup_dir, BACKUP_PATTERN)))
+    for old in backups[:-keep]:
+        os.remove(old)
+    report["kept"] = min(len(backups), keep)
+    return report
+
+
+# ====================
+# RETENTION ARCHIVING
+# ====================
+
+def archive_path(archive_dir, year):
+    return os.path.join(archive_dir, f"sbitm-archive-{year}.db")
+
+
+def _create_archive_table(conn, table):
+    sql = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+    conn.execute(re.sub(r'^CREATE TABLE (IF NOT EXISTS )?', 'CREATE TABLE IF NOT EXISTS archive.', sql))
+    # Columns added to the live table since this archive was created
+    live = [row[1] for row in conn.execute(f'PRAGMA main.table_info({table})')]
+    archived = {row[1] for row in conn.execute(f'PRAGMA archive.table_info({table})')}
+    for column in live:
+        if column not in archived:
+            conn.execute(f'ALTER TABLE archive.{table} ADD COLUMN {column}')
+    return live
+
+
+# Moves contacts and applications created more than `years` years ago into
+# one database per calendar year under archive_dir, ARCHIVE_BATCH rows per
+# transaction so submissions are never held up for long. Rows keep their id,
+# so a run interrupted between the archive and the live commit is finished
+# by the next one without duplicates. Archived rows still count towards the
+# totals in the counters table.
+def archive_old_rows(conn, archive_dir, years=3, batch=ARCHIVE_BATCH):
+    os.makedirs(archive_dir, exist_ok=True)
+    cutoff = conn.execute("SELECT datetime('now', ?)", (f'-{int(years)} years',)).fetchone()[0]
+    report = {}
+    for table in ARCHIVED_TABLES:
+        archive_years = [row[0] for row in conn.execute(
+            f"SELECT DISTINCT strftime('%Y', created_at) FROM {table} WHERE created_at < ?", (cutoff,)
+        )]
+        for year in archive_years:
+            conn.execute('ATTACH DATABASE ? AS archive', (archive_path(archive_dir, year),))
+            try:
+                columns = ', '.join(_create_archive_table(conn, table))
+                conn.commit()
+                while True:
+                    ids = [row[0] for row in conn.execute(
+                        f"SELECT id FROM {table} WHERE created_at < ? AND strftime('%Y', created_at) = ? "
+                        f"ORDER BY id LIMIT ?", (cutoff, year, batch)
+                    )]
+                    if not ids:
+                        break
+                    marks = ', '.join('?' * len(ids))
+                    with conn:
+                        conn.execute(f'INSERT OR IGNORE INTO archive.{table} ({columns}) '
+                                     f'SELECT {columns} FROM main.{table} WHERE id IN ({marks})', ids)
+                        conn.execute(f'DELETE FROM main.{table} WHERE id IN ({marks})', ids)
+                        # The delete trigger took these off the running total
+                        conn.execute('UPDATE counters SET value = value + ? WHERE name = ?', (len(ids), table))
+                    report[f"{table}/{year}"] = report.get(f"{table}/{year}", 0) + len(ids)
+            finally:
+                conn.execute('DETACH DATABASE archive')
+    return report
+
+
+# ====================
+# INCREMENTAL VACUUM
+# ====================
+
+# New databases get this from migrations.migrate(); an existing one needs a
+# single full VACUUM to switch, which blocks writers while it runs
+def enable_incremental_vacuum(conn):
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        return False
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    return True
+
+
+# Returns up to `pages` free pages to the filesystem in one short write
+# transaction; (free pages before, after)
+def vacuum_step(conn, pages=1000):
+    before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        # execute() steps a row-less statement once, freeing a single page;
+        # executescript() runs it to completion
+        conn.executescript(f'PRAGMA incremental_vacuum({int(pages)});')
+    return before, conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+
+# ====================
+# SCHEDULER
+# ====================
+
+class Scheduler:
+    def __init__(self, tasks):
+        # name -> (interval in seconds, callable)
+        self.tasks = tasks
+        self._due = {name: 0.0 for name in tasks}
+
+    def run_pending(self):
+        for name, (interval, task) in self.tasks.items():
+            now = time.monotonic()
+            if now < self._due[name]:
+                continue
+            try:
+                task()
+            except Exception as e:
+                # Try again next interval; one failing task doesn't stop the rest
+                print(f"❌ {name} failed: {e}")
+            self._due[name] = time.monotonic() + interval
+
+    def run_forever(self):
+        while True:
+            self.run_pending()
+            time.sleep(max(1.0, min(self._due.values()) - time.monotonic()))
+
+
+def init_app(app):
+    # Next to the database by default
+    data_dir = os.path.dirname(os.path.abspath(app.config['DATABASE']))
+    app.config.setdefault('BACKUP_DIR', os.path.join(data_dir, 'backups'))
+    app.config.setdefault('BACKUP_KEEP', 7)
+    app.config.setdefault('BACKUP_STEP_PAGES', 256)
+    app.config.setdefault('BACKUP_INTERVAL_HOURS', 24.0)
+    app.config.setdefault('ARCHIVE_DIR', os.path.join(data_dir, 'archive'))
+    app.config.setdefault('ARCHIVE_AFTER_YEARS', 3)
+    app.config.setdefault('VACUUM_STEP_PAGES', 1000)
+    app.config.setdefault('VACUUM_INTERVAL_MINUTES', 60.0)
+
+    def connect():
+        # Pool settings (WAL, busy timeout), outside any request
+        return app.extensions['db_pool'].connect()
+
+    def run_backup():
+        report = rotate_backup(app.config['DATABASE'], app.config['BACKUP_DIR'], keep=app.config['BACKUP_KEEP'],
+                               pages=app.config['BACKUP_STEP_PAGES'])
+        print(f"✅ Backed up {report['bytes'] // 1024} KB to {report['path']} in {report['ms']} ms "
+              f"({report['restarts']} restarts, {report['kept']} backups kept)")
+
+    def run_archive():
+        conn = connect()
+        try:
+            report = archive_old_rows(conn, app.config['ARCHIVE_DIR'], years=app.config['ARCHIVE_AFTER_YEARS'])
+        finally:
+            conn.close()
+        moved = ', '.join(f"{name}: {count}" for name, count in sorted(report.items())) or 'nothing to move'
+        print(f"✅ Archived rows older than {app.config['ARCHIVE_AFTER_YEARS']} years ({moved})")
+
+    def run_vacuum():
+        conn = connect()
+        try:
+            before, after = vacuum_step(conn, app.config['VACUUM_STEP_PAGES'])
+            incremental = conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+        finally:
+            conn.close()
+        if not incremental:
+            print("⚠️  auto_vacuum is not INCREMENTAL; run 'flask db vacuum --full' once")
+        else:
+            print(f"✅ Freed {before - after} pages, {after} free pages left")
+
+    @app.cli.group('db', help='Backups, archiving and vacuuming of the database.')
+    def db_group():
+        pass
+
+    @db_group.command('backup')
+    @click.option('--output', default=None, help='Backup file (default: timestamped in BACKUP_DIR, rotated).')
+    def backup_command(output):
+        if output is None:
+            run_backup()
+            return
+        report = backup(app.config['DATABASE'], output, pages=app.config['BACKUP_STEP_PAGES'])
+        print(f"✅ Backed up {report['bytes'] // 1024} KB to {report['path']} in {report['ms']} ms")
+
+    @db_group.command('archive')
+    @click.option('--years', default=None, type=int, help='Age in years (default: ARCHIVE_AFTER_YEARS).')
+    def archive_command(years):
+        if years is not None:
+            app.config['ARCHIVE_AFTER_YEARS'] = years
+        run_archive()
+        run_vacuum()
+
+    @db_group.command('vacuum')
+    @click.option('--full', is_flag=True, help='One-off VACUUM switching to auto_vacuum=INCREMENTAL.')
+    def vacuum_command(full):
+        if full:
+            conn = connect()
+            try:
+                switched = enable_incremental_vacuum(conn)
+            finally:
+                conn.close()
+            print("✅ Switched to auto_vacuum=INCREMENTAL" if switched else "✅ Already INCREMENTAL")
+        run_vacuum()
+
+    # Long-running; start one per host (e.g. a systemd service) rather than
+    # one per web worker
+    @db_group.command('schedule')
+    def schedule_command():
+        print("🕒 Running database maintenance; Ctrl+C to stop")
+        Scheduler({
+            'backup': (app.config['BACKUP_INTERVAL_HOURS'] * 3600, run_backup),
+            'archive': (86400, run_archive),
+            'vacuum': (app.config['VACUUM_INTERVAL_MINUTES'] * 60, run_vacuum),
+        }).run_forever()
@@ -0,0 +1,306 @@
+import cProfile
+import ipaddress
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from flask import abort, g, has_request_context, request, session
+from flask.signals import before_render_template, template_rendered
+
+import db
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+SQL_OPERATIONS = ('select', 'insert', 'update', 'delete', 'pragma', 'create', 'begin', 'commit')
+
+# Requests that match no route share one label instead of one per URL
+UNMATCHED = '<unmatched>'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield f"{self.name}{_labels(self.labels, label_values)} {_number(value)}"
+
+
+# Cumulative-bucket histogram in the Prometheus layout (_bucket/_sum/_count)
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # per-bucket counts, then sum and count
+                series = self._series[label_values] = [0] * len(self.buckets) + [0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        for label_values, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                yield (f"{self.name}_bucket{_labels(self.labels, label_values, [('le', _number(bound))])} "
+                       f"{cumulative}")
+            yield f"{self.name}_bucket{_labels(self.labels, label_values, [('le', '+Inf')])} {values[-1]}"
+            yield f"{self.name}_sum{_labels(self.labels, label_values)} {_number(values[-2])}"
+            yield f"{self.name}_count{_labels(self.labels, label_values)} {values[-1]}"
+
+
+class Metrics:
+    def __init__(self):
+        self.requests = Counter('sbitm_requests_total', 'Requests by endpoint, method and status',
+                                ('endpoint', 'method', 'status'))
+        self.latency = Histogram('sbitm_request_duration_seconds', 'Request latency', LATENCY_BUCKETS,
+                                 ('endpoint', 'method'))
+        self.response_size = Histogram('sbitm_response_size_bytes', 'Response body size as sent',
+                                       SIZE_BUCKETS, ('endpoint',))
+        self.render = Histogram('sbitm_template_render_seconds', 'Template render time', LATENCY_BUCKETS,
+                                ('template',))
+        self.sql = Histogram('sbitm_sql_statement_duration_seconds', 'SQL statement execution time',
+                             SQL_BUCKETS, ('operation',))
+        self.request_sql_count = Histogram('sbitm_request_sql_statements', 'SQL statements per request',
+                                           COUNT_BUCKETS, ('endpoint',))
+        self.request_sql_time = Histogram('sbitm_request_sql_duration_seconds', 'Time in SQL per request',
+                                          LATENCY_BUCKETS, ('endpoint',))
+        self.exceptions = Counter('sbitm_request_exceptions_total', 'Unhandled exceptions by endpoint',
+                                  ('endpoint', 'exception'))
+        self.slow_profiles = Counter('sbitm_slow_request_profiles_total', 'Profiles written for slow requests',
+                                     ('endpoint',))
+        self.started = time.time()
+
+    def all(self):
+        return [self.requests, self.latency, self.response_size, self.render, self.sql,
+                self.request_sql_count, self.request_sql_time, self.exceptions, self.slow_profiles]
+
+    def observe_sql(self, sql, elapsed):
+        words = sql.split(None, 1)
+        operation = words[0].lower() if words else ''
+        self.sql.observe(elapsed, operation if operation in SQL_OPERATIONS else 'other')
+        if has_request_context():
+            state = g.get('_metrics')
+            if state is not None:
+                state.sql_count += 1
+                state.sql_time += elapsed
+
+    # Prometheus text exposition format 0.0.4
+    def render_text(self):
+        lines = []
+        for metric in self.all():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        lines.append("# HELP sbitm_process_start_time_seconds Start time of the process since the epoch")
+        lines.append("# TYPE sbitm_process_start_time_seconds gauge")
+        lines.append(f"sbitm_process_start_time_seconds {self.started}")
+        return '\n'.join(lines) + '\n'
+
+
+# Connection class that times every statement run through it. Only the
+# execute() call is timed; rows fetched afterwards step the statement
+# outside the measurement.
+def timed_connection(observe):
+    class TimedCursor(sqlite3.Cursor):
+        def execute(self, sql, parameters=()):
+            started = time.perf_counter()
+            try:
+                return super().execute(sql, parameters)
+            finally:
+                observe(sql, time.perf_counter() - started)
+
+        def executemany(self, sql, seq_of_parameters):
+            started = time.perf_counter()
+            try:
+                return super().executemany(sql, seq_of_parameters)
+            finally:
+                observe(sql, time.perf_counter() - started)
+
+    class TimedConnection(sqlite3.Connection):
+        def cursor(self, factory=TimedCursor):
+            return super().cursor(factory)
+
+        # sqlite3.Connection.execute() bypasses Python-level cursor methods
+        def execute(self, sql, parameters=()):
+            return self.cursor().execute(sql, parameters)
+
+        def executemany(self, sql, seq_of_parameters):
+            return self.cursor().executemany(sql, seq_of_parameters)
+
+        def commit(self):
+            started = time.perf_counter()
+            try:
+                return super().commit()
+            finally:
+                observe('COMMIT', time.perf_counter() - started)
+
+    return TimedConnection
+
+
+class _RequestState:
+    __slots__ = ('started', 'status', 'size', 'sql_count', 'sql_time', 'templates', 'profiler')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.status = None
+        self.size = None
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.templates = []
+        self.profiler = None
+
+
+# cProfile can only run for one request at a time
+_profile_lock = threading.Lock()
+
+
+def init_app(app):
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILE_SLOW_MS', 500)
+    app.config.setdefault('PROFILE_DIR', os.path.join(app.root_path, 'profiles'))
+    app.config.setdefault('METRICS_ALLOW_IPS', '')
+
+    metrics = Metrics()
+    app.extensions['metrics'] = metrics
+    db.get_pool(app).factory = timed_connection(metrics.observe_sql)
+
+    @app.before_request
+    def start_request_metrics():
+        state = g._metrics = _RequestState()
+        rate = app.config['PROFILE_SAMPLE_RATE']
+        if rate and random.random() < rate and _profile_lock.acquire(blocking=False):
+            state.profiler = cProfile.Profile()
+            state.profiler.enable()
+
+    # Registered before compression, so runs after it and sees the encoded size
+    @app.after_request
+    def record_response_metrics(response):
+        state = g.get('_metrics')
+        if state is not None:
+            state.status = response.status_code
+            state.size = response.calculate_content_length()
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exception):
+        state = g.pop('_metrics', None)
+        if state is None:
+            return
+        elapsed = time.perf_counter() - state.started
+        endpoint = request.endpoint or UNMATCHED
+
+        if state.profiler is not None:
+            state.profiler.disable()
+            _profile_lock.release()
+            if elapsed * 1000 >= app.config['PROFILE_SLOW_MS']:
+                path = dump_profile(state.profiler, app.config['PROFILE_DIR'], endpoint, elapsed)
+                metrics.slow_profiles.inc(endpoint)
+                print(f"🐢 {request.method} {request.path} took {elapsed * 1000:.0f} ms, profile: {path}")
+
+        status = state.status if exception is None and state.status is not None else 500
+        if exception is not None:
+            metrics.exceptions.inc(endpoint, type(exception).__name__)
+        metrics.requests.inc(endpoint, request.method, status)
+        metrics.latency.observe(elapsed, endpoint, request.method)
+        if state.size is not None:
+            metrics.response_size.observe(state.size, endpoint)
+        metrics.request_sql_count.observe(state.sql_count, endpoint)
+        metrics.request_sql_time.observe(state.sql_time, endpoint)
+
+    def template_started(sender, template, context, **extra):
+        state = g.get('_metrics')
+        if state is not None:
+            state.templates.append(time.perf_counter())
+
+    def template_finished(sender, template, context, **extra):
+        state = g.get('_metrics')
+        if state is not None and state.templates:
+            metrics.render.observe(time.perf_counter() - state.templates.pop(), template.name or '<string>')
+
+    before_render_template.connect(template_started, app, weak=False)
+    template_rendered.connect(template_finished, app, weak=False)
+
+    # Comma-separated addresses/networks allowed to scrape, e.g.
+    # '127.0.0.1,10.0.0.0/8'; a logged-in admin always is
+    allowed = [ipaddress.ip_network(entry.strip(), strict=False)
+               for entry in app.config['METRICS_ALLOW_IPS'].split(',') if entry.strip()]
+
+    def may_scrape():
+        if session.get('admin_logged_in'):
+            return True
+        try:
+            address = ipaddress.ip_address(request.remote_addr or '')
+        except ValueError:
+            return False
+        return any(address in network for network in allowed)
+
+    # Latencies, pool stats and profiles are for operators only
+    @app.route('/metrics')
+    def metrics_endpoint():
+        if not may_scrape():
+            abort(403)
+        return app.response_class(metrics.render_text(), mimetype='text/plain; version=0.0.4')
+
+    return metrics
+
+
+# Writes a pstats-loadable file, e.g.
+#   python -m pstats profiles/20241005-142233-faculty-812ms.prof
+def dump_profile(profiler, directory, endpoint, elapsed):
+    os.makedirs(directory, exist_ok=True)
+    name = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{endpoint.replace('/', '_')}-{elapsed * 1000:.0f}ms.prof"
+    path = os.path.join(directory, name)
+    profiler.dump_stats(path)
+    return path
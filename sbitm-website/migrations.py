@@ -0,0 +1,136 @@
+import sqlite3
+
+from werkzeug.security import generate_password_hash
+
+import listing
+import newsletter
+from counters import create_counter_schema
+from references import add_reference_columns
+
+
+def create_base_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS contacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            phone TEXT,
+            subject TEXT,
+            message TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'new'
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            program TEXT NOT NULL,
+            qualification TEXT,
+            percentage REAL,
+            message TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'pending'
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS newsletter (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            subscribed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            active INTEGER DEFAULT 1
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS admin_users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Insert default admin if not exists
+    cursor.execute('SELECT COUNT(*) FROM admin_users WHERE username = ?', ('admin',))
+    if cursor.fetchone()[0] == 0:
+        cursor.execute('INSERT INTO admin_users (username, password_hash) VALUES (?, ?)',
+                       ('admin', generate_password_hash('sbitm@2024')))
+
+
+# Schema history, applied in order. PRAGMA user_version stores how many steps
+# a database has had, so each runs exactly once. Only ever append: databases
+# created before versioning are at 0 and the early steps are idempotent.
+MIGRATIONS = (
+    create_base_tables,
+    # Trigger-maintained counters and daily/monthly rollups
+    create_counter_schema,
+    # Indexes backing the paginated admin listings
+    listing.create_listing_indexes,
+    # Stored ENQ/APP references with a unique index for status lookups
+    add_reference_columns,
+    # Checkpoints for 'flask newsletter send'
+    newsletter.create_campaign_table,
+)
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+# Brings the database up to SCHEMA_VERSION; returns (old, new) versions.
+# Safe to run from several processes at once: the first takes the write
+# lock, the others wait for it and then find nothing left to do.
+def migrate(database, timeout=30.0):
+    conn = sqlite3.connect(database, timeout=timeout, isolation_level=None)
+    try:
+        start = schema_version(conn)
+        if start >= SCHEMA_VERSION:
+            return start, start
+
+        if conn.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()[0] == 0:
+            # Only takes effect before the first table is created; existing
+            # databases switch with 'flask db vacuum --full'
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            start = schema_version(conn)
+            cursor = conn.cursor()
+            for step in MIGRATIONS[start:]:
+                step(cursor)
+            version = max(start, SCHEMA_VERSION)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return start, version
+    finally:
+        conn.close()
+
+
+def init_app(app):
+    app.config.setdefault('AUTO_MIGRATE', False)
+
+    @app.cli.command('migrate')
+    def migrate_command():
+        start, version = migrate(app.config['DATABASE'])
+        if start == version:
+            print(f"✅ Database already at schema version {version}")
+        else:
+            print(f"✅ Database migrated from schema version {start} to {version}")
+
+    # Development only; with N workers booting at once each would queue
+    # on the write lock just to find the schema current
+    if app.config['AUTO_MIGRATE']:
+        start, version = migrate(app.config['DATABASE'])
+        if start != version:
+            print(f"✅ Database migrated to schema version {version}")
@@ -0,0 +1,409 @@
+import csv
+import queue
+import smtplib
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+
+import click
+
+import db
+from forms import NEWSLETTER_UPSERT, valid_email
+from ratelimit import MemoryBackend
+
+IMPORT_CHUNK_SIZE = 1000
+PAGE_SIZE = 500
+
+
+def create_campaign_table(cursor):
+    # checkpoint: every active subscriber with id <= checkpoint was handled
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS newsletter_campaigns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            subject TEXT NOT NULL,
+            checkpoint INTEGER NOT NULL DEFAULT 0,
+            sent INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+
+
+# ====================
+# BULK IMPORT
+# ====================
+
+# Addresses from a CSV with an 'email' column, or one address per row
+def read_emails(f):
+    column = 0
+    for number, row in enumerate(csv.reader(f)):
+        if not row:
+            continue
+        if number == 0:
+            header = [cell.strip().lower() for cell in row]
+            if 'email' in header:
+                column = header.index('email')
+                continue
+        yield row[column].strip() if column < len(row) else ''
+
+
+# Upserts in chunks of chunk_size rows, one transaction each, so a large file
+# neither holds the write lock for long nor pays a commit per row. Re-running
+# an interrupted import is safe.
+def import_subscribers(conn, emails, chunk_size=IMPORT_CHUNK_SIZE):
+    report = {"rows": 0, "invalid": 0, "duplicates": 0, "upserted": 0}
+    before = conn.execute('SELECT COUNT(*) FROM newsletter').fetchone()[0]
+    seen = set()
+    chunk = []
+    for email in emails:
+        report["rows"] += 1
+        if not valid_email(email):
+            report["invalid"] += 1
+            continue
+        if email in seen:
+            report["duplicates"] += 1
+            continue
+        seen.add(email)
+        chunk.append((email,))
+        if len(chunk) >= chunk_size:
+            _write_chunk(conn, chunk)
+            report["upserted"] += len(chunk)
+            chunk = []
+    if chunk:
+        _write_chunk(conn, chunk)
+        report["upserted"] += len(chunk)
+    report["new"] = conn.execute('SELECT COUNT(*) FROM newsletter').fetchone()[0] - before
+    return report
+
+
+def _write_chunk(conn, rows):
+    with conn:
+        conn.executemany(NEWSLETTER_UPSERT, rows)
+
+
+# ====================
+# CAMPAIGN DISPATCH
+# ====================
+
+def smtp_connector(config):
+    def connect():
+        smtp = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=30)
+        if config['MAIL_USE_TLS']:
+            smtp.starttls()
+        if config['MAIL_USERNAME']:
+            smtp.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        return smtp
+
+    return connect
+
+
+class SMTPUnavailable(Exception):
+    pass
+
+
+class WorkersStopped(Exception):
+    pass
+
+
+# Order in which subscribers were queued and which of them are finished; the
+# checkpoint only moves past an id once everything before it is done
+class _Progress:
+    def __init__(self, checkpoint, sent, failed):
+        self.checkpoint = checkpoint
+        self.sent = sent
+        self.failed = failed
+        self._queued = deque()
+        self._finished = set()
+        self._lock = threading.Lock()
+        # Set by a worker that can't reach the mail server
+        self.error = None
+
+    def queued(self, subscriber_id):
+        with self._lock:
+            self._queued.append(subscriber_id)
+
+    def finished(self, subscriber_id, ok):
+        with self._lock:
+            if ok:
+                self.sent += 1
+            else:
+                self.failed += 1
+            self._finished.add(subscriber_id)
+            while self._queued and self._queued[0] in self._finished:
+                self.checkpoint = self._queued.popleft()
+                self._finished.remove(self.checkpoint)
+
+    def snapshot(self):
+        with self._lock:
+            return self.checkpoint, self.sent, self.failed
+
+    def unfinished(self):
+        with self._lock:
+            return len(self._queued)
+
+
+# Streams active subscribers in id order to a fixed pool of workers, each
+# keeping one SMTP connection open for all its messages. Sending is throttled
+# to `rate` messages per second overall.
+#
+# Progress is checkpointed in newsletter_campaigns; running the same campaign
+# name again resumes after the checkpoint. After a crash, at most the
+# messages that were in flight (about workers * 3) can go out twice.
+#
+# To try it locally without sending mail:
+#   python -m aiosmtpd -n -l localhost:8025
+#   SBITM_MAIL_PORT=8025 flask newsletter send ...
+class CampaignDispatcher:
+    def __init__(self, connect_db, connect_smtp, sender, workers=4, rate=10.0, retries=2,
+                 checkpoint_interval=1.0, page_size=PAGE_SIZE):
+        self.connect_db = connect_db
+        self.connect_smtp = connect_smtp
+        self.sender = sender
+        self.workers = workers
+        self.retries = retries
+        self.checkpoint_interval = checkpoint_interval
+        self.page_size = page_size
+        # A token bucket holding one second's worth of sends
+        capacity = max(1, int(rate))
+        self._limit = (capacity, capacity / rate)
+        self._bucket = MemoryBackend(max_keys=1)
+
+    def message(self, email, subject, body):
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = email
+        message['Subject'] = subject
+        message['List-Unsubscribe'] = f"<mailto:{self.sender.rpartition('<')[2].rstrip('>')}?subject=unsubscribe>"
+        message.set_content(body)
+        return message
+
+    def _throttle(self):
+        while True:
+            wait = self._bucket.take('send', *self._limit)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def _connect(self):
+        for attempt in range(self.retries + 1):
+            try:
+                return self.connect_smtp()
+            except (smtplib.SMTPException, OSError) as e:
+                error = e
+            if attempt < self.retries:
+                time.sleep(2 ** attempt)
+        raise SMTPUnavailable(error)
+
+    # Returns (connection to keep using, whether the message was accepted)
+    def _send(self, smtp, message):
+        for attempt in range(self.retries + 1):
+            if smtp is None:
+                smtp = self._connect()
+            try:
+                smtp.send_message(message)
+                return smtp, True
+            except smtplib.SMTPRecipientsRefused:
+                return smtp, False
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code >= 500:
+                    # Permanent for this message; the connection is still fine
+                    return smtp, False
+                error = e
+            except (smtplib.SMTPException, OSError) as e:
+                error = e
+            # Dropped or temporarily refusing: reconnect and try again
+            try:
+                smtp.close()
+            except OSError:
+                pass
+            smtp = None
+            if attempt < self.retries:
+                time.sleep(2 ** attempt)
+        print(f"❌ {message['To']}: {error}")
+        return None, False
+
+    def _worker(self, jobs, progress, subject, body):
+        smtp = None
+        try:
+            while True:
+                job = jobs.get()
+                if job is None or progress.error is not None:
+                    break
+                subscriber_id, email = job
+                self._throttle()
+                try:
+                    smtp, ok = self._send(smtp, self.message(email, subject, body))
+                except SMTPUnavailable:
+                    raise
+                except Exception as e:
+                    # e.g. an address with a line break: this subscriber
+                    # fails, the worker carries on
+                    print(f"❌ {email!r}: {e}")
+                    ok = False
+                progress.finished(subscriber_id, ok)
+        except SMTPUnavailable as e:
+            # The message stays unfinished, so the checkpoint stays before it
+            progress.error = e
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+    def _save(self, conn, campaign_id, progress, finished=False):
+        checkpoint, sent, failed = progress.snapshot()
+        with conn:
+            conn.execute(f'''
+                UPDATE newsletter_campaigns SET checkpoint = ?, sent = ?, failed = ?
+                {', finished_at = CURRENT_TIMESTAMP' if finished else ''}
+                WHERE id = ?
+            ''', (checkpoint, sent, failed, campaign_id))
+
+    @staticmethod
+    def _alive(threads):
+        return any(thread.is_alive() for thread in threads)
+
+    # Waits for room in the queue; False once no worker is left to empty it
+    def _put(self, jobs, job, threads):
+        while self._alive(threads):
+            try:
+                jobs.put(job, timeout=self.checkpoint_interval)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _queue(self, conn, campaign, jobs, progress, threads):
+        last_id = campaign['checkpoint']
+        next_save = time.monotonic() + self.checkpoint_interval
+        while progress.error is None:
+            rows = conn.execute(
+                'SELECT id, email FROM newsletter WHERE active = 1 AND id > ? ORDER BY id LIMIT ?',
+                (last_id, self.page_size)
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                progress.queued(row['id'])
+                while progress.error is None:
+                    if time.monotonic() >= next_save:
+                        self._save(conn, campaign['id'], progress)
+                        next_save = time.monotonic() + self.checkpoint_interval
+                    if not self._alive(threads):
+                        # A worker that hit an outage recorded it before exiting
+                        if progress.error is None:
+                            progress.error = WorkersStopped("Every newsletter worker has stopped")
+                        return
+                    try:
+                        jobs.put((row['id'], row['email']), timeout=self.checkpoint_interval)
+                        break
+                    except queue.Full:
+                        pass
+            last_id = rows[-1]['id']
+
+    def run(self, name, subject, body):
+        conn = self.connect_db()
+        try:
+            with conn:
+                conn.execute('INSERT OR IGNORE INTO newsletter_campaigns (name, subject) VALUES (?, ?)',
+                             (name, subject))
+            campaign = conn.execute('SELECT * FROM newsletter_campaigns WHERE name = ?', (name,)).fetchone()
+            report = {"resumed_from": campaign['checkpoint'], "already_finished": campaign['finished_at'] is not None}
+            if report["already_finished"]:
+                report.update(sent=campaign['sent'], failed=campaign['failed'])
+                return report
+
+            progress = _Progress(campaign['checkpoint'], campaign['sent'], campaign['failed'])
+            # Bounded, so subscribers are read from the database as they are sent
+            jobs = queue.Queue(maxsize=self.workers * 2)
+            threads = [
+                threading.Thread(target=self._worker, args=(jobs, progress, campaign['subject'], body),
+                                 name=f'newsletter-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            try:
+                self._queue(conn, campaign, jobs, progress, threads)
+            finally:
+                if progress.error is not None:
+                    # Unsent jobs are dropped; the next run picks them up again
+                    while True:
+                        try:
+                            jobs.get_nowait()
+                        except queue.Empty:
+                            break
+                for _ in threads:
+                    self._put(jobs, None, threads)
+                for thread in threads:
+                    thread.join()
+                if progress.error is None and progress.unfinished():
+                    # Workers died after everything was queued
+                    progress.error = WorkersStopped("Newsletter workers stopped before finishing")
+                self._save(conn, campaign['id'], progress)
+
+            if progress.error is not None:
+                raise progress.error
+            self._save(conn, campaign['id'], progress, finished=True)
+            _, report["sent"], report["failed"] = progress.snapshot()
+            return report
+        finally:
+            conn.close()
+
+
+def init_app(app):
+    app.config.setdefault('MAIL_SERVER', 'localhost')
+    app.config.setdefault('MAIL_PORT', 25)
+    app.config.setdefault('MAIL_USE_TLS', False)
+    app.config.setdefault('MAIL_USERNAME', None)
+    app.config.setdefault('MAIL_PASSWORD', None)
+    app.config.setdefault('MAIL_SENDER', 'SBITM Betul <info@sbitm.edu.in>')
+    app.config.setdefault('NEWSLETTER_WORKERS', 4)
+    app.config.setdefault('NEWSLETTER_RATE', 10.0)
+
+    @app.cli.group('newsletter', help='Import subscribers and send campaigns.')
+    def newsletter_group():
+        pass
+
+    @newsletter_group.command('import')
+    @click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+    @click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True)
+    def import_command(csv_file, chunk_size):
+        started = time.perf_counter()
+        conn = db.get_pool(app).connect()
+        try:
+            report = import_subscribers(conn, read_emails(csv_file), chunk_size)
+        finally:
+            conn.close()
+        print(f"✅ Imported {report['upserted']} addresses ({report['new']} new) from {report['rows']} rows; "
+              f"{report['invalid']} invalid, {report['duplicates']} repeated "
+              f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    @newsletter_group.command('send')
+    @click.argument('name')
+    @click.option('--subject', required=True)
+    @click.option('--body-file', required=True, type=click.File('r', encoding='utf-8'))
+    @click.option('--workers', default=None, type=int, help='SMTP connections (default: NEWSLETTER_WORKERS).')
+    @click.option('--rate', default=None, type=float, help='Messages per second (default: NEWSLETTER_RATE).')
+    def send_command(name, subject, body_file, workers, rate):
+        started = time.perf_counter()
+        dispatcher = CampaignDispatcher(db.get_pool(app).connect, smtp_connector(app.config), app.config['MAIL_SENDER'],
+                                        workers=workers or app.config['NEWSLETTER_WORKERS'],
+                                        rate=rate or app.config['NEWSLETTER_RATE'])
+        try:
+            report = dispatcher.run(name, subject, body_file.read())
+        except SMTPUnavailable as e:
+            print(f"❌ Campaign '{name}' paused, mail server unavailable: {e}; run again to resume")
+            return
+        except WorkersStopped as e:
+            print(f"❌ Campaign '{name}' paused: {e}; run again to resume")
+            return
+        if report["already_finished"]:
+            print(f"✅ Campaign '{name}' already finished: {report['sent']} sent, {report['failed']} failed")
+            return
+        resumed = f" (resumed after subscriber {report['resumed_from']})" if report["resumed_from"] else ""
+        print(f"✅ Campaign '{name}'{resumed}: {report['sent']} sent, {report['failed']} failed "
+              f"in {time.perf_counter() - started:.1f} s")
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, request
+from jinja2 import meta
+
+
+# Files in the extends/include chain of a template, and the context variables
+# any of them reads. Includes with a computed name can't be followed.
+def template_chain(env, name):
+    paths = []
+    variables = set()
+    pending = [name]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        source, filename, _ = env.loader.get_source(env, current)
+        paths.append(filename)
+        ast = env.parse(source)
+        variables |= meta.find_undeclared_variables(ast)
+        pending.extend(ref for ref in meta.find_referenced_templates(ast) if ref is not None)
+    return tuple(paths), frozenset(variables)
+
+
+class _CachedPage:
+    __slots__ = ('body', 'etag', 'last_modified', 'mtime', 'vary')
+
+    def __init__(self, body, mtime, vary):
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.mtime = mtime
+        self.vary = vary
+
+
+# Rendered-HTML cache for routes that are a pure function of their template
+# and the site content. Entries are keyed by endpoint and invalidated when any
+# template in the extends/include chain changes on disk.
+class PageCache:
+    def __init__(self, max_bytes=16 * 1024 * 1024, per_request_vars=('random',), vary=None, check_templates=True):
+        self.max_bytes = max_bytes
+        # Off in production, where templates don't change under a running app
+        self.check_templates = check_templates
+        # Context variables that differ per request; templates using them
+        # are rendered every time instead of being cached
+        self.per_request_vars = frozenset(per_request_vars)
+        # Callable returning extra key parts (e.g. the current month)
+        self.vary = vary or (lambda: None)
+        self.enabled = True
+
+        self._entries = OrderedDict()
+        self._size = 0
+        self._templates = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._not_modified = 0
+        self._evictions = 0
+
+    def _template_info(self, env, name):
+        # (files in the extends/include chain, whether output is cacheable);
+        # rebuilt only when one of those files changes
+        cached = self._templates.get(name)
+        if cached is not None:
+            paths, cacheable, mtime = cached
+            if not self.check_templates:
+                return cached
+            try:
+                if self._mtime(paths) == mtime:
+                    return paths, cacheable, mtime
+            except OSError:
+                pass
+
+        paths, variables = template_chain(env, name)
+        cacheable = not variables & self.per_request_vars
+        mtime = self._mtime(paths)
+        self._templates[name] = (paths, cacheable, mtime)
+        return paths, cacheable, mtime
+
+    @staticmethod
+    def _mtime(paths):
+        return max(os.stat(path).st_mtime_ns for path in paths)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key, entry):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.body)
+            if len(entry.body) > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+                self._evictions += 1
+
+    # Serves an argument-free GET view that returns render_template(name)
+    def serve(self, template_name, view):
+        if not self.enabled or request.method not in ('GET', 'HEAD'):
+            return view()
+
+        _, cacheable, mtime = self._template_info(current_app.jinja_env, template_name)
+        if not cacheable:
+            with self._lock:
+                self._bypassed += 1
+            return view()
+
+        key = request.endpoint
+        vary = self.vary()
+        entry = self._get(key)
+        if entry is None or entry.mtime != mtime or entry.vary != vary:
+            rendered = view()
+            if not isinstance(rendered, str):
+                return rendered
+            entry = _CachedPage(rendered.encode('utf-8'), mtime, vary)
+            self._put(key, entry)
+            with self._lock:
+                self._misses += 1
+        else:
+            with self._lock:
+                self._hits += 1
+
+        response = current_app.response_class(entry.body, mimetype='text/html')
+        response.set_etag(entry.etag)
+        response.last_modified = entry.last_modified
+        response.cache_control.no_cache = True
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            with self._lock:
+                self._not_modified += 1
+        return response
+
+    def clear(self):
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._templates.clear()
+            self._size = 0
+        return count
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "bypassed": self._bypassed,
+                "not_modified": self._not_modified,
+                "evictions": self._evictions
+            }
+
+
+# View decorator; uses the PageCache in app.extensions['page_cache'], so
+# views can be declared before any app exists
+def cached(template_name):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('page_cache')
+            if cache is None or args or kwargs:
+                return view(*args, **kwargs)
+            return cache.serve(template_name, view)
+
+        return wrapper
+
+    return decorator
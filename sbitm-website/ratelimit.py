@@ -0,0 +1,275 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+TOO_MANY = {"success": False, "message": "Too many requests. Please try again later."}
+KEY_REUSED = {"success": False, "message": "This Idempotency-Key was already used for a different submission."}
+
+
+# "20/minute" -> (20, 60): bucket capacity and the seconds it takes to refill
+def parse_limit(value):
+    count, _, period = value.partition('/')
+    return int(count), PERIODS[period.strip().rstrip('s')]
+
+
+# In-process token buckets, one per key, kept in LRU order so memory stays
+# bounded by max_keys. An evicted key simply starts again with a full bucket.
+#
+# Any object with the same take() signature can replace it, e.g. one backed
+# by a store shared between workers; each worker otherwise limits on its own.
+class MemoryBackend:
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Returns 0 when a token was taken, otherwise seconds until one is free
+    def take(self, key, capacity, period, now=None):
+        now = time.monotonic() if now is None else now
+        rate = capacity / period
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                retry_after = 0
+            else:
+                self._buckets[key] = (tokens, now)
+                retry_after = (1 - tokens) / rate
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+IN_FLIGHT = object()
+CONFLICT = object()
+
+
+class _Pending:
+    __slots__ = ('done', 'response', 'expires', 'fingerprint')
+
+    def __init__(self, fingerprint):
+        self.done = threading.Event()
+        self.response = None
+        self.expires = None
+        self.fingerprint = fingerprint
+
+
+# Short-lived record of successful submissions. A repeat inside the window,
+# including one that arrives while the first is still being written, gets the
+# first one's response back instead of writing again.
+class DedupCache:
+    def __init__(self, window=120.0, max_entries=10000, wait_timeout=5.0):
+        self.window = window
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # (True, None) when the caller should process the submission and then
+    # call finish() or abandon(); (False, response) for a repeat. With
+    # wait=False a repeat of a submission still being written gets
+    # (False, IN_FLIGHT) instead of blocking. A key reused with a different
+    # fingerprint (request body) gets (False, CONFLICT).
+    def claim(self, key, wait=True, fingerprint=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._entries[key] = _Pending(fingerprint)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                return True, None
+            if entry.fingerprint != fingerprint:
+                return False, CONFLICT
+
+        if not wait and not entry.done.is_set():
+            return False, IN_FLIGHT
+        if not entry.done.wait(self.wait_timeout) or entry.response is None:
+            # First attempt still running or failed: let this one through
+            return True, None
+        return False, entry.response
+
+    def finish(self, key, response):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.response = response
+            entry.expires = time.monotonic() + self.window
+            entry.done.set()
+
+    def abandon(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SubmissionGuard:
+    def __init__(self, backend, ip_limit, email_limit, dedup):
+        self.backend = backend
+        self.ip_limit = parse_limit(ip_limit)
+        self.email_limit = parse_limit(email_limit)
+        self.dedup = dedup
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._limited = 0
+        self._replayed = 0
+
+    # Framework-neutral checks, also used by asgi.py. Each returns 0 if
+    # allowed, otherwise seconds until the client may retry.
+    def limit_ip(self, endpoint, remote_addr):
+        return self._take(f"ip:{endpoint}:{remote_addr}", self.ip_limit)
+
+    def limit_email(self, endpoint, email):
+        if not isinstance(email, str) or not email.strip():
+            return 0
+        return self._take(f"email:{endpoint}:{email.strip().lower()}", self.email_limit)
+
+    def _take(self, key, limit):
+        retry_after = self.backend.take(key, *limit)
+        if retry_after:
+            with self._lock:
+                self._limited += 1
+        return retry_after
+
+    def count_replay(self):
+        with self._lock:
+            self._replayed += 1
+
+    # (key, fingerprint of the body). A client-supplied Idempotency-Key wins,
+    # scoped to the client address and the form's email so two clients
+    # sending the same key ("1") never share a submission; otherwise
+    # identical bodies to the same endpoint count as the same submission.
+    @staticmethod
+    def dedup_key(endpoint, data, idempotency_key=None, remote_addr=None, email=None):
+        body = json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+        fingerprint = hashlib.sha256(body.encode('utf-8')).hexdigest()
+        if idempotency_key:
+            email = email.strip().lower() if isinstance(email, str) else ''
+            scope = json.dumps([remote_addr, email, idempotency_key[:200]])
+            return f"{endpoint}:key:{hashlib.sha256(scope.encode('utf-8')).hexdigest()}", fingerprint
+        return f"{endpoint}:body:{fingerprint}", fingerprint
+
+    @staticmethod
+    def retry_after_header(retry_after):
+        return str(max(1, int(retry_after + 0.999)))
+
+    def _key_reused_response(self):
+        response = jsonify(KEY_REUSED)
+        response.status_code = 422
+        return response
+
+    def _limited_response(self, retry_after):
+        response = jsonify(TOO_MANY)
+        response.status_code = 429
+        response.headers['Retry-After'] = self.retry_after_header(retry_after)
+        return response
+
+    def handle(self, view, email_field, args, kwargs):
+        retry_after = self.limit_ip(request.endpoint, request.remote_addr)
+        if retry_after:
+            return self._limited_response(retry_after)
+
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return view(*args, **kwargs)
+
+        key, fingerprint = self.dedup_key(request.endpoint, data, request.headers.get('Idempotency-Key'),
+                                          request.remote_addr, data.get(email_field))
+        fresh, replay = self.dedup.claim(key, fingerprint=fingerprint)
+        if replay is CONFLICT:
+            return self._key_reused_response()
+        if not fresh:
+            self.count_replay()
+            body, status, mimetype = replay
+            response = current_app.response_class(body, status=status, mimetype=mimetype)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            retry_after = self.limit_email(request.endpoint, data.get(email_field))
+            if retry_after:
+                self.dedup.abandon(key)
+                return self._limited_response(retry_after)
+
+            response = current_app.make_response(view(*args, **kwargs))
+        except BaseException:
+            self.dedup.abandon(key)
+            raise
+
+        # Only successful submissions are replayed; errors can be retried
+        if response.status_code == 200 and not response.is_streamed:
+            self.dedup.finish(key, (response.get_data(), response.status_code, response.mimetype))
+        else:
+            self.dedup.abandon(key)
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "buckets": len(self.backend) if hasattr(self.backend, '__len__') else None,
+                "dedup_entries": len(self.dedup),
+                "limited": self._limited,
+                "replayed": self._replayed
+            }
+
+
+# Decorator for public POST endpoints taking a JSON body; email_field names
+# the address the per-email bucket is keyed on
+def protect_submission(email_field='email'):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            guard = current_app.extensions.get('submission_guard')
+            if guard is None or not guard.enabled:
+                return view(*args, **kwargs)
+            return guard.handle(view, email_field, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def init_app(app):
+    app.config.setdefault('RATE_LIMIT_ENABLED', True)
+    app.config.setdefault('RATE_LIMIT_PER_IP', '30/minute')
+    app.config.setdefault('RATE_LIMIT_PER_EMAIL', '5/hour')
+    app.config.setdefault('RATE_LIMIT_MAX_KEYS', 100000)
+    app.config.setdefault('RATE_LIMIT_BACKEND', None)
+    app.config.setdefault('DEDUP_WINDOW', 120.0)
+    app.config.setdefault('DEDUP_MAX_ENTRIES', 10000)
+
+    # client addresses come from request.remote_addr, which create_app()
+    # resolves through PROXY_HOPS trusted proxies
+    guard = SubmissionGuard(
+        app.config['RATE_LIMIT_BACKEND'] or MemoryBackend(app.config['RATE_LIMIT_MAX_KEYS']),
+        app.config['RATE_LIMIT_PER_IP'],
+        app.config['RATE_LIMIT_PER_EMAIL'],
+        DedupCache(app.config['DEDUP_WINDOW'], app.config['DEDUP_MAX_ENTRIES'])
+    )
+    guard.enabled = app.config['RATE_LIMIT_ENABLED']
+    app.extensions['submission_guard'] = guard
+    return guard
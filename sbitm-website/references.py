@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+
+# Crockford base32: no I, L, O or U, so references read back over the phone
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+# 44-bit millisecond timestamp | 22-bit node | 10-bit sequence = 76 bits,
+# written as 16 base32 characters so references sort in creation order.
+# 22 bits hold any Linux PID (pid_max is at most 2**22).
+NODE_BITS = 22
+SEQUENCE_BITS = 10
+LENGTH = 16
+
+# Reference prefix -> table holding the submission
+PREFIXES = {
+    'ENQ': 'contacts',
+    'APP': 'applications',
+}
+
+
+def encode(value, length=LENGTH):
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+# Snowflake-style IDs: unique across worker processes without any shared
+# state, and strictly increasing within a process even if the clock steps
+# back. The node is node_id (NODE_ID) when set, otherwise the process ID
+# (re-read after a fork). PIDs are only unique among the processes of one
+# host or container, so writers in several containers (where PID 1 repeats)
+# need a distinct NODE_ID each. The lock only guards the (timestamp,
+# sequence) pair within a process.
+class ReferenceGenerator:
+    def __init__(self, node_id=None):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._node = 0
+        self._last_ms = 0
+        self._sequence = 0
+        self.node_id = None
+        self.set_node_id(node_id)
+
+    def set_node_id(self, node_id):
+        if node_id is not None and not 0 <= node_id < (1 << NODE_BITS):
+            raise ValueError(f"NODE_ID must be between 0 and {(1 << NODE_BITS) - 1}")
+        with self._lock:
+            self.node_id = node_id
+            self._pid = None
+
+    def next_value(self):
+        with self._lock:
+            pid = os.getpid()
+            if pid != self._pid:
+                self._pid = pid
+                self._node = pid & ((1 << NODE_BITS) - 1) if self.node_id is None else self.node_id
+                self._last_ms = 0
+
+            now = int(time.time() * 1000)
+            if now > self._last_ms:
+                self._last_ms = now
+                self._sequence = 0
+            else:
+                # Same millisecond or clock went backwards: stay on the last
+                # timestamp and borrow the next one once the sequence runs out
+                self._sequence += 1
+                if self._sequence >> SEQUENCE_BITS:
+                    self._last_ms += 1
+                    self._sequence = 0
+            return (self._last_ms << (NODE_BITS + SEQUENCE_BITS)) | (self._node << SEQUENCE_BITS) | self._sequence
+
+    def new(self, prefix):
+        return prefix + encode(self.next_value())
+
+
+_generator = ReferenceGenerator()
+
+
+# new_reference('ENQ') -> 'ENQ01JAB3K9QZ7M4001'
+def new_reference(prefix):
+    return _generator.new(prefix)
+
+
+def init_app(app):
+    app.config.setdefault('NODE_ID', None)
+    _generator.set_node_id(app.config['NODE_ID'])
+
+
+# Table for a reference, or None if it isn't one of ours
+def table_for(reference):
+    table = PREFIXES.get(reference[:3])
+    if table is None or len(reference) != 3 + LENGTH or any(c not in ALPHABET for c in reference[3:]):
+        return None
+    return table
+
+
+def add_reference_columns(cursor):
+    for table in PREFIXES.values():
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN reference TEXT')
+        # Rows from before references were stored stay NULL, which UNIQUE allows
+        cursor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_reference ON {table} (reference)')
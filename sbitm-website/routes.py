@@ -0,0 +1,34 @@
+import os
+
+# Public, cacheable GET pages of the site, shared by 'flask freeze' and
+# sitemap.xml. Per-request or private responses and Flask's own routes are
+# left out.
+DYNAMIC_PREFIXES = ('/api/', '/admin')
+DYNAMIC_ENDPOINTS = ('static', 'image_variant', 'metrics_endpoint', 'health_check')
+
+
+def public_paths(app):
+    paths = []
+    for rule in app.url_map.iter_rules():
+        if "GET" not in rule.methods or rule.arguments or rule.endpoint in DYNAMIC_ENDPOINTS:
+            continue
+        # .gz URLs are compressed copies of another path
+        if rule.rule.startswith(DYNAMIC_PREFIXES) or rule.rule.endswith('.gz'):
+            continue
+        paths.append(rule.rule)
+    return sorted(paths)
+
+
+# HTML pages, as opposed to files such as /feed.rss or /service-worker.js
+def is_page(path):
+    return not os.path.splitext(path.rstrip('/'))[1]
+
+
+# Canonical scheme and host for absolute URLs: SITE_URL, else SERVER_NAME
+# with PREFERRED_URL_SCHEME; None when neither is configured
+def site_url(app):
+    if app.config.get('SITE_URL'):
+        return app.config['SITE_URL'].rstrip('/')
+    if app.config.get('SERVER_NAME'):
+        return f"{app.config['PREFERRED_URL_SCHEME']}://{app.config['SERVER_NAME']}"
+    return None
@@ -0,0 +1,192 @@
+import itertools
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from markupsafe import escape
+
+# Private-use markers around matches; replaced with <mark> after escaping
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_QUERY_TOKENS = 8
+
+_index_ids = itertools.count()
+
+
+# Search documents from the site content: (kind, title, body, url)
+def college_documents(college_data, faculty_data):
+    for level, programs in college_data.get("programs", {}).items():
+        for program in programs:
+            yield ("program", f"{program['name']} ({program['code']})",
+                   f"{level.upper()} {program.get('description', '')} {program.get('duration', '')}",
+                   "/programs")
+    for facility in college_data.get("facilities", []):
+        yield ("facility", facility["name"], facility.get("description", ""), "/facilities")
+    for department in college_data.get("departments", []):
+        yield ("department", department["name"], f"Head of Department: {department.get('head', '')}",
+               "/departments")
+    for department, members in faculty_data.items():
+        for member in members:
+            yield ("faculty", member["name"],
+                   f"{member['designation']} {department} "
+                   f"{member['qualification']} {member['specialization']} {member['experience']}",
+                   "/faculty")
+
+
+# One complete FTS5 index in a shared-cache in-memory database. Readers get
+# pooled connections to it; once a newer index replaces it, connections are
+# closed as they come back and the memory is freed with the last one.
+class _Generation:
+    def __init__(self, uri):
+        self.uri = uri
+        self.lock = threading.Lock()
+        self.idle = []
+        self.retired = False
+        # Keeps the in-memory database alive while no reader is connected
+        self.owner = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.owner.execute('''
+            CREATE VIRTUAL TABLE search USING fts5(
+                title, body, kind UNINDEXED, url UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        ''')
+
+    # None once retired; the caller moves on to the current generation
+    def acquire(self):
+        with self.lock:
+            if self.retired:
+                return None
+            if self.idle:
+                return self.idle.pop()
+            # Opened under the lock, while the owner still holds the database
+            return sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+
+    def release(self, conn):
+        with self.lock:
+            if not self.retired:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+    def retire(self):
+        with self.lock:
+            self.retired = True
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+        self.owner.close()
+
+
+# FTS5 site search. A rebuild fills a fresh in-memory database and swaps it
+# in whole, so searches never see a half-built index. At most pool_size
+# searches run at once, each on its own connection, so concurrent readers
+# don't serialise on one handle and idle threads hold no connections.
+class SearchIndex:
+    # refresh: called before every search, e.g. the content store's current(),
+    # so the first query on a fresh worker builds the index instead of
+    # finding it empty
+    def __init__(self, cache_size=1024, refresh=None, pool_size=8):
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._current = self._new_generation()
+        self._cache = OrderedDict()
+        self.cache_size = cache_size
+        self._hits = 0
+        self._misses = 0
+        self._rebuilds = 0
+
+    @staticmethod
+    def _new_generation():
+        return _Generation(f"file:sbitm-search-{next(_index_ids)}?mode=memory&cache=shared")
+
+    def rebuild(self, documents):
+        generation = self._new_generation()
+        with generation.owner:
+            generation.owner.executemany(
+                'INSERT INTO search (kind, title, body, url) VALUES (?, ?, ?, ?)', documents
+            )
+            generation.owner.execute("INSERT INTO search (search) VALUES ('optimize')")
+        with self._lock:
+            previous, self._current = self._current, generation
+            self._cache.clear()
+            self._rebuilds += 1
+        previous.retire()
+
+    def _query(self, generation, sql, params):
+        with self._slots:
+            conn = generation.acquire()
+            while conn is None:
+                # Replaced since the caller looked; use the newer index
+                generation = self._current
+                conn = generation.acquire()
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                generation.release(conn)
+
+    @staticmethod
+    def match_expression(query):
+        # Each word must match; the last one as a prefix for typeahead
+        tokens = TOKEN_RE.findall(query.lower())[:MAX_QUERY_TOKENS]
+        if not tokens:
+            return None
+        terms = [f'"{token}"' for token in tokens]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search(self, query, limit=10, kind=None):
+        if self.refresh is not None:
+            self.refresh()
+        expression = self.match_expression(query)
+        key = (expression, limit, kind)
+        with self._lock:
+            generation = self._current
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return cached
+            self._misses += 1
+
+        results = []
+        if expression is not None:
+            sql = f'''
+                SELECT kind, title, url,
+                       snippet(search, 1, '{MATCH_START}', '{MATCH_END}', '…', 12),
+                       highlight(search, 0, '{MATCH_START}', '{MATCH_END}'),
+                       bm25(search, 10.0, 1.0)
+                FROM search WHERE search MATCH ?{' AND kind = ?' if kind else ''}
+                ORDER BY bm25(search, 10.0, 1.0) LIMIT ?
+            '''
+            params = [expression] + ([kind] if kind else []) + [limit]
+            for kind_, title, url, snippet, highlighted, score in self._query(generation, sql, params):
+                results.append({
+                    "kind": kind_,
+                    "title": title,
+                    "url": url,
+                    "title_html": _highlight(highlighted),
+                    "snippet_html": _highlight(snippet),
+                    "score": round(-score, 4)
+                })
+
+        with self._lock:
+            if self._current is not generation:
+                # Rebuilt meanwhile; don't cache results from the old index
+                return results
+            self._cache[key] = results
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {"cached_queries": len(self._cache), "hits": self._hits, "misses": self._misses,
+                    "rebuilds": self._rebuilds}
+
+
+def _highlight(text):
+    return str(escape(text)).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
@@ -0,0 +1,190 @@
+import hashlib
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from flask import abort, request
+
+from compression import available_encodings, compress, negotiate
+from routes import is_page, public_paths, site_url
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+# Per-file limit of the sitemap protocol; larger sets are split behind an index
+MAX_URLS = 50000
+MIN_ENCODED_SIZE = 512
+
+
+class _Document:
+    __slots__ = ('body', 'mimetype', 'etag', 'encoded', 'last_modified')
+
+    def __init__(self, body, mimetype, last_modified, encode=True):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.last_modified = last_modified
+        self.encoded = {}
+        if encode and len(body) >= MIN_ENCODED_SIZE:
+            for encoding in available_encodings():
+                compressed = compress(body, encoding, 9)
+                if len(compressed) < len(body):
+                    self.encoded[encoding] = compressed
+
+
+def _xml(lines):
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n' + '\n'.join(lines) + '\n').encode('utf-8')
+
+
+def urlset(urls):
+    return _xml([f'<urlset xmlns="{SITEMAP_NS}">']
+                + [f'  <url><loc>{escape(url)}</loc></url>' for url in urls]
+                + ['</urlset>'])
+
+
+def sitemap_index(urls):
+    return _xml([f'<sitemapindex xmlns="{SITEMAP_NS}">']
+                + [f'  <sitemap><loc>{escape(url)}</loc></sitemap>' for url in urls]
+                + ['</sitemapindex>'])
+
+
+# Announcements from data.json (the homepage hero slides) as RSS 2.0
+def rss(base_url, college, updated):
+    info = college.get('college', {})
+    date = format_datetime(updated)
+    lines = [
+        '<rss version="2.0">',
+        '<channel>',
+        f'  <title>{escape(info.get("name", "SBITM Betul"))}</title>',
+        f'  <link>{escape(base_url)}/</link>',
+        f'  <description>{escape(info.get("vision", ""))}</description>',
+        f'  <lastBuildDate>{date}</lastBuildDate>',
+    ]
+    for slide in college.get('hero_slides', ()):
+        link = base_url + slide.get('cta', {}).get('link', '/')
+        lines += [
+            '  <item>',
+            f'    <title>{escape(slide.get("title", ""))}</title>',
+            f'    <link>{escape(link)}</link>',
+            f'    <description>{escape(slide.get("subtitle", ""))}</description>',
+            f'    <guid isPermaLink="false">{escape(link)}#{escape(slide.get("title", ""))}</guid>',
+            f'    <pubDate>{date}</pubDate>',
+            '  </item>',
+        ]
+    return _xml(lines + ['</channel>', '</rss>'])
+
+
+# sitemap.xml and feed.rss built once per content version, with
+# precompressed variants, so crawler traffic is a dictionary lookup and
+# usually a 304. A new deploy starts with an empty cache.
+#
+# URLs use the canonical SITE_URL/SERVER_NAME, never the Host header, which
+# any client can set. Only when neither is configured (development) are
+# they built for the requesting host, and then the cache holds one host.
+class Sitemaps:
+    def __init__(self, app, content_store, max_urls=MAX_URLS, max_age=3600):
+        self.app = app
+        self.content_store = content_store
+        self.max_urls = max_urls
+        self.max_age = max_age
+        self._generators = []
+        # (base URL, content version, documents)
+        self._built = None
+        self._lock = threading.Lock()
+        self._builds = 0
+        self._not_modified = 0
+
+    # Decorator for functions taking the content snapshot and yielding extra
+    # paths, e.g. one page per program
+    def urls(self, generator):
+        self._generators.append(generator)
+        return generator
+
+    def paths(self, snapshot):
+        # Public HTML pages only; /api, /admin and non-page files are left out
+        paths = [path for path in public_paths(self.app) if is_page(path)]
+        for generator in self._generators:
+            paths.extend(generator(snapshot))
+        return paths
+
+    def build(self, base_url, snapshot):
+        updated = datetime.now(timezone.utc).replace(microsecond=0)
+        urls = [base_url + path for path in self.paths(snapshot)]
+        documents = {}
+        if len(urls) <= self.max_urls:
+            documents['sitemap.xml'] = _Document(urlset(urls), 'application/xml', updated)
+        else:
+            parts = [urls[i:i + self.max_urls] for i in range(0, len(urls), self.max_urls)]
+            for number, part in enumerate(parts, 1):
+                documents[f'sitemap-{number}.xml'] = _Document(urlset(part), 'application/xml', updated)
+            documents['sitemap.xml'] = _Document(
+                sitemap_index([f"{base_url}/sitemap-{number}.xml" for number in range(1, len(parts) + 1)]),
+                'application/xml', updated
+            )
+        # Every sitemap file is also published gzipped, as crawlers accept
+        for name, document in list(documents.items()):
+            documents[name + '.gz'] = _Document(compress(document.body, 'gzip', 9), 'application/gzip', updated,
+                                                encode=False)
+        documents['feed.rss'] = _Document(rss(base_url, snapshot.college, updated), 'application/rss+xml', updated)
+        return documents
+
+    def documents(self, base_url):
+        snapshot = self.content_store.current()
+        with self._lock:
+            built = self._built
+            if built is not None and built[0] == base_url and built[1] == snapshot.version:
+                return built[2]
+
+        documents = self.build(base_url, snapshot)
+        with self._lock:
+            self._builds += 1
+            self._built = (base_url, snapshot.version, documents)
+        return documents
+
+    def serve(self, name):
+        base_url = site_url(self.app) or request.host_url.rstrip('/')
+        document = self.documents(base_url).get(name)
+        if document is None:
+            abort(404)
+
+        encoding = negotiate(document.encoded) if document.encoded else None
+        body = document.encoded[encoding] if encoding else document.body
+        response = self.app.response_class(body, mimetype=document.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if document.encoded:
+            response.vary.add('Accept-Encoding')
+        # Weak when encoded, matching what compression.py does
+        response.set_etag(document.etag, weak=bool(encoding))
+        response.last_modified = document.last_modified
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            with self._lock:
+                self._not_modified += 1
+        return response
+
+    def clear(self):
+        with self._lock:
+            count = int(self._built is not None)
+            self._built = None
+        return count
+
+    def stats(self):
+        with self._lock:
+            return {
+                "base_url": self._built[0] if self._built is not None else None,
+                "builds": self._builds,
+                "not_modified": self._not_modified
+            }
+
+
+def init_app(app, content_store):
+    app.config.setdefault('SITEMAP_MAX_URLS', MAX_URLS)
+    app.config.setdefault('SITEMAP_MAX_AGE', 3600)
+
+    sitemaps = Sitemaps(app, content_store,
+                        max_urls=app.config['SITEMAP_MAX_URLS'],
+                        max_age=app.config['SITEMAP_MAX_AGE'])
+    app.extensions['sitemaps'] = sitemaps
+    return sitemaps
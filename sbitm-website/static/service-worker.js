@@ -1,12 +1,109 @@
+// PRECACHE_VERSION and PRECACHE_URLS are prepended by the /service-worker.js
+// route from the server's asset manifest, so every deploy that changes a
+// static file also changes this script and triggers an update.
+const PRECACHE = `sbitm-precache-${PRECACHE_VERSION}`;
+// Cached pages link the fingerprinted assets of the deploy that rendered
+// them, which the server stops mapping on the next one, so they go too
+const PAGES = `sbitm-pages-${PRECACHE_VERSION}`;
+const IMAGES = 'sbitm-images-v1';
+const CURRENT_CACHES = [PRECACHE, PAGES, IMAGES];
+const MAX_IMAGE_ENTRIES = 60;
+
 self.addEventListener('install', event => {
-    console.log('Service Worker installed');
-    self.skipWaiting();
+    event.waitUntil(
+        caches.open(PRECACHE)
+            .then(cache => cache.addAll(PRECACHE_URLS))
+            .then(() => self.skipWaiting())
+    );
 });
 
 self.addEventListener('activate', event => {
-    console.log('Service Worker activated');
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys.filter(key => key.startsWith('sbitm-') && !CURRENT_CACHES.includes(key))
+                    .map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
 });
 
+async function trimCache(name, maxEntries) {
+    const cache = await caches.open(name);
+    const keys = await cache.keys();
+    for (let i = 0; i < keys.length - maxEntries; i++) {
+        await cache.delete(keys[i]);
+    }
+}
+
+// Hashed static assets and images never change under the same URL
+async function cacheFirst(request, cacheName) {
+    const cached = await caches.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok) {
+        const cache = await caches.open(cacheName);
+        await cache.put(request, response.clone());
+        if (cacheName === IMAGES) {
+            trimCache(IMAGES, MAX_IMAGE_ENTRIES);
+        }
+    }
+    return response;
+}
+
+// Pages: answer from cache immediately, refresh the copy in the background
+async function staleWhileRevalidate(event) {
+    const cache = await caches.open(PAGES);
+    const cached = await cache.match(event.request);
+    const network = fetch(event.request)
+        .then(response => {
+            if (response.ok) {
+                cache.put(event.request, response.clone());
+            }
+            return response;
+        });
+
+    if (cached) {
+        event.waitUntil(network.catch(() => undefined));
+        return cached;
+    }
+    try {
+        return await network;
+    } catch (error) {
+        // Offline and never visited: fall back to the precached home page
+        return (await caches.match('/')) || Response.error();
+    }
+}
+
 self.addEventListener('fetch', event => {
-    // pass-through
+    const request = event.request;
+    if (request.method !== 'GET') {
+        return;
+    }
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) {
+        return;
+    }
+
+    // Network-only: form submissions, live stats and the admin panel
+    if (url.pathname.startsWith('/api/') || url.pathname.startsWith('/admin/')) {
+        return;
+    }
+
+    if (request.destination === 'image' || url.pathname.startsWith('/media/')) {
+        event.respondWith(cacheFirst(request, IMAGES));
+        return;
+    }
+
+    if (url.pathname.startsWith('/static/')) {
+        event.respondWith(cacheFirst(request, PRECACHE));
+        return;
+    }
+
+    if (request.mode === 'navigate' || (request.headers.get('accept') || '').includes('text/html')) {
+        event.respondWith(staleWhileRevalidate(event));
+    }
 });
@@ -0,0 +1,30 @@
+import os
+import time
+
+from jinja2 import FileSystemBytecodeCache
+
+TEMPLATE_EXTENSIONS = ('.html', '.xml', '.rss')
+
+
+def configure_templates(app):
+    app.jinja_env.auto_reload = app.config['TEMPLATES_AUTO_RELOAD']
+
+    cache_dir = app.config.get('TEMPLATE_CACHE_DIR')
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir, '%s.jinja.cache')
+
+    if app.config.get('PRECOMPILE_TEMPLATES'):
+        started = time.perf_counter()
+        count = precompile_templates(app)
+        print(f"✅ Compiled {count} templates in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+# Loads every template once; a syntax error raises here instead of on the
+# first request that happens to render it
+def precompile_templates(app):
+    count = 0
+    for name in app.jinja_env.list_templates(extensions=[ext.lstrip('.') for ext in TEMPLATE_EXTENSIONS]):
+        app.jinja_env.get_template(name)
+        count += 1
+    return count
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from migrations import migrate  # noqa: E402
+
+
+# A fresh app per test on its own database; everything else as in development
+@pytest.fixture
+def app(tmp_path):
+    return create_app('development', DATABASE=str(tmp_path / 'sbitm.db'), TESTING=True)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# Path of an empty, fully migrated database for tests below the app
+@pytest.fixture
+def database(tmp_path):
+    database = str(tmp_path / 'sbitm.db')
+    migrate(database)
+    return database
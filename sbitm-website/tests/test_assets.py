@@ -0,0 +1,28 @@
+import os
+
+from app import create_app
+from assets import AssetManifest
+
+
+def test_development_rehashes_edited_files(app):
+    assert app.extensions['asset_manifest'].reload
+
+
+def test_production_keeps_fingerprints(tmp_path):
+    app = create_app('production', DATABASE=str(tmp_path / 'sbitm.db'), TEMPLATE_CACHE_DIR=None,
+                     PRECOMPILE_TEMPLATES=False)
+    assert not app.extensions['asset_manifest'].reload
+
+
+def test_reload_follows_edits(tmp_path):
+    path = tmp_path / 'css' / 'site.css'
+    path.parent.mkdir()
+    path.write_text('body { color: red; }')
+    manifest = AssetManifest(str(tmp_path), reload=True)
+    before = manifest.hashed('css/site.css')
+
+    path.write_text('body { color: blue; }')
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1000))
+    after = manifest.hashed('css/site.css')
+    assert after != before
+    assert manifest.original(after) == 'css/site.css'
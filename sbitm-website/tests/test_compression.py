@@ -0,0 +1,55 @@
+import gzip
+import os
+
+from compression import precompress_static
+
+
+def test_static_sidecar_is_chosen_when_accepted(app, client):
+    with open(os.path.join(app.static_folder, 'css', 'main.css'), 'rb') as f:
+        original = f.read()
+
+    response = client.get('/static/css/main.css', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype == 'text/css'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == original
+
+    plain = client.get('/static/css/main.css')
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+    assert plain.data == original
+
+    refused = client.get('/static/css/main.css', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+    assert 'Content-Encoding' not in refused.headers
+
+
+def test_pages_are_compressed_on_the_way_out(client):
+    plain = client.get('/about')
+    response = client.get('/about', headers={'Accept-Encoding': 'br;q=1.0, gzip;q=0.5'})
+    assert response.headers['Content-Encoding'] in ('br', 'gzip')
+    assert 'Accept-Encoding' in response.headers['Vary']
+    if response.headers['Content-Encoding'] == 'gzip':
+        assert gzip.decompress(response.data) == plain.data
+    # The encoded body gets a weak validator that still matches the page
+    assert response.headers['ETag'].startswith('W/')
+    assert client.get('/about', headers={'Accept-Encoding': 'gzip',
+                                         'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_small_responses_are_left_alone(client):
+    response = client.get('/api/stats', headers={'Accept-Encoding': 'gzip'})
+    assert len(response.data) < 1024
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_precompress_skips_small_and_unchanged_files(tmp_path):
+    (tmp_path / 'big.css').write_text('body { margin: 0; }\n' * 200)
+    (tmp_path / 'small.css').write_text('a{}')
+    (tmp_path / 'photo.jpg').write_bytes(b'\xff' * 4096)
+
+    assert precompress_static(str(tmp_path), min_size=512) >= 1
+    assert gzip.decompress((tmp_path / 'big.css.gz').read_bytes()) == (tmp_path / 'big.css').read_bytes()
+    assert not (tmp_path / 'small.css.gz').exists()
+    assert not (tmp_path / 'photo.jpg.gz').exists()
+    assert precompress_static(str(tmp_path), min_size=512) == 0
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
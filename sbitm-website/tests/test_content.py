@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+
+from content import ContentStore
+
+
+def write(path, value):
+    path.write_text(value if isinstance(value, str) else json.dumps(value))
+    # Some filesystems keep coarse mtimes; make every edit visible
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+
+@pytest.fixture
+def store(tmp_path):
+    college = tmp_path / 'data.json'
+    faculty = tmp_path / 'faculty.json'
+    write(college, {"programs": {"ug": [{"code": "CSE", "name": "Computer Science"}]},
+                    "departments": [{"name": "CSE"}]})
+    write(faculty, {"CSE": [{"name": "Dr. Rao", "designation": "HOD & Professor"}]})
+    return ContentStore(str(college), str(faculty), check_interval=0)
+
+
+def test_snapshot_is_read_only_and_precomputed(store):
+    snapshot = store.current()
+    assert snapshot.programs_by_code["CSE"]["name"] == "Computer Science"
+    assert snapshot.faculty_heads["CSE"]["name"] == "Dr. Rao"
+    assert json.loads(snapshot.faculty_json["CSE"])["faculty"][0]["name"] == "Dr. Rao"
+    with pytest.raises(TypeError):
+        snapshot.college["programs"] = {}
+    assert store.current() is snapshot
+
+
+def test_edit_swaps_in_a_new_snapshot(store, tmp_path):
+    reloaded = []
+    store.on_reload(reloaded.append)
+    first = store.current()
+
+    write(tmp_path / 'data.json', {"programs": {"ug": [{"code": "ME", "name": "Mechanical"}]}})
+    second = store.current()
+    assert second is not first and second.version != first.version
+    assert list(second.programs_by_code) == ["ME"]
+    assert reloaded == [first, second]
+    # The old snapshot is untouched for requests still holding it
+    assert list(first.programs_by_code) == ["CSE"]
+
+
+def test_broken_edit_keeps_the_last_good_snapshot(store, tmp_path):
+    good = store.current()
+    write(tmp_path / 'faculty.json', '{"CSE": [')
+    assert store.current() is good
+
+
+def test_reload_can_be_disabled(tmp_path, store):
+    store.check_interval = None
+    first = store.current()
+    write(tmp_path / 'data.json', {"programs": {}})
+    assert store.current() is first
@@ -0,0 +1,68 @@
+import sqlite3
+
+from counters import TTLCache, create_counter_schema, load_counts
+
+
+def test_triggers_keep_totals_and_rollups(database):
+    conn = sqlite3.connect(database)
+    conn.executemany("INSERT INTO contacts (name, email, created_at) VALUES (?, ?, ?)", [
+        ('A', 'a@x.example', '2024-03-01 09:00:00'),
+        ('B', 'b@x.example', '2024-03-01 17:00:00'),
+        ('C', 'c@x.example', '2024-04-02 10:00:00'),
+    ])
+    conn.execute("INSERT INTO contacts (name, email) VALUES ('Today', 't@x.example')")
+    conn.execute("INSERT INTO newsletter (email) VALUES ('n@x.example')")
+    conn.commit()
+
+    assert dict(conn.execute("SELECT day, value FROM daily_counts WHERE name = 'contacts' "
+                             "AND day < '2025-01-01'").fetchall()) == {'2024-03-01': 2, '2024-04-02': 1}
+    assert dict(conn.execute("SELECT month, value FROM monthly_counts WHERE name = 'contacts' "
+                             "AND month < '2025-01'").fetchall()) == {'2024-03': 2, '2024-04': 1}
+    counts = load_counts(conn)
+    assert counts["total_contacts"] == 4
+    assert counts["contacts_today"] == counts["contacts_month"] == 1
+    assert counts["newsletter_subscribers"] == 1
+    assert counts["total_applications"] == counts["applications_today"] == 0
+
+    # Deletes lower the running total; the rollups record arrivals
+    conn.execute("DELETE FROM contacts WHERE name IN ('A', 'Today')")
+    conn.commit()
+    counts = load_counts(conn)
+    assert counts["total_contacts"] == 2
+    assert counts["contacts_today"] == 1
+    conn.close()
+
+
+def test_counters_are_seeded_from_existing_rows(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'old.db'))
+    conn.execute('CREATE TABLE contacts (id INTEGER PRIMARY KEY, created_at TEXT)')
+    conn.execute('CREATE TABLE applications (id INTEGER PRIMARY KEY, created_at TEXT)')
+    conn.execute('CREATE TABLE newsletter (id INTEGER PRIMARY KEY, subscribed_at TEXT)')
+    conn.executemany('INSERT INTO contacts (created_at) VALUES (?)',
+                     [('2023-01-05 10:00:00',), ('2023-01-05 11:00:00',), ('2023-02-01 10:00:00',)])
+    conn.execute("INSERT INTO applications (created_at) VALUES ('2023-02-01 12:00:00')")
+
+    create_counter_schema(conn.cursor())
+    # Installing again must not count the rows twice
+    create_counter_schema(conn.cursor())
+    assert dict(conn.execute('SELECT name, value FROM counters').fetchall()) == \
+        {'contacts': 3, 'applications': 1, 'newsletter': 0}
+    assert conn.execute("SELECT value FROM daily_counts WHERE day = '2023-01-05' AND name = 'contacts'"
+                        ).fetchone()[0] == 2
+    assert conn.execute("SELECT value FROM monthly_counts WHERE month = '2023-02' AND name = 'applications'"
+                        ).fetchone()[0] == 1
+
+    conn.execute("INSERT INTO contacts (created_at) VALUES ('2023-02-03 10:00:00')")
+    assert conn.execute("SELECT value FROM counters WHERE name = 'contacts'").fetchone()[0] == 4
+    conn.close()
+
+
+def test_stats_cache_loads_once_per_ttl():
+    cache = TTLCache(ttl=60)
+    calls = []
+    assert cache.peek('counts') is None
+    assert cache.get('counts', lambda: calls.append(1) or {"n": 1}) == {"n": 1}
+    assert cache.get('counts', lambda: calls.append(1) or {"n": 2}) == {"n": 1}
+    assert cache.peek('counts') == {"n": 1} and len(calls) == 1
+    cache.clear()
+    assert cache.peek('counts') is None
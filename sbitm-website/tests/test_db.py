@@ -0,0 +1,51 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db import ConnectionPool
+from migrations import SCHEMA_VERSION, migrate, schema_version
+
+
+def test_migrate_is_idempotent(tmp_path):
+    database = str(tmp_path / 'sbitm.db')
+    assert migrate(database) == (0, SCHEMA_VERSION)
+    assert migrate(database) == (SCHEMA_VERSION, SCHEMA_VERSION)
+
+    conn = sqlite3.connect(database)
+    assert schema_version(conn) == SCHEMA_VERSION
+    assert conn.execute("SELECT COUNT(*) FROM admin_users WHERE username = 'admin'").fetchone()[0] == 1
+    assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+    conn.close()
+
+
+def test_concurrent_migrations_apply_once(tmp_path):
+    database = str(tmp_path / 'sbitm.db')
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(migrate(database))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == [(0, SCHEMA_VERSION)] + [(SCHEMA_VERSION, SCHEMA_VERSION)] * 5
+
+
+def test_pool_reuses_connections_and_rolls_back(database):
+    pool = ConnectionPool(database, max_size=2, timeout=0.1)
+
+    conn = pool.acquire()
+    conn.execute("INSERT INTO newsletter (email) VALUES ('left@open.example')")
+    pool.release(conn)
+    # The next request never sees the abandoned transaction
+    again = pool.acquire()
+    assert again is conn
+    assert again.execute('SELECT COUNT(*) FROM newsletter').fetchone()[0] == 0
+
+    other = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    pool.release(again)
+    pool.release(other)
+    stats = pool.stats()
+    assert stats["size"] == 2 and stats["in_use"] == 0 and stats["timeouts"] == 1
+    pool.close_all()
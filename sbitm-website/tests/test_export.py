@@ -0,0 +1,55 @@
+import csv
+import io
+
+import db
+
+
+def login(client):
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+
+
+def track_connections(app, monkeypatch):
+    pool = db.get_pool(app)
+    opened = []
+    connect = pool.connect
+
+    def tracked():
+        conn = connect()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(pool, 'connect', tracked)
+    return opened
+
+
+def is_closed(conn):
+    try:
+        conn.execute('SELECT 1')
+    except Exception:
+        return True
+    return False
+
+
+def test_export_streams_rows_and_closes_its_connection(app, client, monkeypatch):
+    client.post('/api/contact', json={"name": "Asha", "email": "asha@example.com"})
+    login(client)
+    opened = track_connections(app, monkeypatch)
+
+    response = client.get('/admin/export/contacts.csv')
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert any('asha@example.com' in row for row in rows)
+    assert len(opened) == 1 and is_closed(opened[0])
+
+
+def test_export_abandoned_before_the_first_chunk_opens_nothing(app, monkeypatch):
+    opened = track_connections(app, monkeypatch)
+    with app.test_request_context('/admin/export/contacts.ndjson'):
+        from flask import session
+        session['admin_logged_in'] = True
+        response = app.view_functions['admin_export'](table='contacts', fmt='ndjson')
+    assert response.is_streamed
+    # The client disconnected: the server closes the body unread
+    response.close()
+    assert opened == []
@@ -0,0 +1,24 @@
+def faculty_images(client):
+    html = client.get('/faculty').get_data(as_text=True)
+    return {line.strip() for line in html.splitlines() if '/static/images/faculty/' in line}
+
+
+def test_faculty_fragment_is_reused(app, client):
+    first = faculty_images(client)
+    assert first
+    assert faculty_images(client) == first
+    assert app.jinja_env.fragment_cache.stats()["hits"] >= 1
+
+
+def test_new_asset_fingerprints_render_the_fragment_again(app, client, monkeypatch):
+    before = faculty_images(client)
+
+    # A deploy that changes fingerprints: same content, new asset URLs
+    manifest = app.extensions['asset_manifest']
+    hashed = manifest.hashed
+    monkeypatch.setattr(manifest, 'hashed', lambda filename: 'v2/' + hashed(filename))
+    monkeypatch.setattr(manifest, 'version', 'v2')
+
+    after = faculty_images(client)
+    assert after != before
+    assert all('/static/v2/images/faculty/' in line for line in after)
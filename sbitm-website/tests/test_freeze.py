@@ -0,0 +1,37 @@
+import json
+import os
+import re
+
+
+def test_freeze_requires_a_base_url(app, tmp_path):
+    result = app.test_cli_runner().invoke(args=['freeze', '--output', str(tmp_path / 'frozen')])
+    assert result.exit_code != 0
+    assert 'base URL' in result.output
+    assert not os.path.exists(tmp_path / 'frozen')
+
+
+def test_refreeze_only_renders_changed_pages(app, tmp_path):
+    output = str(tmp_path / 'frozen')
+    runner = app.test_cli_runner()
+    args = ['freeze', '--output', output, '--base-url', 'https://www.sbitm.edu.in']
+
+    first = runner.invoke(args=args)
+    assert first.exit_code == 0, first.output
+    with open(os.path.join(output, 'sitemap.xml'), encoding='utf-8') as f:
+        assert '<loc>https://www.sbitm.edu.in/about</loc>' in f.read()
+
+    with open(os.path.join(output, '.freeze-manifest.json'), encoding='utf-8') as f:
+        deps = json.load(f)["pages"]["/"]["deps"]
+    assert 'asset:css/style.css' in deps
+    assert any(dependency.startswith('data:') for dependency in deps)
+    assert 'template:templates/base.html' in deps
+
+    second = runner.invoke(args=args)
+    assert second.exit_code == 0, second.output
+    rendered, unchanged = map(int, re.search(r'Froze (\d+) pages, (\d+) unchanged', second.output).groups())
+    first_rendered = int(re.search(r'Froze (\d+) pages', first.output).group(1))
+    # Only responses not built from a template are rendered every run
+    assert unchanged > 0 and rendered + unchanged == first_rendered and rendered < unchanged
+    # The lookup hooks are only installed while freezing
+    assert app.extensions['asset_manifest']._lookup_hooks == []
+    assert app.extensions['image_pipeline']._lookup_hooks == []
@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+import listing
+
+
+@pytest.fixture
+def conn(database):
+    conn = sqlite3.connect(database)
+    conn.row_factory = sqlite3.Row
+    # Five contacts per day, several sharing a timestamp
+    conn.executemany(
+        "INSERT INTO contacts (name, email, status, created_at) VALUES (?, ?, ?, ?)",
+        [(f"Student {n}", f"s{n}@example.com", 'new' if n % 2 else 'read',
+          f"2024-03-{1 + n // 5:02d} 10:00:{n % 3:02d}") for n in range(50)]
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_keyset_pages_cover_every_row_once(conn):
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = listing.fetch_page(conn, 'contacts', {}, cursor=cursor, limit=7)
+        seen.extend(row['id'] for row in rows)
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 50
+    expected = [row['id'] for row in conn.execute('SELECT id FROM contacts ORDER BY created_at DESC, id DESC')]
+    assert seen == expected
+
+
+def test_filters_and_date_range(conn):
+    filters = listing.parse_filters('contacts', {'status': 'new', 'from': '2024-03-02', 'to': '2024-03-03'})
+    rows, cursor = listing.fetch_page(conn, 'contacts', filters, limit=100)
+    assert cursor is None
+    assert rows and all(row['status'] == 'new' and '2024-03-02' <= row['created_at'][:10] <= '2024-03-03'
+                        for row in rows)
+
+
+@pytest.mark.parametrize('value', ['2024-13-45', '2024-02-30', '2024-1-5', 'yesterday'])
+def test_impossible_dates_are_rejected(value):
+    with pytest.raises(listing.InvalidListingQuery):
+        listing.parse_filters('contacts', {'from': value})
+
+
+def test_admin_listing_returns_400_for_bad_dates(client):
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+    response = client.get('/admin/contacts?format=json&to=2024-13-45')
+    assert response.status_code == 400
+    assert 'YYYY-MM-DD' in response.get_json()["message"]
+
+
+def test_invalid_cursor(conn):
+    with pytest.raises(listing.InvalidListingQuery):
+        listing.fetch_page(conn, 'contacts', {}, cursor='not-a-cursor!')
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pytest
+
+from counters import load_counts
+from maintenance import _create_archive_table, archive_old_rows, archive_path, backup, rotate_backup, vacuum_step
+
+
+@pytest.fixture
+def database(database):
+    conn = sqlite3.connect(database)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executemany(
+        "INSERT INTO contacts (name, email, message, created_at) VALUES (?, ?, ?, ?)",
+        [(f"S{n}", f"s{n}@example.com", 'x' * 200, f"{2018 + n % 3}-06-01 10:00:00") for n in range(300)]
+    )
+    conn.executemany("INSERT INTO contacts (name, email) VALUES (?, ?)", [(f"N{n}", "new@example.com")
+                                                                           for n in range(20)])
+    conn.commit()
+    conn.close()
+    return database
+
+
+def test_backup_is_consistent_under_writes(database, tmp_path):
+    stop = threading.Event()
+
+    def writer():
+        conn = sqlite3.connect(database, timeout=10)
+        while not stop.is_set():
+            with conn:
+                conn.execute("INSERT INTO newsletter (email) VALUES (?)", (f"w{os.urandom(6).hex()}@x.example",))
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        report = backup(database, str(tmp_path / 'copy.db'), pages=2, sleep=0)
+    finally:
+        stop.set()
+        thread.join()
+
+    copy = sqlite3.connect(report["path"])
+    assert copy.execute('PRAGMA quick_check').fetchone()[0] == 'ok'
+    assert copy.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+    assert copy.execute('SELECT COUNT(*) FROM contacts').fetchone()[0] == 320
+    # Counters agree with the rows in the same snapshot
+    assert copy.execute("SELECT value FROM counters WHERE name = 'newsletter'").fetchone()[0] == \
+        copy.execute('SELECT COUNT(*) FROM newsletter').fetchone()[0]
+    copy.close()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_rotation_keeps_the_newest(database, tmp_path, monkeypatch):
+    backup_dir = str(tmp_path / 'backups')
+    stamps = iter(datetime(2024, 1, day) for day in range(1, 6))
+    monkeypatch.setattr('maintenance.datetime', type('Clock', (), {'now': staticmethod(lambda: next(stamps))}))
+    for _ in range(5):
+        report = rotate_backup(database, backup_dir, keep=2)
+    assert sorted(os.listdir(backup_dir)) == ['sbitm-20240104-000000.db', 'sbitm-20240105-000000.db']
+    assert report["kept"] == 2
+
+
+def test_archive_moves_old_rows_and_keeps_totals(database, tmp_path):
+    archive_dir = str(tmp_path / 'archive')
+    conn = sqlite3.connect(database)
+    total = load_counts(conn)["total_contacts"]
+
+    report = archive_old_rows(conn, archive_dir, years=3, batch=40)
+    assert sum(report.values()) == 300
+    assert conn.execute('SELECT COUNT(*) FROM contacts').fetchone()[0] == 20
+    assert load_counts(conn)["total_contacts"] == total == 320
+
+    for year in ('2018', '2019', '2020'):
+        archive = sqlite3.connect(archive_path(archive_dir, year))
+        assert archive.execute('SELECT COUNT(*) FROM contacts').fetchone()[0] == 100
+        archive.close()
+
+    # Nothing left to move; a rerun changes nothing
+    assert archive_old_rows(conn, archive_dir, years=3) == {}
+    before, after = vacuum_step(conn, pages=100000)
+    assert before > 0 and after == 0
+    conn.close()
+
+
+def test_interrupted_archive_is_finished_without_duplicates(database, tmp_path):
+    archive_dir = str(tmp_path / 'archive')
+    conn = sqlite3.connect(database)
+    # A previous run copied these rows but died before deleting them
+    os.makedirs(archive_dir)
+    conn.execute('ATTACH DATABASE ? AS archive', (archive_path(archive_dir, '2018'),))
+    _create_archive_table(conn, 'contacts')
+    conn.execute("INSERT INTO archive.contacts SELECT * FROM main.contacts WHERE created_at LIKE '2018%' LIMIT 10")
+    conn.commit()
+    conn.execute('DETACH DATABASE archive')
+
+    archive_old_rows(conn, archive_dir, years=3)
+    archive = sqlite3.connect(archive_path(archive_dir, '2018'))
+    assert archive.execute('SELECT COUNT(*), COUNT(DISTINCT id) FROM contacts').fetchone() == (100, 100)
+    archive.close()
+    conn.close()
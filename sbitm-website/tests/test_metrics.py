@@ -0,0 +1,27 @@
+from app import create_app
+
+
+def test_metrics_allowed_from_loopback_in_development(client):
+    response = client.get('/metrics', environ_base={'REMOTE_ADDR': '127.0.0.1'})
+    assert response.status_code == 200
+    assert b'# TYPE' in response.data
+
+
+def test_metrics_forbidden_to_other_addresses(client):
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'}).status_code == 403
+
+
+def test_production_only_allows_listed_networks(tmp_path):
+    app = create_app('production', DATABASE=str(tmp_path / 'sbitm.db'), TEMPLATE_CACHE_DIR=None,
+                     PRECOMPILE_TEMPLATES=False)
+    assert app.test_client().get('/metrics', environ_base={'REMOTE_ADDR': '127.0.0.1'}).status_code == 403
+
+    app = create_app('production', DATABASE=str(tmp_path / 'sbitm.db'), TEMPLATE_CACHE_DIR=None,
+                     PRECOMPILE_TEMPLATES=False, METRICS_ALLOW_IPS='10.0.0.0/8')
+    assert app.test_client().get('/metrics', environ_base={'REMOTE_ADDR': '10.1.2.3'}).status_code == 200
+
+
+def test_admin_may_read_metrics(client):
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.9'}).status_code == 200
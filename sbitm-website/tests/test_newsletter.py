@@ -0,0 +1,137 @@
+import io
+import sqlite3
+import threading
+
+import pytest
+
+from newsletter import CampaignDispatcher, SMTPUnavailable, WorkersStopped, import_subscribers, read_emails
+
+
+def connect(database):
+    def open_connection():
+        conn = sqlite3.connect(database, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    return open_connection
+
+
+def test_import_is_chunked_and_rerunnable(database):
+    conn = connect(database)()
+    csv_file = "Email\nA@x.example\nb@x.example\nnot-an-address\nb@x.example\n" + \
+               ''.join(f"u{n}@x.example\n" for n in range(25))
+    report = import_subscribers(conn, read_emails(io.StringIO(csv_file)), chunk_size=10)
+    assert report == {"rows": 29, "invalid": 1, "duplicates": 1, "upserted": 27, "new": 27}
+    again = import_subscribers(conn, read_emails(io.StringIO(csv_file)), chunk_size=10)
+    assert again["new"] == 0
+    conn.close()
+
+
+# Records every delivery; goes down for good after `fail_after` messages
+class FakeMailServer:
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.delivered = []
+        self.lock = threading.Lock()
+
+    def down(self):
+        return self.fail_after is not None and len(self.delivered) >= self.fail_after
+
+    def connect(self):
+        with self.lock:
+            if self.down():
+                raise OSError("connection refused")
+        return _FakeConnection(self)
+
+
+class _FakeConnection:
+    def __init__(self, server):
+        self.server = server
+
+    def send_message(self, message):
+        with self.server.lock:
+            if self.server.down():
+                raise OSError("connection reset")
+            self.server.delivered.append(message['To'])
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def dispatcher(database, server):
+    return CampaignDispatcher(connect(database), server.connect, 'SBITM <info@sbitm.edu.in>', workers=3,
+                              rate=10000, retries=0, checkpoint_interval=0.01, page_size=7)
+
+
+def test_campaign_resumes_from_checkpoint(database):
+    conn = connect(database)()
+    emails = [f"s{n}@x.example" for n in range(60)]
+    import_subscribers(conn, emails)
+
+    outage = FakeMailServer(fail_after=25)
+    with pytest.raises(SMTPUnavailable):
+        dispatcher(database, outage).run('october', 'News', 'Hello')
+    checkpoint, sent, failed = conn.execute(
+        "SELECT checkpoint, sent, failed FROM newsletter_campaigns WHERE name = 'october'"
+    ).fetchone()
+    # Sends that failed outright count as handled; the rest are resumed
+    assert sent == len(outage.delivered) == 25
+    assert 0 < checkpoint <= sent + failed
+
+    recovered = FakeMailServer()
+    report = dispatcher(database, recovered).run('october', 'News', 'Hello')
+    assert report["resumed_from"] == checkpoint
+    # Subscribers are numbered in import order: exactly those after the
+    # checkpoint are sent, once each
+    assert sorted(recovered.delivered) == sorted(emails[checkpoint:])
+    assert report["sent"] == sent + len(recovered.delivered)
+
+    finished = dispatcher(database, FakeMailServer()).run('october', 'News', 'Hello')
+    assert finished["already_finished"]
+    conn.close()
+
+
+def test_bad_address_fails_only_its_subscriber(database):
+    conn = connect(database)()
+    # Rows from before the form checked addresses
+    with conn:
+        conn.executemany('INSERT INTO newsletter (email) VALUES (?)',
+                         [('a@x.example',), ('bad@x.example\nBcc: all@x.example',), ('b@x.example',),
+                          ('worse@x.example\r\nX-Spam: yes',), ('c@x.example',)])
+    server = FakeMailServer()
+    sending = CampaignDispatcher(connect(database), server.connect, 'SBITM <info@sbitm.edu.in>', workers=2,
+                                 rate=10000, retries=0, checkpoint_interval=0.01)
+    report = sending.run('november', 'News', 'Hello')
+
+    assert sorted(server.delivered) == ['a@x.example', 'b@x.example', 'c@x.example']
+    assert report["sent"] == 3 and report["failed"] == 2
+    assert conn.execute("SELECT checkpoint FROM newsletter_campaigns WHERE name = 'november'").fetchone()[0] == \
+        conn.execute('SELECT MAX(id) FROM newsletter').fetchone()[0]
+    conn.close()
+
+
+# Workers that exit at once, as if each had crashed
+class _DeadWorkers(CampaignDispatcher):
+    def _worker(self, jobs, progress, subject, body):
+        pass
+
+
+def test_campaign_stops_when_every_worker_has_died(database):
+    conn = connect(database)()
+    import_subscribers(conn, [f"s{n}@x.example" for n in range(50)])
+    sending = _DeadWorkers(connect(database), FakeMailServer().connect, 'SBITM <info@sbitm.edu.in>', workers=2,
+                           rate=10000, retries=0, checkpoint_interval=0.01)
+    with pytest.raises(WorkersStopped):
+        sending.run('december', 'News', 'Hello')
+    assert tuple(conn.execute("SELECT checkpoint, finished_at FROM newsletter_campaigns WHERE name = 'december'"
+                              ).fetchone()) == (0, None)
+    conn.close()
+
+
+def test_form_rejects_addresses_with_line_breaks(client):
+    response = client.post('/api/newsletter', json={"email": "a@x.example\nBcc: all@x.example"})
+    assert response.status_code == 400
+    assert client.post('/api/newsletter', json={"email": "a@x.example"}).status_code == 200
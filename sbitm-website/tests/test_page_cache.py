@@ -0,0 +1,43 @@
+from page_cache import PageCache, _CachedPage
+
+
+def test_etag_and_not_modified(app, client):
+    first = client.get('/about')
+    assert first.status_code == 200
+    assert first.headers['ETag'] and first.headers['Last-Modified']
+    assert 'no-cache' in first.headers['Cache-Control']
+
+    repeat = client.get('/about', headers={'If-None-Match': first.headers['ETag']})
+    assert repeat.status_code == 304
+    assert repeat.data == b''
+    changed = client.get('/about', headers={'If-None-Match': '"stale"'})
+    assert changed.status_code == 200 and changed.data == first.data
+
+    stats = app.extensions['page_cache'].stats()
+    assert stats["misses"] == 1 and stats["hits"] == 2 and stats["not_modified"] == 1
+
+
+def test_head_is_served_from_the_cache(app, client):
+    body = client.get('/academics').data
+    head = client.head('/academics')
+    assert head.status_code == 200 and head.data == b''
+    assert int(head.headers['Content-Length']) == len(body)
+    assert app.extensions['page_cache'].stats()["hits"] == 1
+
+
+def test_least_recently_used_page_is_evicted():
+    cache = PageCache(max_bytes=300)
+    for key in ('a', 'b', 'c'):
+        cache._put(key, _CachedPage(b'x' * 100, 0, None))
+    # Touching 'a' makes 'b' the oldest
+    assert cache._get('a') is not None
+    cache._put('d', _CachedPage(b'x' * 100, 0, None))
+
+    assert cache._get('b') is None
+    assert all(cache._get(key) is not None for key in ('a', 'c', 'd'))
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] == 300
+
+    # A page larger than the whole cache is never stored
+    cache._put('huge', _CachedPage(b'x' * 301, 0, None))
+    assert cache._get('huge') is None and cache.stats()["entries"] == 3
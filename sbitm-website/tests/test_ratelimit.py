@@ -0,0 +1,100 @@
+import threading
+
+from app import create_app
+from ratelimit import DedupCache, SubmissionGuard
+
+CONTACT = {"name": "Asha", "email": "asha@example.com", "message": "Admissions query"}
+
+
+def contacts(app):
+    with app.app_context():
+        from db import get_db
+        return get_db().execute('SELECT COUNT(*) FROM contacts').fetchone()[0]
+
+
+def test_repeated_submission_is_replayed(app, client):
+    first = client.post('/api/contact', json=CONTACT)
+    second = client.post('/api/contact', json=CONTACT)
+    assert first.status_code == second.status_code == 200
+    assert second.headers.get('Idempotent-Replayed') == 'true'
+    assert second.get_json()["reference"] == first.get_json()["reference"]
+    assert contacts(app) == 1
+
+
+def test_idempotency_key_replays_the_same_submission(app, client):
+    first = client.post('/api/contact', json=CONTACT, headers={'Idempotency-Key': 'k1'})
+    second = client.post('/api/contact', json=CONTACT, headers={'Idempotency-Key': 'k1'})
+    assert second.headers.get('Idempotent-Replayed') == 'true'
+    assert second.get_json() == first.get_json()
+    assert contacts(app) == 1
+
+
+def test_reused_key_with_another_body_is_rejected(app, client):
+    client.post('/api/contact', json=CONTACT, headers={'Idempotency-Key': 'k1'})
+    edited = client.post('/api/contact', json=dict(CONTACT, message="edited"), headers={'Idempotency-Key': 'k1'})
+    assert edited.status_code == 422
+    assert edited.headers.get('Idempotent-Replayed') is None
+    assert contacts(app) == 1
+
+
+def test_clients_sharing_a_key_are_kept_apart(app, client):
+    application = {"first_name": "Asha", "last_name": "K", "email": "asha@x.com", "phone": "1", "program": "CSE"}
+    other = dict(application, first_name="Ravi", email="ravi@x.com")
+    first = client.post('/api/apply', json=application, headers={'Idempotency-Key': '1'},
+                        environ_base={'REMOTE_ADDR': '192.0.2.1'})
+    second = client.post('/api/apply', json=other, headers={'Idempotency-Key': '1'},
+                         environ_base={'REMOTE_ADDR': '192.0.2.2'})
+    assert first.status_code == second.status_code == 200
+    assert second.headers.get('Idempotent-Replayed') is None
+    assert first.get_json()["application_id"] != second.get_json()["application_id"]
+    with app.app_context():
+        from db import get_db
+        names = get_db().execute('SELECT first_name FROM applications ORDER BY first_name').fetchall()
+    assert [row[0] for row in names] == ['Asha', 'Ravi']
+
+
+def test_rejected_submission_is_not_replayed(app, client):
+    assert client.post('/api/contact', json={"name": "Asha"}).status_code == 400
+    assert client.post('/api/contact', json={"name": "Asha"}).headers.get('Idempotent-Replayed') is None
+
+
+def test_per_ip_limit(app, client):
+    app.extensions['submission_guard'].ip_limit = (2, 60.0)
+    statuses = [client.post('/api/contact', json=dict(CONTACT, message=str(n))).status_code for n in range(3)]
+    assert statuses == [200, 200, 429]
+
+
+def test_repeat_while_first_is_in_flight_waits_for_it():
+    cache = DedupCache(window=60)
+    assert cache.claim('k') == (True, None)
+    outcome = []
+    waiter = threading.Thread(target=lambda: outcome.append(cache.claim('k')))
+    waiter.start()
+    cache.finish('k', (b'{}', 200, 'application/json'))
+    waiter.join()
+    assert outcome == [(False, (b'{}', 200, 'application/json'))]
+
+
+def test_same_client_and_key_with_another_email_is_a_new_submission():
+    first = SubmissionGuard.dedup_key('contact_api', CONTACT, 'k1', '192.0.2.1', 'asha@example.com')
+    again = SubmissionGuard.dedup_key('contact_api', CONTACT, 'k1', '192.0.2.1', ' Asha@Example.com ')
+    other = SubmissionGuard.dedup_key('contact_api', CONTACT, 'k1', '192.0.2.1', 'ravi@example.com')
+    assert first == again
+    assert first[0] != other[0]
+
+
+def test_forwarded_clients_get_their_own_buckets(tmp_path):
+    app = create_app('development', DATABASE=str(tmp_path / 'sbitm.db'), TESTING=True, PROXY_HOPS=1)
+    app.extensions['submission_guard'].ip_limit = (1, 60.0)
+    client = app.test_client()
+
+    def post(forwarded_for, n):
+        return client.post('/api/contact', json=dict(CONTACT, message=str(n)),
+                           headers={'X-Forwarded-For': forwarded_for},
+                           environ_base={'REMOTE_ADDR': '127.0.0.1'}).status_code
+
+    assert post('198.51.100.1', 0) == 200
+    assert post('198.51.100.2', 1) == 200
+    assert post('198.51.100.1', 2) == 429
+    # Only the hop nginx appended is trusted, not one the client made up
+    assert post('198.51.100.9, 198.51.100.2', 3) == 429
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+import references
+from app import create_app
+from references import ReferenceGenerator, new_reference, table_for
+
+
+def test_references_are_unique_and_ordered_across_threads():
+    generator = ReferenceGenerator()
+    issued = []
+
+    def issue():
+        issued.extend(generator.new('ENQ') for _ in range(5000))
+
+    threads = [threading.Thread(target=issue) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(issued)) == len(issued)
+
+    ordered = [generator.new('APP') for _ in range(3000)]
+    assert ordered == sorted(ordered)
+
+
+def test_workers_get_distinct_nodes(monkeypatch):
+    values = {}
+    for pid in (4242, 4243):
+        monkeypatch.setattr(references.os, 'getpid', lambda pid=pid: pid)
+        monkeypatch.setattr(references.time, 'time', lambda: 1700000000.0)
+        values[pid] = ReferenceGenerator().next_value()
+    # Same millisecond, same sequence number, different process
+    assert values[4242] != values[4243]
+
+
+def test_table_for():
+    assert table_for(new_reference('ENQ')) == 'contacts'
+    assert table_for(new_reference('APP')) == 'applications'
+    assert table_for('ENQ123') is None
+
+
+def test_node_id_overrides_the_process_id(monkeypatch):
+    monkeypatch.setattr(references.os, 'getpid', lambda: 1)
+    monkeypatch.setattr(references.time, 'time', lambda: 1700000000.0)
+    # PID 1 in two containers; each configured with its own NODE_ID
+    first = ReferenceGenerator(node_id=7).next_value()
+    second = ReferenceGenerator(node_id=8).next_value()
+    assert first != second
+    assert (first >> references.SEQUENCE_BITS) & ((1 << references.NODE_BITS) - 1) == 7
+
+
+def test_node_id_comes_from_config(tmp_path):
+    try:
+        create_app('development', DATABASE=str(tmp_path / 'sbitm.db'), NODE_ID=12345)
+        assert (references._generator.next_value() >> references.SEQUENCE_BITS) & ((1 << references.NODE_BITS) - 1) == 12345
+        with pytest.raises(ValueError):
+            create_app('development', DATABASE=str(tmp_path / 'sbitm.db'), NODE_ID=1 << references.NODE_BITS)
+    finally:
+        references._generator.set_node_id(None)
@@ -0,0 +1,39 @@
+def test_first_request_searches_built_index(client):
+    # No page rendered yet, so nothing has loaded the content
+    response = client.get('/api/search?q=comp')
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert results
+    assert any(result["kind"] == "program" for result in results)
+
+
+def test_short_query_returns_nothing(client):
+    assert client.get('/api/search?q=c').get_json()["results"] == []
+
+
+def test_searches_during_rebuilds_see_a_complete_index():
+    import threading
+    from search import SearchIndex
+
+    documents = [("program", f"Engineering {n}", "engineering course", "/programs") for n in range(200)]
+    index = SearchIndex(cache_size=0, pool_size=4)
+    index.rebuild(documents)
+    counts = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            counts.append(len(index.search("engineering", limit=500)))
+
+    readers = [threading.Thread(target=reader) for _ in range(12)]
+    for thread in readers:
+        thread.start()
+    for _ in range(20):
+        index.rebuild(documents)
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert counts and set(counts) == {200}
+    # Twelve threads, but never more than pool_size connections kept
+    assert len(index._current.idle) <= 4
@@ -0,0 +1,27 @@
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    return create_app('development', DATABASE=str(tmp_path / 'sbitm.db'), TESTING=True,
+                      SITE_URL='https://www.sbitm.edu.in')
+
+
+def test_sitemap_uses_the_canonical_host(client):
+    body = client.get('/sitemap.xml', headers={'Host': 'evil.example'}).get_data(as_text=True)
+    assert '<loc>https://www.sbitm.edu.in/about</loc>' in body
+    assert 'evil.example' not in body
+    assert '/feed.rss' not in body
+
+
+def test_rotating_host_headers_do_not_rebuild(app, client):
+    for n in range(20):
+        assert client.get('/sitemap.xml', headers={'Host': f'host{n}.example'}).status_code == 200
+    assert app.extensions['sitemaps'].stats()["builds"] == 1
+
+
+def test_conditional_get(client):
+    etag = client.get('/sitemap.xml').headers['ETag']
+    assert client.get('/sitemap.xml', headers={'If-None-Match': etag}).status_code == 304
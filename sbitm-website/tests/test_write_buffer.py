@@ -0,0 +1,68 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db import ConnectionPool
+from write_buffer import BufferFull, WriteBuffer
+
+INSERT = 'INSERT INTO contacts (name, email, reference) VALUES (?, ?, ?)'
+
+
+@pytest.fixture
+def pool(database):
+    return ConnectionPool(database)
+
+
+def count(pool):
+    conn = pool.connect()
+    try:
+        return conn.execute('SELECT COUNT(*) FROM contacts').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_concurrent_submissions_are_group_committed(pool):
+    buffer = WriteBuffer(pool.connect, batch_size=50, flush_interval_ms=20)
+    threads = [threading.Thread(target=buffer.submit, args=(INSERT, (f"S{n}", f"s{n}@example.com", f"R{n}")))
+               for n in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    buffer.stop()
+
+    assert count(pool) == 40
+    stats = buffer.stats()
+    assert stats["written"] == 40
+    assert stats["batches"] < 40
+
+
+def test_failing_row_is_replayed_alone(pool):
+    buffer = WriteBuffer(pool.connect, batch_size=10, flush_interval_ms=50)
+    errors = {}
+
+    def submit(n, reference):
+        try:
+            buffer.submit(INSERT, (f"S{n}", f"s{n}@example.com", reference))
+        except sqlite3.IntegrityError as e:
+            errors[n] = e
+
+    # Rows 0 and 1 share a reference, so one of them hits the UNIQUE index
+    threads = [threading.Thread(target=submit, args=(n, 'DUP' if n < 2 else f"R{n}")) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    buffer.stop()
+
+    assert len(errors) == 1
+    assert count(pool) == 5
+    assert buffer.stats()["failed"] == 1
+
+
+def test_full_queue_rejects(pool):
+    buffer = WriteBuffer(pool.connect, max_queue=1)
+    buffer._stopping = True
+    with pytest.raises(BufferFull):
+        buffer.submit(INSERT, ('S', 's@example.com', 'R'), wait=False)
@@ -0,0 +1,273 @@
+import io
+import json
+import os
+import re
+import urllib.request
+from urllib.parse import urljoin, urlsplit
+
+import click
+from flask import url_for
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:  # fontTools is optional; without it icon fonts are copied whole
+    font_subset = None
+
+try:
+    import brotli  # noqa: F401  (fontTools needs it to write woff2)
+except ImportError:
+    brotli = None
+
+
+# Weights each Google Fonts family offers; 'flask vendor' requests only the
+# ones the stylesheets and templates use
+GOOGLE_FONTS = {
+    'Poppins': (300, 400, 500, 600, 700, 800, 900),
+    'Inter': (300, 400, 500, 600, 700),
+}
+
+
+def google_fonts_url(families):
+    query = '&'.join(
+        f"family={name.replace(' ', '+')}:wght@{';'.join(str(w) for w in weights)}" for name, weights in families.items()
+    )
+    return f"https://fonts.googleapis.com/css2?{query}&display=swap"
+
+
+# Third-party files base.html loads, by their path under static/vendor. Until
+# 'flask vendor' has fetched one, vendor_url() falls back to its CDN URL.
+PACKAGES = {
+    'bootstrap/bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'bootstrap/bootstrap.bundle.min.js': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'bootstrap-icons/bootstrap-icons.css': 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/bootstrap-icons.css',
+    'fontawesome/css/all.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css',
+    'animate/animate.min.css': 'https://cdnjs.cloudflare.com/ajax/libs/animate.css/4.1.1/animate.min.css',
+    'aos/aos.css': 'https://unpkg.com/aos@2.3.1/dist/aos.css',
+    'aos/aos.js': 'https://unpkg.com/aos@2.3.1/dist/aos.js',
+    'fonts/fonts.css': google_fonts_url(GOOGLE_FONTS),
+}
+
+# Stylesheets whose icon rules are cut down to the classes the site uses
+ICON_SETS = {
+    'fontawesome/css/all.min.css': 'fa',
+    'bootstrap-icons/bootstrap-icons.css': 'bi',
+}
+
+# Where icon classes and font weights can appear, relative to the app root
+SCAN_DIRS = ('templates', 'static/css', 'static/js')
+SCAN_FILES = ('data.json', 'faculty.json')
+SCAN_EXTENSIONS = ('.html', '.css', '.js', '.json')
+
+# Google Fonts only hands woff2 to browsers it recognises
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/120.0 Safari/537.36')
+
+WEIGHT_KEYWORDS = {'normal': 400, 'bold': 700}
+WEIGHT_CLASSES = {'fw-light': 300, 'fw-normal': 400, 'fw-medium': 500, 'fw-semibold': 600, 'fw-bold': 700}
+# Browser and Bootstrap defaults: body text, headings and <strong>
+DEFAULT_WEIGHTS = {400, 500, 700}
+
+ICON_RULE = re.compile(r'^\s*\.((?:fa|bi)-[a-z0-9-]+)::?before\s*$')
+ICON_CONTENT = re.compile(r'content\s*:\s*"\\([0-9a-fA-F]+)"')
+CSS_URL = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)(?:\s*format\(\s*[\'"]?([a-z0-9-]+)[\'"]?\s*\))?')
+
+
+def fetch(url, timeout=30):
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def scan_sources(root):
+    texts = []
+    paths = [os.path.join(root, name) for name in SCAN_FILES]
+    for directory in SCAN_DIRS:
+        for folder, dirs, files in os.walk(os.path.join(root, directory)):
+            dirs[:] = [d for d in dirs if d != 'vendor']
+            paths.extend(os.path.join(folder, name) for name in files if name.endswith(SCAN_EXTENSIONS))
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8') as f:
+                texts.append(f.read())
+        except (OSError, UnicodeDecodeError):
+            continue
+    return '\n'.join(texts)
+
+
+# 'fa-laptop-code', 'bi-x' ... anywhere in the scanned sources
+def used_icons(text, prefix):
+    return set(re.findall(rf'(?<![\w-])({prefix}-[a-z0-9]+(?:-[a-z0-9]+)*)', text))
+
+
+def used_weights(text):
+    weights = set(DEFAULT_WEIGHTS)
+    for value in re.findall(r'font-weight\s*:\s*([a-z0-9]+)', text):
+        weight = WEIGHT_KEYWORDS.get(value) or (int(value) if value.isdigit() else None)
+        if weight is not None:
+            weights.add(weight)
+    weights.update(weight for name, weight in WEIGHT_CLASSES.items() if re.search(rf'\b{name}\b', text))
+    return weights
+
+
+# Top-level (prelude, body) pairs of a stylesheet; at-rules keep their nested
+# blocks inside body
+def css_rules(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    position = 0
+    while True:
+        start = css.find('{', position)
+        if start < 0:
+            return
+        depth = 1
+        end = start + 1
+        while depth and end < len(css):
+            depth += {'{': 1, '}': -1}.get(css[end], 0)
+            end += 1
+        yield css[position:start].strip(), css[start + 1:end - 1]
+        position = end
+
+
+# Drops the ::before rules of icons nobody uses; returns (css, codepoints kept)
+def subset_icon_css(css, used):
+    rules = []
+    codepoints = set()
+    for prelude, body in css_rules(css):
+        selectors = prelude.split(',')
+        names = [ICON_RULE.match(selector) for selector in selectors]
+        content = ICON_CONTENT.search(body)
+        if content and all(names):
+            kept = [selector.strip() for selector, name in zip(selectors, names) if name.group(1) in used]
+            if not kept:
+                continue
+            selectors = kept
+            codepoints.add(int(content.group(1), 16))
+        rules.append(f"{','.join(s.strip() for s in selectors)}{{{body.strip()}}}")
+    return '\n'.join(rules) + '\n', codepoints
+
+
+def subset_font(data, codepoints):
+    options = font_subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    font = font_subset.load_font(io.BytesIO(data), options)
+    subsetter = font_subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    font_subset.save_font(font, out, options)
+    return out.getvalue()
+
+
+class Vendorer:
+    def __init__(self, root, static_folder, subset=True):
+        self.root = root
+        self.vendor_dir = os.path.join(static_folder, 'vendor')
+        self.subset = subset
+        self.sources = scan_sources(root)
+        self.report = {"files": {}, "failed": {}}
+
+    # Downloads the woff2 files a stylesheet's @font-face rules point at into
+    # <package>/webfonts and rewrites src to them; the other formats are
+    # dropped, as every browser Bootstrap 5 supports reads woff2
+    def localise_fonts(self, css, css_url, name, codepoints=None):
+        css_dir = os.path.dirname(name)
+        font_dir = os.path.join(name.split('/')[0], 'webfonts')
+        rules = []
+        for prelude, body in css_rules(css):
+            if prelude == '@font-face':
+                sources = [
+                    (url, fmt) for url, fmt in CSS_URL.findall(body)
+                    if fmt == 'woff2' or urlsplit(url).path.endswith('.woff2')
+                ]
+                local = []
+                for url, _ in sources:
+                    filename = os.path.basename(urlsplit(url).path)
+                    data = fetch(urljoin(css_url, url))
+                    if codepoints is not None and self.subset and font_subset is not None and brotli is not None:
+                        data = subset_font(data, codepoints)
+                    target = os.path.join(font_dir, filename)
+                    self._save(target, data)
+                    local.append(f'url("{os.path.relpath(target, css_dir)}") format("woff2")')
+                body = re.sub(r'src\s*:[^;]*(;|$)', f"src:{','.join(local)};", body, count=1)
+            rules.append(f"{prelude}{{{body.strip()}}}")
+        return '\n'.join(rules) + '\n'
+
+    def _save(self, name, data):
+        _write(os.path.join(self.vendor_dir, name), data)
+        self.report["files"][name] = len(data)
+
+    def vendor_package(self, name, url):
+        if name == 'fonts/fonts.css':
+            weights = used_weights(self.sources)
+            families = {family: tuple(w for w in available if w in weights) for family, available in GOOGLE_FONTS.items()}
+            self.report["weights"] = {family: list(kept) for family, kept in families.items()}
+            url = google_fonts_url(families)
+
+        data = fetch(url)
+        if not name.endswith('.css'):
+            self._save(name, data)
+            return
+
+        css = data.decode('utf-8')
+        codepoints = None
+        if name in ICON_SETS:
+            icons = used_icons(self.sources, ICON_SETS[name])
+            css, codepoints = subset_icon_css(css, icons)
+            self.report.setdefault("icons", {})[name] = len(codepoints)
+            if not codepoints:
+                # No icons from this set are used: nothing to load
+                css = '\n'.join(f"{p}{{{b.strip()}}}" for p, b in css_rules(css) if p != '@font-face') + '\n'
+        if '@font-face' in css:
+            css = self.localise_fonts(css, url, name, codepoints)
+        self._save(name, css.encode('utf-8'))
+
+    def run(self, packages=PACKAGES):
+        for name, url in packages.items():
+            try:
+                self.vendor_package(name, url)
+            except (OSError, ValueError) as e:
+                # Offline or the CDN is down: templates keep using the CDN
+                self.report["failed"][name] = str(e)
+        if self.report["files"]:
+            _write(os.path.join(self.vendor_dir, 'VENDOR.json'),
+                   json.dumps({"packages": packages, **self.report}, indent=2, sort_keys=True).encode('utf-8'))
+        return self.report
+
+
+def init_app(app):
+    vendor_dir = os.path.join(app.static_folder, 'vendor')
+    available = {}
+
+    # {{ vendor_url('bootstrap/bootstrap.min.css') }}: the self-hosted copy
+    # (fingerprinted like any static file) once vendored, else the CDN
+    @app.template_global()
+    def vendor_url(name):
+        if name not in available:
+            available[name] = os.path.isfile(os.path.join(vendor_dir, name))
+        if available[name]:
+            return url_for('static', filename=f'vendor/{name}')
+        return PACKAGES[name]
+
+    @app.cli.command('vendor')
+    @click.option('--no-subset', is_flag=True, help='Keep every icon and glyph.')
+    def vendor_command(no_subset):
+        vendorer = Vendorer(app.root_path, app.static_folder, subset=not no_subset)
+        report = vendorer.run()
+        for name, error in report["failed"].items():
+            print(f"❌ {name}: {error}; pages keep loading it from the CDN")
+        for name, count in report.get("icons", {}).items():
+            print(f"🔣 {name}: {count} icons used")
+        if report.get("weights"):
+            print("🔤 Font weights: " + ', '.join(f"{family} {list(w)}" for family, w in report["weights"].items()))
+        if not no_subset and (font_subset is None or brotli is None):
+            print("⚠️  Icon fonts copied whole; pip install fonttools brotli to subset them")
+        total = sum(report["files"].values())
+        print(f"✅ Vendored {len(report['files'])} files ({total // 1024} KB) into {vendor_dir}")
@@ -0,0 +1,223 @@
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+
+
+class BufferFull(Exception):
+    pass
+
+
+class _Pending:
+    __slots__ = ('sql', 'params', 'queued_at', 'done', 'error', 'callback')
+
+    def __init__(self, sql, params, wait, callback=None):
+        self.sql = sql
+        self.params = params
+        self.queued_at = time.perf_counter()
+        self.done = threading.Event() if wait else None
+        self.error = None
+        # Called from the writer thread with the error (or None) after commit
+        self.callback = callback
+
+
+# Group-commit queue: a single writer thread drains form submissions into
+# batched executemany() transactions, so a burst of N requests costs one
+# write-lock acquisition and one fsync instead of N
+class WriteBuffer:
+    def __init__(self, connect, max_queue=1000, batch_size=100, flush_interval_ms=50):
+        self._connect = connect
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stopping = False
+
+        self._enqueued = 0
+        self._rejected = 0
+        self._written = 0
+        self._failed = 0
+        self._batches = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._commit_total = 0.0
+
+    def _ensure_started(self):
+        # Started lazily so pre-forking servers get one writer per worker
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='sbitm-write-buffer', daemon=True)
+                self._thread.start()
+
+    # Queue one INSERT. With wait=True the call returns only after the batch
+    # holding the row has committed; otherwise it returns once queued.
+    def submit(self, sql, params, wait=True, timeout=10.0):
+        item = self._enqueue(_Pending(sql, tuple(params), wait))
+        if wait:
+            if not item.done.wait(timeout):
+                raise TimeoutError("Timed out waiting for batch commit")
+            if item.error is not None:
+                raise item.error
+
+    # Same as submit(wait=True) for coroutines: the event loop thread only
+    # queues the row and is woken when its batch has committed
+    async def submit_async(self, sql, params, timeout=10.0):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(error):
+            if future.done():
+                return  # caller timed out
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
+
+        self._enqueue(_Pending(sql, tuple(params), False,
+                               callback=lambda error: loop.call_soon_threadsafe(resolve, error)))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("Timed out waiting for batch commit")
+
+    def _enqueue(self, item):
+        if self._stopping:
+            raise BufferFull("Write buffer is shutting down")
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            raise BufferFull("Write buffer is full")
+
+        with self._stats_lock:
+            self._enqueued += 1
+        return item
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            while True:
+                try:
+                    first = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    if self._stopping:
+                        break
+                    continue
+                if first is None:
+                    break
+
+                batch = [first]
+                deadline = time.perf_counter() + self.flush_interval
+                stop_after = False
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop_after = True
+                        break
+                    batch.append(item)
+
+                self._flush(conn, batch)
+                if stop_after:
+                    break
+
+            # Drain whatever was queued before shutdown
+            leftover = []
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    leftover.append(item)
+            for start in range(0, len(leftover), self.batch_size):
+                self._flush(conn, leftover[start:start + self.batch_size])
+        finally:
+            conn.close()
+
+    def _flush(self, conn, batch):
+        grouped = {}
+        for item in batch:
+            grouped.setdefault(item.sql, []).append(item)
+
+        started = time.perf_counter()
+        try:
+            with conn:
+                for sql, items in grouped.items():
+                    conn.executemany(sql, [item.params for item in items])
+            failed = 0
+        except sqlite3.Error:
+            # One bad row must not sink the rest of the batch; replay it
+            # row by row so only the offending submissions report an error
+            failed = 0
+            for item in batch:
+                try:
+                    with conn:
+                        conn.execute(item.sql, item.params)
+                except sqlite3.Error as e:
+                    item.error = e
+                    failed += 1
+        finished = time.perf_counter()
+
+        latency_total = 0.0
+        latency_max = 0.0
+        for item in batch:
+            latency = finished - item.queued_at
+            latency_total += latency
+            latency_max = max(latency_max, latency)
+            if item.done is not None:
+                item.done.set()
+            if item.callback is not None:
+                try:
+                    item.callback(item.error)
+                except RuntimeError:
+                    pass  # event loop already closed
+
+        with self._stats_lock:
+            self._batches += 1
+            self._written += len(batch) - failed
+            self._failed += failed
+            self._latency_total += latency_total
+            self._latency_max = max(self._latency_max, latency_max)
+            self._commit_total += finished - started
+
+    # Flushes everything queued and stops the writer; registered with atexit
+    def stop(self, timeout=10.0):
+        self._stopping = True
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            processed = self._written + self._failed
+            return {
+                "queued": self._queue.qsize(),
+                "max_queue": self._queue.maxsize,
+                "enqueued": self._enqueued,
+                "rejected": self._rejected,
+                "written": self._written,
+                "failed": self._failed,
+                "batches": self._batches,
+                "avg_batch_size": round(processed / self._batches, 2) if self._batches else 0,
+                "avg_latency_ms": round(self._latency_total / processed * 1000, 3) if processed else 0,
+                "max_latency_ms": round(self._latency_max * 1000, 3),
+                "avg_commit_ms": round(self._commit_total / self._batches * 1000, 3) if self._batches else 0
+            }
@@ -0,0 +1,13 @@
+# Production entry point for a multi-worker WSGI server, e.g.
+#
+#   flask --app wsgi migrate
+#   gunicorn -w 4 -b 0.0.0.0:8000 wsgi:app
+#
+# Selects the production profile unless SBITM_CONFIG says otherwise.
+import os
+
+os.environ.setdefault('SBITM_CONFIG', 'production')
+
+from app import create_app  # noqa: E402
+
+app = create_app()